@@ -17,13 +17,19 @@ icon_files = [
 if sys.platform == 'darwin':
     icon_files.append((str(project_dir / 'assets' / 'icon.icns'), 'assets'))
 
+# Банки семплов: MP3 и сконвертированные (convert_samples), если есть;
+# импульсные характеристики помещений; встроенные наборы семплов
+sample_dirs = [
+    (str(project_dir / 'assets' / name), f'assets/{name}')
+    for name in ('samples_mp3', 'samples_ogg', 'samples_flac', 'samples', 'impulses', 'packs')
+    if (project_dir / 'assets' / name).is_dir()
+]
+
 a = Analysis(
     [str(project_dir / 'piano_ear_trainer' / 'app.py')],
     pathex=[str(project_dir)],
     binaries=[],
-    datas=[
-        (str(project_dir / 'assets' / 'samples_mp3'), 'assets/samples_mp3'),
-    ] + icon_files,
+    datas=sample_dirs + icon_files,
     hiddenimports=[
         'pygame',
         'PySide6.QtCore',
@@ -1,10 +1,12 @@
 """Главный модуль приложения."""
 
+import multiprocessing
 import sys
 
 from PySide6.QtGui import QColor, QPalette
 from PySide6.QtWidgets import QApplication
 
+from piano_ear_trainer.metrics import start_exporter_from_env
 from piano_ear_trainer.ui.main_window import MainWindow
 
 
@@ -32,14 +34,22 @@ def _apply_dark_theme(app: QApplication) -> None:
 
 def main() -> None:
     """Запуск приложения."""
+    # Пул процессов для сборки банков семплов (нужно для сборки PyInstaller)
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     app.setApplicationName("Piano Ear Trainer")
     _apply_dark_theme(app)
 
+    # Экспорт метрик (если задан PIANO_EAR_TRAINER_METRICS)
+    exporter = start_exporter_from_env()
+
     window = MainWindow()
     window.show()
 
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    if exporter is not None:
+        exporter.stop()
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
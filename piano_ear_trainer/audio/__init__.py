@@ -1,5 +1,23 @@
 """Аудио модули."""
 
+from piano_ear_trainer.audio.bank import DEFAULT_LAYER, DYNAMICS
+from piano_ear_trainer.audio.microphone import MicrophoneInput
+from piano_ear_trainer.audio.pitch import (
+    PitchDetector,
+    StableNoteTracker,
+    frequency_to_note,
+)
 from piano_ear_trainer.audio.player import AudioPlayer
+from piano_ear_trainer.audio.sequencer import DEFAULT_TEMPO, Sequencer
 
-__all__ = ["AudioPlayer"]
+__all__ = [
+    "DEFAULT_LAYER",
+    "DEFAULT_TEMPO",
+    "DYNAMICS",
+    "AudioPlayer",
+    "MicrophoneInput",
+    "PitchDetector",
+    "Sequencer",
+    "StableNoteTracker",
+    "frequency_to_note",
+]
@@ -0,0 +1,197 @@
+"""Банки семплов, перестроенные под другой строй (A4 ≠ 440 Гц)."""
+
+import contextlib
+import hashlib
+import os
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+from piano_ear_trainer.data import A4_FREQUENCY, PIANO_NOTES, generate_all_notes
+
+# Формат микшера: (частота, размер сэмпла, каналы) — как у pygame.mixer.get_init()
+MixerFormat = tuple[int, int, int]
+
+# Слои динамики от тихого к громкому. Основной слой — файл без суффикса
+# (C4.mp3), остальные лежат рядом с суффиксом слоя (C4_pp.mp3, C4_ff.mp3)
+DYNAMICS = ("pp", "mf", "ff")
+DEFAULT_LAYER = "mf"
+
+
+def sample_stem(short_name: str, layer: str = DEFAULT_LAYER) -> str:
+    """Имя файла семпла без расширения (оно же ключ кэшей)."""
+    return short_name if layer == DEFAULT_LAYER else f"{short_name}_{layer}"
+
+
+def split_stem(stem: str) -> tuple[str, str]:
+    """Обратное к sample_stem: (короткое имя ноты, слой)."""
+    short_name, _, layer = stem.partition("_")
+    return short_name, layer or DEFAULT_LAYER
+
+
+def scan_layers(samples_dir: Path, sample_format: str) -> dict[str, set[str]]:
+    """Установленные слои: слой -> короткие имена нот (одно чтение папки)."""
+    layers: dict[str, set[str]] = {}
+    suffix = f".{sample_format}"
+    try:
+        entries = list(os.scandir(samples_dir))
+    except OSError:
+        return layers
+    for entry in entries:
+        if not entry.name.endswith(suffix):
+            continue
+        short_name, layer = split_stem(entry.name.removesuffix(suffix))
+        if layer in DYNAMICS:
+            layers.setdefault(layer, set()).add(short_name)
+    return layers
+
+
+def get_cache_root() -> Path:
+    """Папка дискового кэша приложения."""
+    base = os.environ.get("XDG_CACHE_HOME")
+    root = Path(base) if base else Path.home() / ".cache"
+    return root / "piano_ear_trainer"
+
+
+def source_key(samples_dir: Path) -> str:
+    """Ключ папки семплов в дисковых кэшах: имя и хэш полного пути."""
+    source = hashlib.md5(str(samples_dir.resolve()).encode()).hexdigest()[:8]
+    return f"{samples_dir.name}_{source}"
+
+
+def bank_cache_dir(
+    samples_dir: Path, reference_pitch: float, mixer_format: MixerFormat
+) -> Path:
+    """Папка кэша банка: ключ — строй, формат микшера и набор семплов."""
+    frequency, size, channels = mixer_format
+    key = f"{source_key(samples_dir)}-a4_{reference_pitch:g}-{frequency}_{size}_{channels}"
+    return get_cache_root() / "banks" / key
+
+
+def invalidate_tuned_banks(samples_dir: Path, stems: Iterable[str]) -> int:
+    """
+    Удаляет из кэшей банков всех строёв рендеры изменившихся семплов.
+
+    Остальные ноты кэша остаются: при следующей сборке перерендерятся
+    только удалённые. Возвращает число удалённых файлов.
+    """
+    prefix = f"{source_key(samples_dir)}-"
+    try:
+        entries = list(os.scandir(get_cache_root() / "banks"))
+    except OSError:
+        return 0
+    stems = list(stems)
+    removed = 0
+    for entry in entries:
+        if not entry.name.startswith(prefix):
+            continue
+        for stem in stems:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(os.path.join(entry.path, f"{stem}.npy"))
+                removed += 1
+    return removed
+
+
+def resample(pcm: np.ndarray, ratio: float) -> np.ndarray:
+    """
+    Транспонирует PCM на коэффициент частоты ratio (линейная интерполяция).
+
+    ratio > 1 повышает звук и укорачивает семпл.
+    """
+    length = int(len(pcm) / ratio)
+    positions = np.arange(length, dtype=np.float64) * ratio
+    source = np.arange(len(pcm), dtype=np.float64)
+    if pcm.ndim == 1:
+        out = np.interp(positions, source, pcm)
+    else:
+        out = np.empty((length, pcm.shape[1]), dtype=np.float64)
+        for channel in range(pcm.shape[1]):
+            out[:, channel] = np.interp(positions, source, pcm[:, channel])
+    return np.round(out).astype(pcm.dtype)
+
+
+def _init_worker(mixer_format: MixerFormat) -> None:
+    """Инициализация процесса-декодера: микшер без вывода звука."""
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    import pygame
+
+    frequency, size, channels = mixer_format
+    pygame.mixer.init(frequency=frequency, size=size, channels=channels)
+
+
+def _render_note(sample_path: str, ratio: float, target_path: str) -> str:
+    """Декодирует семпл, транспонирует и сохраняет в кэш (в процессе пула)."""
+    import pygame
+    import pygame.sndarray
+
+    pcm = pygame.sndarray.array(pygame.mixer.Sound(sample_path))
+    tmp_path = target_path + ".tmp.npy"
+    np.save(tmp_path, resample(pcm, ratio))
+    os.replace(tmp_path, target_path)
+    return target_path
+
+
+def build_tuned_bank(
+    samples_dir: Path,
+    sample_format: str,
+    reference_pitch: float,
+    mixer_format: MixerFormat,
+    max_workers: int | None = None,
+    stems: Iterable[str] | None = None,
+) -> dict[str, Path]:
+    """
+    Строит (или берёт из кэша) банк семплов для строя reference_pitch.
+
+    Недостающие ноты рендерятся параллельно в пуле процессов.
+
+    Args:
+        stems: Какие семплы (см. sample_stem) включить; по умолчанию —
+            основной слой всех клавиш
+
+    Returns:
+        Словарь: имя семпла -> путь к .npy с PCM.
+    """
+    cache_dir = bank_cache_dir(samples_dir, reference_pitch, mixer_format)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    ratios = {
+        note.short_name: tuned.frequency / note.frequency
+        for note, tuned in zip(
+            PIANO_NOTES, generate_all_notes(reference_pitch), strict=True
+        )
+    }
+    if stems is None:
+        stems = ratios
+    paths: dict[str, Path] = {}
+    jobs: list[tuple[str, float, str]] = []
+    for stem in stems:
+        target = cache_dir / f"{stem}.npy"
+        paths[stem] = target
+        if target.exists():
+            continue
+        source = samples_dir / f"{stem}.{sample_format}"
+        if not source.exists():
+            raise FileNotFoundError(f"Семпл не найден: {source}")
+        ratio = ratios[split_stem(stem)[0]]
+        jobs.append((str(source), ratio, str(target)))
+
+    if jobs:
+        # spawn: форк процесса с Qt и аудиопотоками SDL небезопасен
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(mixer_format,),
+        ) as pool:
+            list(pool.map(_render_note, *zip(*jobs, strict=True)))
+
+    return paths
+
+
+def is_standard_pitch(reference_pitch: float) -> bool:
+    """Совпадает ли строй с тем, в котором записаны семплы."""
+    return abs(reference_pitch - A4_FREQUENCY) < 1e-6
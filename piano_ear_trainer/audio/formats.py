@@ -0,0 +1,175 @@
+"""Форматы банков семплов и выбор самого быстрого для декодирования."""
+
+import contextlib
+import json
+import os
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+import pygame
+
+from piano_ear_trainer.audio.bank import MixerFormat, get_cache_root
+from piano_ear_trainer.data import PIANO_NOTES, Note
+
+# Ноты для быстрого замера при старте: по одной на каждые ~2 октавы
+BENCHMARK_NOTES = PIANO_NOTES[::22]
+
+
+@dataclass(frozen=True)
+class SampleFormat:
+    """Формат банка семплов."""
+
+    name: str  # Расширение файлов без точки
+    directory: str  # Папка банка в assets
+    description: str
+    # Параметры записи для soundfile (утилита конвертации)
+    sf_format: str
+    sf_subtype: str
+
+
+# Реестр форматов: имя -> формат
+FORMATS: dict[str, SampleFormat] = {}
+
+
+def register_format(sample_format: SampleFormat) -> None:
+    """Добавляет формат в реестр."""
+    FORMATS[sample_format.name] = sample_format
+
+
+register_format(SampleFormat("wav", "samples", "WAV (PCM 16 бит)", "WAV", "PCM_16"))
+register_format(SampleFormat("flac", "samples_flac", "FLAC", "FLAC", "PCM_16"))
+register_format(SampleFormat("ogg", "samples_ogg", "OGG/Vorbis", "OGG", "VORBIS"))
+register_format(SampleFormat("mp3", "samples_mp3", "MP3", "MP3", "MPEG_LAYER_III"))
+
+# Файл с последним замером (декодер зависит от машины и сборки SDL_mixer)
+RANKING_FILE = "decode_ranking.json"
+
+
+def is_complete_bank(samples_dir: Path, sample_format: str) -> bool:
+    """Есть ли в папке семплы всех клавиш в этом формате."""
+    return samples_dir.is_dir() and all(
+        (samples_dir / f"{note.short_name}.{sample_format}").exists()
+        for note in PIANO_NOTES
+    )
+
+
+def detect_format(samples_dir: Path) -> str:
+    """Формат семплов в папке (по умолчанию wav)."""
+    for name in FORMATS:
+        if is_complete_bank(samples_dir, name):
+            return name
+    return "wav"
+
+
+def find_banks(assets_dir: Path) -> dict[str, Path]:
+    """Полные банки в assets: формат -> папка."""
+    banks = {}
+    for sample_format in FORMATS.values():
+        samples_dir = assets_dir / sample_format.directory
+        if is_complete_bank(samples_dir, sample_format.name):
+            banks[sample_format.name] = samples_dir
+    return banks
+
+
+def measure_decode(
+    samples_dir: Path,
+    sample_format: str,
+    notes: Sequence[Note] = BENCHMARK_NOTES,
+    repeats: int = 1,
+) -> float | None:
+    """
+    Среднее время декодирования одного семпла, с.
+
+    Требует инициализированный микшер. Возвращает None, если SDL_mixer
+    не умеет декодировать этот формат.
+    """
+    paths = [str(samples_dir / f"{n.short_name}.{sample_format}") for n in notes]
+    # Прогреваем файловый кэш ОС, чтобы сравнивать только декодеры
+    for path in paths:
+        Path(path).read_bytes()
+    # Первый файл формата платит за ленивую инициализацию кодека SDL_mixer
+    try:
+        pygame.mixer.Sound(paths[0])
+    except pygame.error:
+        return None
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for path in paths:
+            try:
+                pygame.mixer.Sound(path)
+            except pygame.error:
+                return None
+    return (time.perf_counter() - started) / (repeats * len(notes))
+
+
+def rank_formats(
+    banks: dict[str, Path],
+    notes: Sequence[Note] = BENCHMARK_NOTES,
+    repeats: int = 1,
+) -> list[tuple[str, float]]:
+    """Форматы от самого быстрого: (формат, секунд на семпл)."""
+    results = []
+    for name, samples_dir in banks.items():
+        seconds = measure_decode(samples_dir, name, notes, repeats)
+        if seconds is not None:
+            results.append((name, seconds))
+    return sorted(results, key=lambda item: item[1])
+
+
+def ranking_key(formats: Sequence[str], mixer_format: MixerFormat) -> str:
+    """Ключ сохранённого замера: SDL_mixer, формат микшера и набор банков."""
+    sdl_mixer = ".".join(map(str, pygame.mixer.get_sdl_mixer_version()))
+    frequency, size, channels = mixer_format
+    return f"{sdl_mixer}-{frequency}_{size}_{channels}-{','.join(sorted(formats))}"
+
+
+def load_ranking(key: str) -> list[str] | None:
+    """Сохранённый порядок форматов для этого набора банков."""
+    try:
+        data = json.loads((get_cache_root() / RANKING_FILE).read_text())
+        ranking = data[key]
+    except (OSError, ValueError, KeyError):
+        return None
+    return ranking if isinstance(ranking, list) else None
+
+
+def save_ranking(key: str, ranking: list[str]) -> None:
+    """Запоминает порядок форматов (ошибки записи не критичны)."""
+    path = get_cache_root() / RANKING_FILE
+    with contextlib.suppress(OSError):
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        data[key] = ranking
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data, indent=2))
+        tmp_path.replace(path)
+
+
+def choose_bank(assets_dir: Path, mixer_format: MixerFormat) -> tuple[str, Path] | None:
+    """
+    Самый быстрый для декодирования банк из установленных.
+
+    Замер делается один раз для набора банков и версии SDL_mixer, дальше
+    порядок берётся из кэша. Требует инициализированный микшер.
+    """
+    banks = find_banks(assets_dir)
+    if not banks:
+        return None
+    if len(banks) == 1:
+        return next(iter(banks.items()))
+
+    key = ranking_key(list(banks), mixer_format)
+    ranking = load_ranking(key)
+    if ranking is None:
+        ranking = [name for name, _ in rank_formats(banks)]
+        save_ranking(key, ranking)
+    for name in ranking:
+        if name in banks:
+            return name, banks[name]
+    return None
@@ -0,0 +1,91 @@
+"""Захват звука с микрофона через SDL (pygame)."""
+
+import os
+import queue
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+import numpy as np
+import pygame
+
+from piano_ear_trainer.audio.pitch import SAMPLE_RATE
+
+
+class MicrophoneInput:
+    """
+    Источник сэмплов с микрофона.
+
+    SDL вызывает callback в своём аудиопотоке, порции складываются в
+    очередь, а read() забирает их в потоке GUI. Интерфейс тот же, что у
+    iter_chunks() для WAV-файлов и синтезированных тонов: на выходе —
+    моно float32 массивы для PitchDetector.feed().
+    """
+
+    def __init__(
+        self,
+        device_name: str | None = None,
+        sample_rate: int = SAMPLE_RATE,
+        chunk_size: int = 512,
+    ) -> None:
+        self.device_name = device_name
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self._queue: queue.SimpleQueue[bytes] = queue.SimpleQueue()
+        self._device = None
+
+    def start(self) -> None:
+        """Открывает устройство захвата и начинает запись."""
+        if self._device is not None:
+            return
+
+        from pygame._sdl2.audio import AUDIO_F32, AudioDevice, get_audio_device_names
+
+        if not pygame.get_init():
+            pygame.init()
+        device_name = self.device_name
+        if device_name is None:
+            names = get_audio_device_names(True)
+            if not names:
+                raise OSError("Микрофон не найден")
+            device_name = names[0]
+        try:
+            self._device = AudioDevice(
+                devicename=device_name,
+                iscapture=True,
+                frequency=self.sample_rate,
+                audioformat=AUDIO_F32,
+                numchannels=1,
+                chunksize=self.chunk_size,
+                allowed_changes=0,
+                callback=self._on_audio,
+            )
+        except pygame.error as e:
+            raise OSError(f"Не удалось открыть микрофон: {e}") from e
+        self._device.pause(0)
+
+    def stop(self) -> None:
+        """Останавливает запись и закрывает устройство."""
+        if self._device is not None:
+            self._device.close()
+            self._device = None
+        self.read()  # Выбрасываем накопленное
+
+    @property
+    def is_running(self) -> bool:
+        """Идёт ли запись."""
+        return self._device is not None
+
+    def _on_audio(self, device, memory: memoryview) -> None:
+        """Callback SDL (аудиопоток): копируем порцию в очередь."""
+        self._queue.put(bytes(memory))
+
+    def read(self) -> np.ndarray:
+        """Забирает все накопленные сэмплы (может вернуть пустой массив)."""
+        chunks = []
+        while True:
+            try:
+                chunks.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if not chunks:
+            return np.zeros(0, dtype=np.float32)
+        return np.frombuffer(b"".join(chunks), dtype=np.float32)
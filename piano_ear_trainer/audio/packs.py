@@ -0,0 +1,128 @@
+"""Наборы семплов: поиск и манифест содержимого для частичной перезагрузки."""
+
+import contextlib
+import hashlib
+import json
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from piano_ear_trainer.audio.bank import get_cache_root, source_key
+from piano_ear_trainer.audio.formats import detect_format, is_complete_bank
+
+# Папка пользовательских наборов: в ней каждая подпапка — набор семплов
+USER_PACKS_DIR = Path.home() / ".piano_ear_trainer_packs"
+
+# Манифест: стем семпла (см. sample_stem) -> хэш содержимого файла
+Manifest = dict[str, str]
+
+
+@dataclass(frozen=True)
+class SamplePack:
+    """Набор семплов: полный банк основного слоя в одной папке."""
+
+    name: str
+    directory: Path
+    format: str  # Расширение файлов без точки
+
+
+def find_packs(roots: Iterable[Path]) -> dict[str, SamplePack]:
+    """
+    Наборы в папках roots: имя подпапки -> набор.
+
+    Берутся только полные банки; при совпадении имён побеждает последняя
+    папка (пользовательские наборы перекрывают встроенные).
+    """
+    packs = {}
+    for root in roots:
+        try:
+            entries = sorted(os.scandir(root), key=lambda e: e.name)
+        except OSError:
+            continue
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            directory = Path(entry.path)
+            sample_format = detect_format(directory)
+            if is_complete_bank(directory, sample_format):
+                packs[entry.name] = SamplePack(entry.name, directory, sample_format)
+    return packs
+
+
+def _manifest_path(samples_dir: Path) -> Path:
+    return get_cache_root() / "manifests" / f"{source_key(samples_dir)}.json"
+
+
+def _file_digest(path: str) -> str:
+    with open(path, "rb") as stream:
+        return hashlib.file_digest(stream, "sha1").hexdigest()
+
+
+def diff_manifests(old: Manifest, new: Manifest) -> set[str]:
+    """Стемы, которые отличаются в двух манифестах (или есть только в одном)."""
+    return {stem for stem in old.keys() | new.keys() if old.get(stem) != new.get(stem)}
+
+
+def file_stamps(samples_dir: Path, sample_format: str) -> dict[str, tuple[int, int]]:
+    """
+    Размер и время изменения семплов папки: имя файла -> (байт, нс).
+
+    Одно чтение папки без открытия файлов: по отпечаткам видно и
+    добавленные/удалённые семплы, и перезаписанные на месте.
+    """
+    stamps = {}
+    suffix = f".{sample_format}"
+    with contextlib.suppress(OSError):
+        for entry in os.scandir(samples_dir):
+            if entry.name.endswith(suffix):
+                stat = entry.stat()
+                stamps[entry.name] = (stat.st_size, stat.st_mtime_ns)
+    return stamps
+
+
+def update_manifest(samples_dir: Path, sample_format: str) -> tuple[Manifest, set[str]]:
+    """
+    Манифест папки и стемы, изменившиеся с прошлого сканирования.
+
+    Хэш пересчитывается только у файлов с другими размером или временем
+    изменения, поэтому повторное сканирование — это одно чтение папки.
+    Если папку ещё не сканировали, изменившимися считаются все семплы:
+    дисковые кэши могли остаться от прежнего содержимого.
+
+    Returns:
+        (манифест, изменённые, добавленные и удалённые стемы)
+    """
+    path = _manifest_path(samples_dir)
+    try:
+        stored = json.loads(path.read_text())["files"]
+    except (OSError, ValueError, KeyError, TypeError):
+        stored = None
+    files: dict[str, list] = {}
+    suffix = f".{sample_format}"
+    for name, (size, mtime_ns) in file_stamps(samples_dir, sample_format).items():
+        cached = (stored or {}).get(name)
+        if cached and cached[:2] == [size, mtime_ns]:
+            files[name] = cached
+            continue
+        with contextlib.suppress(OSError):  # Файл удалили во время сканирования
+            files[name] = [size, mtime_ns, _file_digest(samples_dir / name)]
+
+    manifest = {name.removesuffix(suffix): entry[2] for name, entry in files.items()}
+    if stored is None:
+        changed = set(manifest)
+    else:
+        previous = {
+            name.removesuffix(suffix): entry[2]
+            for name, entry in stored.items()
+            if name.endswith(suffix)
+        }
+        changed = diff_manifests(previous, manifest)
+    if stored is None or files != stored:
+        # Ошибки записи не критичны: в следующий раз файлы перехэшируются
+        with contextlib.suppress(OSError):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({"files": files}))
+            tmp_path.replace(path)
+    return manifest, changed
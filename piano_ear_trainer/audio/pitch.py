@@ -0,0 +1,307 @@
+"""Потоковое определение высоты звука (YIN) для ответа голосом."""
+
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+
+import numpy as np
+
+from piano_ear_trainer.data import A4_FREQUENCY, PIANO_NOTES, Note, generate_all_notes
+
+# Параметры анализа по умолчанию
+SAMPLE_RATE = 44100
+FRAME_SIZE = 4096  # ~93 мс: окно YIN вмещает период A0 (27.5 Гц)
+HOP_SIZE = 1024  # ~23 мс: шаг между перекрывающимися кадрами
+
+
+class NoteIndex:
+    """Индекс нот по логарифму частоты для поиска ближайшей клавиши."""
+
+    def __init__(self, notes: list[Note] = PIANO_NOTES) -> None:
+        self._notes = sorted(notes, key=lambda n: n.frequency)
+        log_freqs = np.log2([n.frequency for n in self._notes])
+        # Границы между соседними нотами — середина в логарифмической шкале
+        self._bounds: list[float] = ((log_freqs[1:] + log_freqs[:-1]) / 2).tolist()
+        # Допуск за краями клавиатуры — полутон
+        half_step = 1 / 24
+        self._low = float(log_freqs[0]) - half_step
+        self._high = float(log_freqs[-1]) + half_step
+
+    def nearest(self, frequency: float) -> Note | None:
+        """Возвращает ближайшую ноту или None, если частота вне диапазона."""
+        if frequency <= 0:
+            return None
+        log_freq = float(np.log2(frequency))
+        if not self._low <= log_freq <= self._high:
+            return None
+        return self._notes[bisect_left(self._bounds, log_freq)]
+
+
+# Общий индекс для 88 клавиш в строе A4 = 440 Гц
+NOTE_INDEX = NoteIndex()
+
+
+def note_index_for(reference_pitch: float) -> NoteIndex:
+    """Индекс клавиш для строя reference_pitch (440 Гц — общий индекс)."""
+    if reference_pitch == A4_FREQUENCY:
+        return NOTE_INDEX
+    return NoteIndex(generate_all_notes(reference_pitch))
+
+
+def frequency_to_note(frequency: float) -> Note | None:
+    """Находит ближайшую клавишу фортепиано для частоты (строй 440 Гц)."""
+    return NOTE_INDEX.nearest(frequency)
+
+
+@dataclass(frozen=True)
+class PitchEstimate:
+    """Результат анализа одного кадра."""
+
+    frequency: float  # Частота в Гц (0, если звук не найден)
+    confidence: float  # 0..1, чем выше — тем периодичнее сигнал
+    note: Note | None  # Ближайшая клавиша
+
+
+@dataclass
+class LatencyStats:
+    """Статистика времени обработки кадров."""
+
+    frames: int = 0
+    total: float = 0.0  # Суммарное время, с
+    worst: float = 0.0  # Самый долгий кадр, с
+    dropped_samples: int = 0  # Отброшено из-за отставания
+
+    @property
+    def mean(self) -> float:
+        """Среднее время обработки кадра, с."""
+        return self.total / self.frames if self.frames else 0.0
+
+    def add(self, elapsed: float) -> None:
+        """Учитывает время обработки одного кадра."""
+        self.frames += 1
+        self.total += elapsed
+        self.worst = max(self.worst, elapsed)
+
+
+def to_mono_float(samples: np.ndarray) -> np.ndarray:
+    """Приводит PCM (int16/float, моно/стерео) к моно float32 в [-1, 1]."""
+    data = np.asarray(samples)
+    if data.dtype.kind == "i":
+        data = data.astype(np.float32) / float(np.iinfo(data.dtype).max)
+    elif data.dtype.kind == "u":
+        info = np.iinfo(data.dtype)
+        data = (data.astype(np.float32) - (info.max + 1) / 2) / ((info.max + 1) / 2)
+    else:
+        data = data.astype(np.float32, copy=False)
+    if data.ndim == 2:
+        data = data.mean(axis=1, dtype=np.float32)
+    return data
+
+
+class PitchDetector:
+    """
+    Потоковый детектор высоты звука по алгоритму YIN.
+
+    Сэмплы подаются порциями произвольного размера через feed(); анализ
+    идёт по перекрывающимся кадрам FRAME_SIZE с шагом HOP_SIZE. Стоимость
+    кадра фиксирована (два БПФ), а при отставании старые сэмплы
+    отбрасываются, поэтому задержка ответа ограничена сверху.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        frame_size: int = FRAME_SIZE,
+        hop_size: int = HOP_SIZE,
+        threshold: float = 0.15,
+        min_rms: float = 0.01,
+        max_backlog_frames: int = 4,
+        reference_pitch: float = A4_FREQUENCY,
+    ) -> None:
+        """
+        Args:
+            sample_rate: Частота дискретизации входного сигнала
+            frame_size: Размер кадра анализа
+            hop_size: Шаг между кадрами
+            threshold: Порог нормированной разностной функции YIN
+            min_rms: Кадры тише этого уровня считаются тишиной
+            max_backlog_frames: Сколько необработанных шагов держать в буфере
+            reference_pitch: Частота A4, по которой частота сводится к клавише
+        """
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.hop_size = hop_size
+        self.threshold = threshold
+        self.min_rms = min_rms
+        self._window = frame_size // 2
+        self._max_buffer = frame_size + hop_size * max_backlog_frames
+        self._fft_size = 1 << (2 * frame_size - 1).bit_length()
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._note_index = note_index_for(reference_pitch)
+        self.latency = LatencyStats()
+
+    def set_reference_pitch(self, reference_pitch: float) -> None:
+        """Переключает строй: ноты определяются относительно нового A4."""
+        self._note_index = note_index_for(reference_pitch)
+
+    def reset(self) -> None:
+        """Очищает буфер (например, перед новым вопросом)."""
+        self._buffer = np.zeros(0, dtype=np.float32)
+
+    def feed(self, samples: np.ndarray) -> list[PitchEstimate]:
+        """Добавляет сэмплы и возвращает оценки для всех готовых кадров."""
+        chunk = to_mono_float(samples)
+        buffer = np.concatenate((self._buffer, chunk))
+
+        # Отставание: оставляем только свежий хвост
+        if len(buffer) > self._max_buffer:
+            excess = len(buffer) - self._max_buffer
+            self.latency.dropped_samples += excess
+            buffer = buffer[excess:]
+
+        estimates = []
+        start = 0
+        while start + self.frame_size <= len(buffer):
+            frame = buffer[start : start + self.frame_size]
+            began = time.perf_counter()
+            estimates.append(self.analyze_frame(frame))
+            self.latency.add(time.perf_counter() - began)
+            start += self.hop_size
+
+        self._buffer = buffer[start:]
+        return estimates
+
+    def analyze_frame(self, frame: np.ndarray) -> PitchEstimate:
+        """Оценивает основную частоту одного кадра."""
+        frame = frame.astype(np.float64)
+        frame -= frame.mean()
+        if np.sqrt(np.mean(frame * frame)) < self.min_rms:
+            return PitchEstimate(0.0, 0.0, None)
+
+        cmnd = self._cumulative_mean_normalized_difference(frame)
+        tau = self._pick_period(cmnd)
+        if tau is None:
+            return PitchEstimate(0.0, 0.0, None)
+
+        period = self._refine_period(cmnd, tau)
+        frequency = self.sample_rate / period
+        confidence = float(max(0.0, 1.0 - cmnd[tau]))
+        return PitchEstimate(frequency, confidence, self._note_index.nearest(frequency))
+
+    def _cumulative_mean_normalized_difference(self, frame: np.ndarray) -> np.ndarray:
+        """Разностная функция YIN, посчитанная через БПФ."""
+        w = self._window
+        n = self._fft_size
+        # Корреляция первых w сэмплов со всеми сдвигами 0..w
+        spectrum = np.fft.rfft(frame, n)
+        kernel = np.fft.rfft(frame[:w][::-1], n)
+        corr = np.fft.irfft(spectrum * kernel, n)[w - 1 : 2 * w]
+
+        # Энергия скользящего окна через кумулятивную сумму
+        energy = np.concatenate(([0.0], np.cumsum(frame * frame)))
+        e0 = energy[w]
+        e_tau = energy[w : 2 * w + 1] - energy[: w + 1]
+
+        diff = e0 + e_tau - 2.0 * corr
+        diff[0] = 0.0
+        np.maximum(diff, 0.0, out=diff)
+
+        cmnd = np.ones_like(diff)
+        running = np.cumsum(diff[1:])
+        taus = np.arange(1, len(diff))
+        np.divide(diff[1:] * taus, running, out=cmnd[1:], where=running > 0)
+        return cmnd
+
+    def _pick_period(self, cmnd: np.ndarray) -> int | None:
+        """Первый провал ниже порога (или глобальный минимум при его отсутствии)."""
+        # Не ищем выше C8 с запасом
+        tau_min = max(2, int(self.sample_rate / 4500))
+        below = np.flatnonzero(cmnd[tau_min:] < self.threshold)
+        if below.size:
+            tau = int(below[0]) + tau_min
+            # Спускаемся до локального минимума
+            while tau + 1 < len(cmnd) and cmnd[tau + 1] < cmnd[tau]:
+                tau += 1
+            return tau
+
+        tau = int(np.argmin(cmnd[tau_min:])) + tau_min
+        # Слабая периодичность — считаем, что тона нет
+        return tau if cmnd[tau] < 2 * self.threshold else None
+
+    @staticmethod
+    def _refine_period(cmnd: np.ndarray, tau: int) -> float:
+        """Уточняет период параболической интерполяцией."""
+        if tau <= 0 or tau >= len(cmnd) - 1:
+            return float(tau)
+        left, mid, right = cmnd[tau - 1], cmnd[tau], cmnd[tau + 1]
+        denom = left - 2 * mid + right
+        if denom == 0:
+            return float(tau)
+        return tau + 0.5 * (left - right) / denom
+
+
+class StableNoteTracker:
+    """Выдаёт ноту, когда она держится несколько кадров подряд."""
+
+    def __init__(self, frames_required: int = 4, min_confidence: float = 0.8) -> None:
+        self.frames_required = frames_required
+        self.min_confidence = min_confidence
+        self._candidate: Note | None = None
+        self._count = 0
+
+    def reset(self) -> None:
+        """Сбрасывает накопленное состояние."""
+        self._candidate = None
+        self._count = 0
+
+    def update(self, estimate: PitchEstimate) -> Note | None:
+        """Учитывает оценку; возвращает ноту один раз при стабилизации."""
+        note = estimate.note if estimate.confidence >= self.min_confidence else None
+        if note is None or note != self._candidate:
+            self._candidate = note
+            self._count = 1 if note is not None else 0
+            return None
+
+        self._count += 1
+        if self._count == self.frames_required:
+            return note
+        return None
+
+
+def generate_tone(
+    frequency: float,
+    duration: float,
+    sample_rate: int = SAMPLE_RATE,
+    amplitude: float = 0.5,
+    harmonics: int = 4,
+) -> np.ndarray:
+    """Синтезирует тон с обертонами (для проверки без микрофона)."""
+    t = np.arange(int(duration * sample_rate), dtype=np.float64) / sample_rate
+    tone = np.zeros_like(t)
+    for k in range(1, harmonics + 1):
+        tone += np.sin(2 * np.pi * frequency * k * t) / k
+    tone *= amplitude / np.max(np.abs(tone))
+    return tone.astype(np.float32)
+
+
+def read_wav(path) -> tuple[np.ndarray, int]:
+    """Читает WAV-файл (PCM) и возвращает моно float32 и частоту."""
+    import wave
+
+    with wave.open(str(path), "rb") as wav:
+        rate = wav.getframerate()
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        raw = wav.readframes(wav.getnframes())
+
+    dtypes = {1: np.uint8, 2: np.int16, 4: np.int32}
+    if width not in dtypes:
+        raise ValueError(f"Неподдерживаемая разрядность WAV: {width * 8} бит")
+    data = np.frombuffer(raw, dtype=dtypes[width]).reshape(-1, channels)
+    return to_mono_float(data), rate
+
+
+def iter_chunks(samples: np.ndarray, chunk_size: int = 512):
+    """Режет сигнал на порции, имитируя поток с микрофона."""
+    for start in range(0, len(samples), chunk_size):
+        yield samples[start : start + chunk_size]
@@ -1,14 +1,113 @@
 """Модуль воспроизведения звука нот."""
 
+import logging
 import os
 import random
 import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Sequence
 from pathlib import Path
 
 os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+import numpy as np
 import pygame
+import pygame.sndarray
 
-from piano_ear_trainer.data import PIANO_NOTES, Note
+from piano_ear_trainer.audio.bank import (
+    DEFAULT_LAYER,
+    DYNAMICS,
+    MixerFormat,
+    build_tuned_bank,
+    invalidate_tuned_banks,
+    is_standard_pitch,
+    sample_stem,
+    scan_layers,
+    split_stem,
+)
+from piano_ear_trainer.audio.formats import (
+    choose_bank,
+    detect_format,
+    is_complete_bank,
+)
+from piano_ear_trainer.audio.packs import (
+    USER_PACKS_DIR,
+    Manifest,
+    SamplePack,
+    diff_manifests,
+    file_stamps,
+    find_packs,
+    update_manifest,
+)
+from piano_ear_trainer.audio.reverb import (
+    ROOMS,
+    Convolver,
+    apply_reverb,
+    find_impulse_files,
+    impulse_from_pcm,
+    synthesize_impulse,
+)
+from piano_ear_trainer.audio.sequencer import DEFAULT_TEMPO, Sequencer
+from piano_ear_trainer.audio.shared import SharedBank, share_bank, shared_bank_name
+from piano_ear_trainer.data import A4_FREQUENCY, NOTES_BY_NAME, PIANO_NOTES, Note
+from piano_ear_trainer.metrics import REGISTRY
+
+_log = logging.getLogger(__name__)
+
+# Метрики воспроизведения
+_CACHE_HITS = REGISTRY.counter("sound_cache_hits_total", "Попадания в кэш звуков")
+_CACHE_MISSES = REGISTRY.counter("sound_cache_misses_total", "Промахи кэша звуков")
+_DECODE_SECONDS = REGISTRY.histogram(
+    "sample_decode_seconds", "Время декодирования семпла", labelnames=("note",)
+)
+_ACTIVE_CHANNELS = REGISTRY.gauge("mixer_active_channels", "Занятые каналы микшера")
+_CACHE_BYTES = REGISTRY.gauge(
+    "sound_cache_bytes", "PCM загруженных семплов", labelnames=("layer",)
+)
+_REVERB_CPU_SECONDS = REGISTRY.histogram(
+    "reverb_render_cpu_seconds", "Процессорное время свёртки одной ноты"
+)
+_REVERB_BYTES = REGISTRY.gauge("reverb_cache_bytes", "PCM нот с реверберацией")
+_PACK_RELOADED = REGISTRY.counter(
+    "sample_pack_reloaded_total", "Семплы, изменившиеся при смене набора"
+)
+_PACK_SWITCH_SECONDS = REGISTRY.histogram(
+    "sample_pack_switch_seconds", "Подготовка набора семплов в фоне"
+)
+_SHARED_SOUNDS = REGISTRY.counter(
+    "shared_bank_sounds_total", "Звуки, собранные из общего банка без декодирования"
+)
+_SHARED_BYTES = REGISTRY.gauge(
+    "shared_bank_bytes", "Сегмент общего банка в разделяемой памяти"
+)
+
+_MIXER_RESUME_SECONDS = REGISTRY.histogram(
+    "mixer_resume_seconds", "Открытие аудиоустройства после простоя"
+)
+_MIXER_SUSPENDED = REGISTRY.gauge(
+    "mixer_suspended", "Аудиоустройство закрыто на время простоя"
+)
+
+# Ключ ноты с реверберацией: (стем семпла, помещение, строй A4)
+ReverbKey = tuple[str, str, float]
+
+# Размер буфера микшера в сэмплах и число каналов (для глиссандо)
+MIXER_BUFFER = 512
+MIXER_CHANNELS = 32
+
+
+def _sound_bytes(sound: pygame.mixer.Sound) -> int:
+    """Размер PCM звука в памяти (без копирования буфера)."""
+    return pygame.sndarray.samples(sound).nbytes
+
+
+def _layer_bytes(cache: dict[str, pygame.mixer.Sound]) -> dict[str, int]:
+    """Объём PCM банка по слоям динамики."""
+    layer_bytes = dict.fromkeys(DYNAMICS, 0)
+    for stem, sound in cache.items():
+        layer_bytes[split_stem(stem)[1]] += _sound_bytes(sound)
+    return layer_bytes
 
 
 def _get_base_path() -> Path:
@@ -24,56 +123,901 @@ def _get_base_path() -> Path:
 class AudioPlayer:
     """Плеер для воспроизведения семплов нот."""
 
-    def __init__(self, samples_dir: Path | None = None) -> None:
+    def __init__(
+        self,
+        samples_dir: Path | None = None,
+        reference_pitch: float = A4_FREQUENCY,
+        impulses_dir: Path | None = None,
+        packs_dirs: Sequence[Path] | None = None,
+        shared_bank: bool = False,
+    ) -> None:
         """
         Инициализирует аудио плеер.
 
         Args:
-            samples_dir: Путь к папке с семплами. Если None, используется
-                        стандартный путь assets/samples/
+            samples_dir: Путь к папке с семплами. Если None, выбирается
+                        самый быстрый из банков в assets/ (см. formats)
+            reference_pitch: Частота A4 в Гц. Семплы записаны при 440 Гц,
+                        для другого строя банк перестраивается в фоне
+            impulses_dir: Папка с импульсными характеристиками помещений
+                        (по умолчанию assets/impulses)
+            packs_dirs: Папки наборов семплов для set_pack (по умолчанию
+                        assets/packs и ~/.piano_ear_trainer_packs)
+            shared_bank: Держать основной слой в разделяемой памяти, общей
+                        для всех процессов тренажёра (см. audio.shared)
         """
         # Инициализация pygame mixer
-        pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+        pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=MIXER_BUFFER)
         # Устанавливаем много каналов для одновременного воспроизведения (глиссандо)
-        pygame.mixer.set_num_channels(32)
+        pygame.mixer.set_num_channels(MIXER_CHANNELS)
+        # Формат, который выдало устройство: после простоя открываем такой же,
+        # иначе звуки в кэшах (PCM в этом формате) зазвучат неверно
+        self._mixer_format: MixerFormat = pygame.mixer.get_init()
+        self._suspended = False
 
         # Определяем путь к семплам
         if samples_dir is None:
             # Базовый путь (работает и для .exe, и для обычного запуска)
-            base_dir = _get_base_path()
-            # Сначала проверяем MP3 (реальные сэмплы пианино)
-            mp3_dir = base_dir / "assets" / "samples_mp3"
-            wav_dir = base_dir / "assets" / "samples"
-            if mp3_dir.exists():
-                samples_dir = mp3_dir
-                self._format = "mp3"
+            assets_dir = _get_base_path() / "assets"
+            # Из установленных банков берём самый быстрый для декодирования
+            bank = choose_bank(assets_dir, pygame.mixer.get_init())
+            if bank is not None:
+                self._format, samples_dir = bank
             else:
-                samples_dir = wav_dir
-                self._format = "wav"
+                self._format, samples_dir = "wav", assets_dir / "samples"
         else:
-            self._format = "wav"
+            self._format = detect_format(samples_dir)
 
         self.samples_dir = samples_dir
+        self._default_samples_dir = samples_dir
         self._current_note: Note | None = None
-        self._sounds_cache: dict[str, pygame.mixer.Sound] = {}
+        # Исходные семплы (440 Гц) загружаются лениво; ключ — sample_stem
+        self._base_cache: dict[str, pygame.mixer.Sound] = {}
+        # Активный банк: _base_cache или полностью собранный банк другого строя
+        self._sounds_cache: dict[str, pygame.mixer.Sound] = self._base_cache
+        # Слои динамики: установленные (одно чтение папки) и выбранные.
+        # Дополнительные слои загружаются только для выбранных нот
+        self._layers = scan_layers(samples_dir, self._format)
+        self._dynamics: tuple[str, ...] = (DEFAULT_LAYER,)
+        self._active_names: set[str] | None = None  # None — все ноты
+        # Объём PCM по слоям: исходные семплы и банк другого строя
+        self._base_bytes: dict[str, int] = dict.fromkeys(DYNAMICS, 0)
+        self._bank_bytes: dict[str, int] = self._base_bytes
+        self._reference_pitch = A4_FREQUENCY
+        self._requested_pitch = A4_FREQUENCY  # Строй последнего запроса
+        # Номер последнего запроса смены строя (устаревшие сборки отбрасываются)
+        self._tuning_generation = 0
+        self._tuning_thread: threading.Thread | None = None
+        self._tuning_error: str | None = None
+
+        # Наборы семплов: смена набора и сборка банка строя идут по очереди
+        if packs_dirs is None:
+            packs_dirs = [_get_base_path() / "assets" / "packs", USER_PACKS_DIR]
+        self._packs_dirs = list(packs_dirs)
+        self._pack: str | None = None  # None — встроенный банк
+        self._manifest: Manifest | None = None  # None — папка ещё не сканирована
+        # Размер и время изменения файлов при последнем сканировании
+        self._samples_stamps: dict[str, tuple[int, int]] | None = None
+        self._pack_request = 0  # Номер последнего запроса смены набора
+        self._pack_revision = 0
+        self._pack_thread: threading.Thread | None = None
+        self._bank_lock = threading.Lock()
+        # Общий банк основного слоя: подключается после сканирования папки
+        self._share_bank = shared_bank
+        self._shared: SharedBank | None = None
+
+        # Реверберация: ноты рендерятся в фоне, а play_note берёт готовый
+        # рендер из кэша (пока его нет — играет сухой семпл)
+        if impulses_dir is None:
+            impulses_dir = _get_base_path() / "assets" / "impulses"
+        self._impulse_files = find_impulse_files(impulses_dir)
+        self._room: str | None = None
+        self._convolvers: dict[str, Convolver] = {}
+        self._broken_rooms: set[str] = set()  # Импульсы, которые не прочитались
+        self._reverb_cache: dict[ReverbKey, pygame.mixer.Sound] = {}
+        self._reverb_bytes = 0
+        # Рекурсивная: загрузка семпла в фоновом рендере берёт её повторно
+        self._reverb_lock = threading.RLock()
+        self._reverb_condition = threading.Condition(self._reverb_lock)
+        self._reverb_queue: deque[ReverbKey] = deque()
+        # Номер сброса кэша: рендер, начатый до сброса, отбрасывается
+        self._reverb_generation = 0
+        self._reverb_thread: threading.Thread | None = None
+
+        self._sequencer = Sequencer(self._get_sound)
+        # Мелодии с реверберацией собираются только из готовых рендеров
+        self._reverb_sequencer = Sequencer(self._get_reverb_sound)
+        self.set_reference_pitch(reference_pitch)
+        # Манифест текущей папки: правки семплов с прошлого запуска
+        # сбрасывают только их рендеры в дисковом кэше строёв
+        self._start_pack_switch(samples_dir, self._format)
+        _ACTIVE_CHANNELS.set_function(self._count_active_channels)
+        for layer in DYNAMICS:
+            _CACHE_BYTES.labels(layer).set_function(
+                lambda layer=layer: self.cache_usage()[layer]
+            )
+        _REVERB_BYTES.set_function(lambda: self._reverb_bytes)
+        _MIXER_SUSPENDED.set_function(lambda: int(self._suspended))
+        _SHARED_BYTES.set_function(lambda: getattr(self._shared, "nbytes", 0))
+
+    @property
+    def is_suspended(self) -> bool:
+        """Закрыто ли аудиоустройство на время простоя."""
+        return self._suspended
+
+    def suspend(self) -> bool:
+        """
+        Закрывает аудиоустройство, если плеер простаивает.
+
+        Открытое устройство будит аудиопоток SDL на каждый буфер даже в
+        тишине. Звуки в кэшах остаются в памяти, поэтому resume() быстрый.
 
-    def _get_sound(self, note: Note) -> pygame.mixer.Sound:
-        """Получает звук ноты (с кэшированием)."""
-        if note.short_name not in self._sounds_cache:
+        Returns:
+            True, если устройство закрыто; False, если что-то звучит или
+            в фоне собирается банк (тогда стоит повторить позже)
+        """
+        with self._reverb_lock:
+            if self._suspended:
+                return True
+            if pygame.mixer.get_init() is None:
+                return False  # Уже освобождено в cleanup()
+            if (
+                pygame.mixer.get_busy()
+                or self.is_retuning
+                or self.is_switching_pack
+                or self._reverb_queue
+            ):
+                return False
+            pygame.mixer.quit()
+            self._suspended = True
+        return True
+
+    def resume(self) -> None:
+        """Снова открывает аудиоустройство после suspend() (если закрыто)."""
+        if not self._suspended:
+            return
+        with self._reverb_condition:
+            if not self._suspended:
+                return
+            started = time.perf_counter()
+            frequency, size, channels = self._mixer_format
+            pygame.mixer.init(
+                frequency=frequency,
+                size=size,
+                channels=channels,
+                buffer=MIXER_BUFFER,
+                allowedchanges=0,
+            )
+            pygame.mixer.set_num_channels(MIXER_CHANNELS)
+            self._suspended = False
+            _MIXER_RESUME_SECONDS.observe(time.perf_counter() - started)
+            # Фоновый рендер реверберации ждал устройство
+            self._reverb_condition.notify()
+
+    def _playback_stem(self, note: Note, layer: str) -> str:
+        """Стем семпла, которым активный банк сыграет ноту в слое layer."""
+        stem = sample_stem(note.short_name, self._resolve_layer(note, layer))
+        cache = self._sounds_cache
+        if cache is not self._base_cache and stem not in cache:
+            # Банк другого строя собран для выбранных слоёв и нот; пока он
+            # пересобирается, играем основным слоем, а не исходным строем
+            stem = note.short_name
+        return stem
+
+    def _get_sound(self, note: Note, layer: str = DEFAULT_LAYER) -> pygame.mixer.Sound:
+        """Получает звук ноты в слое динамики (с кэшированием)."""
+        return self._get_stem_sound(self._playback_stem(note, layer))
+
+    def _get_stem_sound(self, stem: str) -> pygame.mixer.Sound:
+        """Звук семпла из активного банка (исходные — из общего банка или с диска)."""
+        cache = self._sounds_cache
+        if stem not in cache:
+            # Банк читаем раньше папки: смена набора подменяет их в обратном
+            # порядке, и семпл прежнего набора не попадёт в новый банк
+            base = self._base_cache
+            shared = self._shared
+            if shared is not None:
+                sound = shared.make_sound(stem)
+                if sound is not None:
+                    # Не кэшируем: копия живёт, только пока звучит
+                    _SHARED_SOUNDS.inc()
+                    return sound
             # Формируем имя файла с правильным расширением
-            filename = f"{note.short_name}.{self._format}"
+            filename = f"{stem}.{self._format}"
             sample_path = self.samples_dir / filename
             if not sample_path.exists():
                 raise FileNotFoundError(f"Семпл не найден: {sample_path}")
-            self._sounds_cache[note.short_name] = pygame.mixer.Sound(str(sample_path))
-        return self._sounds_cache[note.short_name]
+            _CACHE_MISSES.inc()
+            started = time.perf_counter()
+            sound = pygame.mixer.Sound(str(sample_path))
+            short_name, layer = split_stem(stem)
+            _DECODE_SECONDS.labels(short_name).observe(time.perf_counter() - started)
+            # Семпл может загружать и фоновый рендер реверберации
+            with self._reverb_lock:
+                if base is not self._base_cache:
+                    return sound  # Набор сменился, пока семпл декодировался
+                if stem not in base:
+                    base[stem] = sound
+                    self._base_bytes[layer] += _sound_bytes(sound)
+                return base[stem]
+        _CACHE_HITS.inc()
+        return cache[stem]
+
+    def _resolve_layer(self, note: Note, layer: str) -> str:
+        """Слой, которым будет сыграна нота: основной, если нужного нет."""
+        if layer != DEFAULT_LAYER and note.short_name in self._layers.get(layer, ()):
+            return layer
+        return DEFAULT_LAYER
+
+    @property
+    def available_layers(self) -> list[str]:
+        """Установленные слои динамики, от тихого к громкому."""
+        return [layer for layer in DYNAMICS if layer in self._layers]
+
+    @property
+    def dynamics(self) -> tuple[str, ...]:
+        """Слои, из которых выбирается динамика вопросов."""
+        return self._dynamics
+
+    def set_dynamics(self, layers: Sequence[str]) -> None:
+        """
+        Задаёт слои динамики для вопросов.
+
+        Загруженные семплы невыбранных слоёв выгружаются; банк другого
+        строя пересобирается под новые слои.
+        """
+        dynamics = tuple(layer for layer in DYNAMICS if layer in layers)
+        if not dynamics:
+            dynamics = (DEFAULT_LAYER,)
+        if dynamics == self._dynamics:
+            return
+        self.resume()  # Выгрузка и пересборка трогают звуки
+        self._dynamics = dynamics
+        self._evict_layers()
+        self._refresh_tuned_bank()
+
+    def set_active_notes(self, notes: Iterable[Note]) -> None:
+        """Ноты выбранных октав: дополнительные слои нужны только для них."""
+        names = {note.short_name for note in notes}
+        if names == self._active_names:
+            return
+        self.resume()
+        self._active_names = names
+        self._evict_layers()
+        if self._dynamics != (DEFAULT_LAYER,):
+            self._refresh_tuned_bank()
+
+    def choose_layer(self) -> str:
+        """Случайный слой из выбранной динамики (для очередного вопроса)."""
+        return random.choice(self._dynamics)
+
+    def _is_layer_needed(self, stem: str) -> bool:
+        short_name, layer = split_stem(stem)
+        if layer == DEFAULT_LAYER:
+            return True  # Основной слой нужен и для свободной игры
+        return layer in self._dynamics and (
+            self._active_names is None or short_name in self._active_names
+        )
 
-    def play_note(self, note: Note) -> None:
-        """Воспроизводит указанную ноту."""
-        sound = self._get_sound(note)
+    def _evict_layers(self) -> None:
+        """Выгружает исходные семплы слоёв, которые больше не нужны."""
+        with self._reverb_lock:
+            for stem in [s for s in self._base_cache if not self._is_layer_needed(s)]:
+                sound = self._base_cache.pop(stem)
+                self._base_bytes[split_stem(stem)[1]] -= _sound_bytes(sound)
+        self._sequencer.clear()
+        self._reset_reverb()
+
+    def _refresh_tuned_bank(self) -> None:
+        """Пересобирает банк другого строя под новые слои или ноты."""
+        if not is_standard_pitch(self._requested_pitch):
+            self.set_reference_pitch(self._requested_pitch)
+
+    def cache_usage(self) -> dict[str, int]:
+        """Байт PCM в активном банке по слоям динамики."""
+        return dict(self._bank_bytes)
+
+    @staticmethod
+    def _count_active_channels() -> int:
+        """Число каналов микшера, которые сейчас звучат (для метрик)."""
+        if not pygame.mixer.get_init():
+            return 0
+        return sum(
+            pygame.mixer.Channel(i).get_busy()
+            for i in range(pygame.mixer.get_num_channels())
+        )
+
+    @property
+    def reference_pitch(self) -> float:
+        """Частота A4 активного банка, Гц."""
+        return self._reference_pitch
+
+    def set_reference_pitch(self, reference_pitch: float, wait: bool = False) -> None:
+        """
+        Переключает строй.
+
+        Банк для нового строя собирается в фоне (пул процессов + дисковый
+        кэш), а затем подменяет активный одним присваиванием: звучащие ноты
+        доигрывают, новые берутся уже из нового банка.
+
+        Args:
+            reference_pitch: Частота A4 в Гц
+            wait: Дождаться окончания сборки
+        """
+        self._tuning_generation += 1
+        generation = self._tuning_generation
+        self._tuning_error = None
+        self._requested_pitch = reference_pitch
+
+        if is_standard_pitch(reference_pitch):
+            self._sounds_cache = self._base_cache
+            self._bank_bytes = self._base_bytes
+            self._reference_pitch = A4_FREQUENCY
+            self._reset_reverb()
+            return
+
+        self.resume()  # Сборка декодирует семплы и создаёт звуки
+        self._tuning_thread = threading.Thread(
+            target=self._build_bank,
+            args=(reference_pitch, generation),
+            name="tuning-bank",
+            daemon=True,
+        )
+        self._tuning_thread.start()
+        if wait:
+            self._tuning_thread.join()
+
+    @property
+    def is_retuning(self) -> bool:
+        """Идёт ли сборка банка для нового строя."""
+        return self._tuning_thread is not None and self._tuning_thread.is_alive()
+
+    @property
+    def tuning_error(self) -> str | None:
+        """Ошибка сборки банка последнего строя (None — собран или собирается)."""
+        return self._tuning_error
+
+    def _build_bank(self, reference_pitch: float, generation: int) -> None:
+        """Собирает банк строя и делает его активным (фоновый поток)."""
+        try:
+            swapped = self._swap_tuned_bank(reference_pitch, generation)
+        except Exception as error:
+            _log.exception("Банк для A4 = %g Гц не собран", reference_pitch)
+            if generation == self._tuning_generation:
+                # Звучит прежний банк: возвращаем его строй
+                self._requested_pitch = self._reference_pitch
+                self._tuning_error = f"{type(error).__name__}: {error}"
+            return
+        if swapped:
+            self._reset_reverb()
+
+    def _swap_tuned_bank(self, reference_pitch: float, generation: int) -> bool:
+        """Собирает банк строя и подменяет активный; False — запрос устарел."""
+        # Не одновременно со сменой набора: банк собирается из текущей папки
+        with self._bank_lock:
+            if generation != self._tuning_generation:
+                return False
+            mixer_format = pygame.mixer.get_init()
+            if mixer_format is None:
+                return False
+            # Основной слой всех клавиш и выбранные слои для выбранных нот
+            stems = [note.short_name for note in PIANO_NOTES]
+            stems += [
+                stem
+                for note in PIANO_NOTES
+                for layer in self._dynamics
+                if self._resolve_layer(note, layer) != DEFAULT_LAYER
+                and self._is_layer_needed(stem := sample_stem(note.short_name, layer))
+            ]
+            paths = build_tuned_bank(
+                self.samples_dir,
+                self._format,
+                reference_pitch,
+                mixer_format,
+                stems=stems,
+            )
+            if generation != self._tuning_generation:
+                return False
+
+            bank = {
+                stem: pygame.sndarray.make_sound(np.load(path))
+                for stem, path in paths.items()
+            }
+            bank_bytes = _layer_bytes(bank)
+            if generation != self._tuning_generation:
+                return False
+            # Атомарная подмена: _get_sound берёт ссылку на словарь один раз
+            self._sounds_cache = bank
+            self._bank_bytes = bank_bytes
+            self._reference_pitch = reference_pitch
+        return True
+
+    @property
+    def packs(self) -> dict[str, SamplePack]:
+        """Установленные наборы семплов: имя -> набор."""
+        return find_packs(self._packs_dirs)
+
+    @property
+    def pack(self) -> str | None:
+        """Выбранный набор семплов (None — встроенный банк)."""
+        return self._pack
+
+    @property
+    def pack_revision(self) -> int:
+        """Номер подмены набора: растёт, когда меняется звучание нот."""
+        return self._pack_revision
+
+    @property
+    def is_switching_pack(self) -> bool:
+        """Готовится ли новый набор семплов."""
+        return self._pack_thread is not None and self._pack_thread.is_alive()
+
+    def set_pack(self, pack: str | None, wait: bool = False) -> None:
+        """
+        Переключает набор семплов по имени (None — встроенный банк).
+
+        Raises:
+            ValueError: Нет такого набора
+        """
+        if pack is None:
+            samples_dir = self._default_samples_dir
+        else:
+            packs = self.packs
+            if pack not in packs:
+                raise ValueError(f"Неизвестный набор семплов: {pack}")
+            samples_dir = packs[pack].directory
+        self.set_samples_dir(samples_dir, wait)
+        self._pack = pack
+
+    def set_samples_dir(self, samples_dir: Path, wait: bool = False) -> None:
+        """
+        Переключает папку семплов на лету.
+
+        Отличия от текущего набора находятся по манифесту хэшей файлов, и
+        из кэшей (в памяти и дисковых кэшей строёв) выгружаются только
+        изменившиеся семплы. Новые семплы декодируются в фоне, а до
+        подмены звучит прежний набор.
+
+        Args:
+            samples_dir: Папка с полным банком семплов
+            wait: Дождаться подмены
+
+        Raises:
+            ValueError: В папке нет полного банка семплов
+        """
+        sample_format = detect_format(samples_dir)
+        if not is_complete_bank(samples_dir, sample_format):
+            raise ValueError(f"Нет полного банка семплов: {samples_dir}")
+        self._start_pack_switch(samples_dir, sample_format, wait)
+
+    def reload_samples(self, wait: bool = False) -> None:
+        """Перечитывает текущий набор: подгружаются только изменённые файлы."""
+        self._start_pack_switch(self.samples_dir, self._format, wait)
+
+    def reload_samples_if_modified(self) -> bool:
+        """
+        Перечитывает набор, только если его файлы менялись с прошлого сканирования.
+
+        Сравниваются размер и время изменения каждого файла (одно чтение
+        папки, как в update_manifest), поэтому замечены и добавленные или
+        удалённые семплы, и перезаписанные на месте. Хэшируются при
+        перечитывании только отличающиеся файлы.
+
+        Returns:
+            True, если перечитывание запущено
+        """
+        if self.is_switching_pack:
+            return False
+        if file_stamps(self.samples_dir, self._format) == self._samples_stamps:
+            return False
+        self.reload_samples()
+        return True
+
+    def _start_pack_switch(
+        self, samples_dir: Path, sample_format: str, wait: bool = False
+    ) -> None:
+        self.resume()  # Новые семплы декодируются в фоне
+        self._pack_request += 1
+        self._pack_thread = threading.Thread(
+            target=self._switch_pack,
+            args=(samples_dir, sample_format, self._pack_request),
+            name="sample-pack",
+            daemon=True,
+        )
+        self._pack_thread.start()
+        if wait:
+            self._pack_thread.join()
+
+    def _switch_pack(self, samples_dir: Path, sample_format: str, request: int) -> None:
+        """Готовит изменившиеся семплы набора и подменяет банки (фоновый поток)."""
+        with self._bank_lock:
+            if request != self._pack_request:
+                return  # Уже запрошен другой набор
+            started = time.perf_counter()
+            # Отпечатки файлов — до сканирования: правки во время него
+            # вызовут повторное
+            stamps = file_stamps(samples_dir, sample_format)
+            manifest, modified = update_manifest(samples_dir, sample_format)
+            if modified:
+                invalidate_tuned_banks(samples_dir, modified)
+            same_dir = samples_dir.resolve() == self.samples_dir.resolve()
+            if self._manifest is None:
+                changed = modified  # Первое сканирование текущей папки
+            else:
+                changed = diff_manifests(self._manifest, manifest)
+                if same_dir:
+                    changed |= modified  # Правки, замеченные другим окном
+            if same_dir and sample_format == self._format and not changed:
+                self._manifest = manifest
+                self._samples_stamps = stamps
+                if self._share_bank:
+                    self._update_shared_bank(request)
+                return
+
+            # Пока готовятся новые семплы, играет прежний набор
+            base = self._base_cache
+            decoded = {}
+            for stem in [s for s in list(base) if s in changed and s in manifest]:
+                with self._reverb_lock:
+                    if pygame.mixer.get_init() is None:
+                        return
+                    path = samples_dir / f"{stem}.{sample_format}"
+                    decoded[stem] = pygame.mixer.Sound(str(path))
+            tuned = self._sounds_cache
+            tuned_bank = None
+            if tuned is not base:
+                mixer_format = pygame.mixer.get_init()
+                if mixer_format is None:
+                    return
+                stems = [s for s in tuned if s in changed and s in manifest]
+                paths = build_tuned_bank(
+                    samples_dir,
+                    sample_format,
+                    self._reference_pitch,
+                    mixer_format,
+                    stems=stems,
+                )
+                tuned_bank = {
+                    s: sound for s, sound in tuned.items() if s not in changed
+                }
+                for stem, path in paths.items():
+                    tuned_bank[stem] = pygame.sndarray.make_sound(np.load(path))
+            layers = scan_layers(samples_dir, sample_format)
+            layers_changed = layers != self._layers
+
+            with self._reverb_lock:
+                if request != self._pack_request or pygame.mixer.get_init() is None:
+                    return
+                # Семплы, загруженные за время подготовки, тоже переносим
+                new_base = {
+                    stem: sound
+                    for stem, sound in self._base_cache.items()
+                    if stem not in changed
+                }
+                new_base.update(decoded)
+                # Папка раньше банка (см. _get_stem_sound)
+                self.samples_dir = samples_dir
+                self._format = sample_format
+                self._layers = layers
+                self._manifest = manifest
+                self._samples_stamps = stamps
+                self._base_cache = new_base
+                self._base_bytes = _layer_bytes(new_base)
+                if tuned_bank is not None and self._sounds_cache is tuned:
+                    self._sounds_cache = tuned_bank
+                    self._bank_bytes = _layer_bytes(tuned_bank)
+                else:
+                    # Строй стандартный (или вернулся к нему за время подготовки)
+                    self._sounds_cache = new_base
+                    self._bank_bytes = self._base_bytes
+                self._pack_revision += 1
+                # Общий банк с изменившимися семплами больше не подходит
+                stale_shared = self._shared
+                if stale_shared is not None and changed.isdisjoint(stale_shared):
+                    stale_shared = None
+                else:
+                    self._shared = None
+                # Рендеры реверберации неизменившихся нот остаются
+                self._reverb_generation += 1
+                for key in [k for k in self._reverb_cache if k[0] in changed]:
+                    self._reverb_bytes -= _sound_bytes(self._reverb_cache.pop(key))
+            _PACK_RELOADED.inc(len(changed))
+            _PACK_SWITCH_SECONDS.observe(time.perf_counter() - started)
+
+        changed_notes = {
+            NOTES_BY_NAME[name].midi_number
+            for name, _ in map(split_stem, changed)
+            if name in NOTES_BY_NAME
+        }
+        self._sequencer.discard(changed_notes)
+        self._reverb_sequencer.discard(changed_notes)
+        self._reset_reverb()
+        if layers_changed:
+            self._refresh_tuned_bank()  # В наборе другие слои динамики
+        if self._share_bank:
+            with self._bank_lock:
+                self._update_shared_bank(request, stale_shared, changed)
+            if stale_shared is not None:
+                stale_shared.close()
+
+    def _update_shared_bank(
+        self,
+        request: int,
+        previous: SharedBank | None = None,
+        changed: set[str] | None = None,
+    ) -> None:
+        """
+        Подключает общий банк основного слоя текущей папки (фоновый поток).
+
+        Банк ищется по хэшам семплов; если его ещё нет, процесс создаёт его
+        сам и декодирует только семплы, которых нет ни в кэше, ни в прежнем
+        банке. После подключения свои копии основного слоя выгружаются:
+        звуки собираются из общей памяти.
+
+        Args:
+            request: Номер запроса смены набора
+            previous: Банк прежнего набора
+            changed: Стемы, которые в прежнем банке устарели
+        """
+        stems = [note.short_name for note in PIANO_NOTES]
+        manifest = self._manifest or {}
+        digests = {stem: manifest[stem] for stem in stems if stem in manifest}
+        name = shared_bank_name(digests, self._mixer_format)
+        if self._shared is not None and self._shared.name == name:
+            return
+        samples_dir, sample_format = self.samples_dir, self._format
+
+        def decode() -> dict[str, np.ndarray] | None:
+            pcm = {}
+            for stem in stems:
+                with self._reverb_lock:
+                    if request != self._pack_request or pygame.mixer.get_init() is None:
+                        return None
+                    sound = self._base_cache.get(stem)
+                    if sound is None and previous is not None and stem not in changed:
+                        sound = previous.make_sound(stem)
+                    if sound is None:
+                        path = samples_dir / f"{stem}.{sample_format}"
+                        sound = pygame.mixer.Sound(str(path))
+                    pcm[stem] = pygame.sndarray.samples(sound)
+            return pcm
+
+        bank = share_bank(name, decode)
+        if bank is None:
+            return
+        with self._reverb_lock:
+            if request != self._pack_request or pygame.mixer.get_init() is None:
+                stale = bank
+            else:
+                stale, self._shared = self._shared, bank
+                # _base_cache меняем на месте: это может быть активный банк
+                for stem in [s for s in self._base_cache if s in bank]:
+                    sound = self._base_cache.pop(stem)
+                    self._base_bytes[DEFAULT_LAYER] -= _sound_bytes(sound)
+        if stale is not None:
+            stale.close()
+
+    @property
+    def rooms(self) -> dict[str, str]:
+        """Доступные помещения: имя -> подпись (синтетические и из файлов)."""
+        rooms = {name: room.description for name, room in ROOMS.items()}
+        rooms.update({name: name for name in self._impulse_files})
+        return rooms
+
+    @property
+    def room(self) -> str | None:
+        """Выбранное помещение (None — без реверберации)."""
+        return self._room
+
+    def set_room(self, room: str | None) -> None:
+        """
+        Включает реверберацию помещения room (None — выключает).
+
+        Ноты выбранных октав рендерятся в фоне; пока рендер ноты не готов,
+        она звучит без эффекта, поэтому play_note не ждёт свёртку.
+        """
+        if room is not None and room not in self.rooms:
+            raise ValueError(f"Неизвестное помещение: {room}")
+        if room == self._room:
+            return
+        self.resume()
+        self._room = room
+        self._reset_reverb()
+
+    @property
+    def reverb_cache_bytes(self) -> int:
+        """Байт PCM в кэше нот с реверберацией."""
+        return self._reverb_bytes
+
+    def reverb_pending(self) -> int:
+        """Сколько нот ещё ждут рендера реверберации."""
+        with self._reverb_lock:
+            return len(self._reverb_queue)
+
+    def _reverb_key(self, note: Note, layer: str) -> ReverbKey | None:
+        if self._room is None or self._room in self._broken_rooms:
+            return None
+        return self._playback_stem(note, layer), self._room, self._reference_pitch
+
+    def _get_reverb_sound(self, note: Note, layer: str) -> pygame.mixer.Sound:
+        """Рендер ноты с реверберацией (только для готовых, см. play_sequence)."""
+        return self._reverb_cache[self._reverb_key(note, layer)]
+
+    def _get_playback_sound(self, note: Note, layer: str) -> pygame.mixer.Sound:
+        """Звук для воспроизведения: с реверберацией, если рендер готов."""
+        key = self._reverb_key(note, layer)
+        if key is None:
+            return self._get_sound(note, layer)
+        sound = self._reverb_cache.get(key)
+        if sound is None:
+            # Нота вне прогрева (свободная игра) — рендерим к следующему разу
+            self._request_reverb([key], urgent=True)
+            return self._get_sound(note, layer)
+        return sound
+
+    def _reset_reverb(self) -> None:
+        """
+        Приводит кэш реверберации к текущим помещению, строю, слоям и октавам.
+
+        Остальные рендеры (другое помещение или строй, ноты свободной игры)
+        выгружаются, а недостающие ноты выбранных октав ставятся в очередь
+        фонового рендера.
+        """
+        self._reverb_sequencer.clear()
+        room, pitch = self._room, self._reference_pitch
+        keys: dict[ReverbKey, None] = {}
+        if room is not None and room not in self._broken_rooms:
+            names = self._active_names
+            notes = [n for n in PIANO_NOTES if names is None or n.short_name in names]
+            keys = dict.fromkeys(
+                (self._playback_stem(note, layer), room, pitch)
+                for note in notes
+                for layer in self._dynamics
+            )
+        with self._reverb_lock:
+            self._reverb_generation += 1
+            self._reverb_queue.clear()
+            for key in [key for key in self._reverb_cache if key not in keys]:
+                self._reverb_bytes -= _sound_bytes(self._reverb_cache.pop(key))
+        if keys:
+            self._request_reverb(keys, urgent=False)
+
+    def _request_reverb(self, keys: Iterable[ReverbKey], urgent: bool) -> None:
+        """Ставит ноты в очередь рендера (urgent — в начало очереди)."""
+        with self._reverb_condition:
+            for key in keys:
+                if key in self._reverb_cache or key in self._reverb_queue:
+                    continue
+                if urgent:
+                    self._reverb_queue.appendleft(key)
+                else:
+                    self._reverb_queue.append(key)
+            self._reverb_condition.notify()
+            if self._reverb_thread is None:
+                self._reverb_thread = threading.Thread(
+                    target=self._reverb_worker, name="reverb", daemon=True
+                )
+                self._reverb_thread.start()
+
+    def _reverb_worker(self) -> None:
+        """Фоновый рендер нот с реверберацией (поток живёт до выхода)."""
+        while True:
+            with self._reverb_condition:
+                while not self._reverb_queue or self._suspended:
+                    self._reverb_condition.wait()
+                key = self._reverb_queue.popleft()
+                generation = self._reverb_generation
+            stem, room, pitch = key
+            started = time.thread_time()
+            # С микшером работаем под блокировкой: cleanup закрывает его под ней же
+            with self._reverb_lock:
+                if (room, pitch) != (self._room, self._reference_pitch):
+                    continue  # Помещение или строй сменились — рендер не нужен
+                if key in self._reverb_cache:
+                    continue  # Запрошен повторно, пока рендерился
+                if self._suspended:
+                    self._reverb_queue.appendleft(key)
+                    continue
+                if pygame.mixer.get_init() is None:
+                    return
+                if (
+                    room not in self._convolvers
+                    and room not in ROOMS
+                    and not self._load_impulse(room)
+                ):
+                    continue
+                mixer_format = pygame.mixer.get_init()
+                source = pygame.sndarray.samples(self._get_stem_sound(stem))
+            pcm = apply_reverb(source, self._get_convolver(room, mixer_format))
+            with self._reverb_lock:
+                if generation != self._reverb_generation:
+                    continue
+                if self._suspended:
+                    # Устройство закрыли на время простоя — доделаем после
+                    self._reverb_queue.appendleft(key)
+                    continue
+                if pygame.mixer.get_init() is None:
+                    return
+                sound = pygame.sndarray.make_sound(pcm)
+                self._reverb_cache[key] = sound
+                self._reverb_bytes += _sound_bytes(sound)
+            _REVERB_CPU_SECONDS.observe(time.thread_time() - started)
+
+    def _load_impulse(self, room: str) -> bool:
+        """
+        Читает импульсный отклик помещения из файла (под _reverb_lock).
+
+        Нечитаемый файл не останавливает фоновый рендер: помещение
+        запоминается как сломанное, его ноты убираются из очереди и
+        играют без реверберации.
+
+        Returns:
+            True, если свёртка для помещения готова
+        """
+        impulse_path = self._impulse_files[room]
+        try:
+            impulse_pcm = pygame.sndarray.array(pygame.mixer.Sound(str(impulse_path)))
+            impulse = impulse_from_pcm(room, impulse_pcm)
+        except (pygame.error, ValueError):
+            _log.exception("Импульсный отклик %s не прочитан", impulse_path)
+            self._broken_rooms.add(room)
+            self._reverb_queue = deque(k for k in self._reverb_queue if k[1] != room)
+            return False
+        self._convolvers[room] = Convolver(impulse)
+        return True
+
+    def _get_convolver(self, room: str, mixer_format: MixerFormat) -> Convolver:
+        """Свёртка для помещения (синтетическая характеристика готовится один раз)."""
+        convolver = self._convolvers.get(room)
+        if convolver is None:
+            frequency, _, channels = mixer_format
+            impulse = synthesize_impulse(ROOMS[room], frequency, channels)
+            convolver = self._convolvers[room] = Convolver(impulse)
+        return convolver
+
+    def get_pcm(self, note: Note, layer: str = DEFAULT_LAYER) -> np.ndarray:
+        """
+        PCM звука ноты в формате микшера.
+
+        Возвращается вид на буфер звука без копирования — его нельзя
+        изменять (флаг writeable у видов pygame не трогаем: pygame 2.6
+        при этом теряет ссылку на None).
+        """
+        # Звуки pygame без открытого устройства трогать нельзя
+        self.resume()
+        return pygame.sndarray.samples(self._get_sound(note, layer))
+
+    @property
+    def sample_rate(self) -> int:
+        """Частота дискретизации микшера, Гц."""
+        return self._mixer_format[0]
+
+    def play_note(self, note: Note, layer: str = DEFAULT_LAYER) -> None:
+        """Воспроизводит указанную ноту (в слое динамики layer)."""
+        self.resume()
+        sound = self._get_playback_sound(note, layer)
         sound.play()
         self._current_note = note
 
+    def play_sequence(
+        self,
+        notes: list[Note],
+        tempo_bpm: float = DEFAULT_TEMPO,
+        layer: str = DEFAULT_LAYER,
+    ) -> None:
+        """Воспроизводит последовательность нот с точными долями."""
+        self.resume()
+        keys = [self._reverb_key(note, layer) for note in notes]
+        if self._room is not None and all(k in self._reverb_cache for k in keys):
+            sound = self._reverb_sequencer.render(
+                notes, tempo_bpm, (self._reference_pitch, self._room), layer
+            )
+        else:
+            sound = self._sequencer.render(
+                notes, tempo_bpm, self._reference_pitch, layer
+            )
+        sound.play()
+
     def play_random_note(self) -> Note:
         """Выбирает и воспроизводит случайную ноту."""
         note = random.choice(PIANO_NOTES)
@@ -91,10 +1035,22 @@ class AudioPlayer:
         """Возвращает текущую ноту."""
         return self._current_note
 
+    @property
+    def is_playing(self) -> bool:
+        """Звучит ли что-нибудь (вопрос, ответ или мелодия)."""
+        return pygame.mixer.get_init() is not None and pygame.mixer.get_busy()
+
     def stop(self) -> None:
         """Останавливает воспроизведение."""
-        pygame.mixer.stop()
+        if pygame.mixer.get_init() is not None:
+            pygame.mixer.stop()
 
     def cleanup(self) -> None:
         """Освобождает ресурсы."""
-        pygame.mixer.quit()
+        with self._reverb_lock:
+            self._room = None
+            self._reverb_queue.clear()
+            pygame.mixer.quit()
+            shared, self._shared = self._shared, None
+        if shared is not None:
+            shared.close()
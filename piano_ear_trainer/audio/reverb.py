@@ -0,0 +1,197 @@
+"""Акустика помещения: свёртка семплов с импульсной характеристикой (БПФ)."""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+# Импульсные характеристики из файлов (любой формат, который читает микшер)
+IMPULSE_EXTENSIONS = (".wav", ".flac", ".ogg", ".mp3")
+
+# Полосы синтетической реверберации: верхняя граница, Гц, и доля RT60 —
+# высокие частоты затухают быстрее (поглощение воздухом и стенами)
+_DECAY_BANDS = ((500.0, 1.15), (2000.0, 1.0), (6000.0, 0.7), (None, 0.45))
+
+
+@dataclass(frozen=True)
+class Room:
+    """Синтетическое помещение: параметры для генерации импульсной характеристики."""
+
+    name: str
+    description: str
+    rt60: float  # Время затухания на 60 дБ, с
+    predelay: float  # Задержка первого отражения, с
+    wet: float  # Уровень реверберации относительно прямого звука
+
+
+# Реестр помещений: имя -> помещение
+ROOMS: dict[str, Room] = {}
+
+
+def register_room(room: Room) -> None:
+    """Добавляет помещение в реестр."""
+    ROOMS[room.name] = room
+
+
+register_room(Room("classroom", "Класс", rt60=0.6, predelay=0.004, wet=0.35))
+register_room(Room("hall", "Концертный зал", rt60=1.9, predelay=0.02, wet=0.45))
+register_room(Room("church", "Собор", rt60=3.5, predelay=0.035, wet=0.5))
+
+
+@dataclass(frozen=True)
+class ImpulseResponse:
+    """Импульсная характеристика в формате микшера, готовая к свёртке."""
+
+    name: str
+    pcm: np.ndarray  # float32 (отсчёты, каналы), энергия каждого канала = 1
+    wet: float
+
+    @property
+    def nbytes(self) -> int:
+        """Размер в памяти."""
+        return self.pcm.nbytes
+
+
+def _normalize(pcm: np.ndarray) -> np.ndarray:
+    """Единичная энергия каждого канала: громкость хвоста не зависит от длины."""
+    energy = np.sqrt((pcm.astype(np.float64) ** 2).sum(axis=0))
+    return (pcm / np.where(energy > 0, energy, 1.0)).astype(np.float32)
+
+
+def synthesize_impulse(
+    room: Room, sample_rate: int, channels: int = 2, seed: int = 0
+) -> ImpulseResponse:
+    """
+    Генерирует импульсную характеристику помещения.
+
+    Диффузный хвост — шум, разбитый на полосы с разным временем затухания;
+    ранние отражения — редкие импульсы в первые ~80 мс. Каналы
+    декоррелированы (разный шум), поэтому хвост звучит объёмно.
+    """
+    rng = np.random.default_rng(seed)
+    length = int((room.predelay + room.rt60) * sample_rate)
+    predelay = int(room.predelay * sample_rate)
+    tail_length = length - predelay
+    t = np.arange(tail_length, dtype=np.float64)[:, None] / sample_rate
+
+    # Шум по полосам: маска в частотной области, своя огибающая у каждой полосы
+    spectrum = np.fft.rfft(rng.standard_normal((tail_length, channels)), axis=0)
+    freqs = np.fft.rfftfreq(tail_length, 1.0 / sample_rate)[:, None]
+    tail = np.zeros((tail_length, channels))
+    low = 0.0
+    for high, factor in _DECAY_BANDS:
+        mask = (freqs >= low) & (freqs < (high or np.inf))
+        band = np.fft.irfft(spectrum * mask, n=tail_length, axis=0)
+        # -60 дБ за rt60: exp(-ln(1000) * t / rt60)
+        tail += band * np.exp(-6.907755 * t / (room.rt60 * factor))
+        low = high or 0.0
+
+    pcm = np.zeros((length, channels))
+    pcm[predelay:] = tail
+    # Ранние отражения: слабее и реже по мере удаления
+    early_end = min(int(0.08 * sample_rate), tail_length)
+    for _ in range(12):
+        offset = predelay + int(rng.integers(0, max(early_end, 1)))
+        gain = 4.0 * (1.0 - (offset - predelay) / max(early_end, 1))
+        pcm[offset, int(rng.integers(0, channels))] += gain * rng.choice((-1, 1))
+    return ImpulseResponse(room.name, _normalize(pcm), room.wet)
+
+
+def impulse_from_pcm(name: str, pcm: np.ndarray, wet: float = 0.4) -> ImpulseResponse:
+    """Импульсная характеристика из PCM микшера (например, записанная в зале)."""
+    data = np.asarray(pcm, dtype=np.float32)
+    if data.ndim == 1:
+        data = data[:, None]
+    # Тишина до прямого звука не нужна: она только удлиняет свёртку
+    peak = np.abs(data).max(axis=1)
+    start = int(np.argmax(peak > peak.max() * 0.01)) if peak.any() else 0
+    return ImpulseResponse(name, _normalize(data[start:]), wet)
+
+
+def find_impulse_files(directory: Path) -> dict[str, Path]:
+    """Файлы импульсных характеристик в папке: имя -> путь."""
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return {}
+    return {
+        Path(entry.name).stem: Path(entry.path)
+        for entry in sorted(entries, key=lambda e: e.name)
+        if entry.name.lower().endswith(IMPULSE_EXTENSIONS)
+    }
+
+
+def _fft_size(ir_length: int) -> int:
+    """Размер БПФ: степень двойки, в половину которой помещается хвост свёртки."""
+    size = 1024
+    while size // 2 < ir_length - 1:
+        size *= 2
+    return size
+
+
+class Convolver:
+    """
+    Свёртка overlap-add с одной импульсной характеристикой.
+
+    Спектр характеристики считается один раз. Сигнал режется на блоки
+    длиной в половину БПФ, все блоки преобразуются одним вызовом rfft,
+    а хвост каждого блока (не длиннее блока) ложится на следующий.
+    """
+
+    def __init__(self, impulse: ImpulseResponse) -> None:
+        self.impulse = impulse
+        self.fft_size = _fft_size(len(impulse.pcm))
+        self.block = self.fft_size // 2
+        # (каналы, 1, частоты) — транслируется на (каналы, блоки, частоты)
+        self._spectrum = np.fft.rfft(impulse.pcm.T, n=self.fft_size, axis=-1)[
+            :, None, :
+        ]
+
+    def convolve(self, signal: np.ndarray) -> np.ndarray:
+        """
+        Свёртка сигнала (отсчёты, каналы) с характеристикой.
+
+        Длина результата — len(signal) + len(impulse) - 1. Моно-характеристика
+        применяется ко всем каналам, стерео — поканально.
+        """
+        length = len(signal) + len(self.impulse.pcm) - 1
+        blocks = -(-len(signal) // self.block)
+        padded = np.zeros((signal.shape[1], blocks * self.block), dtype=np.float32)
+        padded[:, : len(signal)] = signal.T
+        segments = np.fft.irfft(
+            np.fft.rfft(
+                padded.reshape(signal.shape[1], blocks, self.block),
+                n=self.fft_size,
+                axis=-1,
+            )
+            * self._spectrum,
+            n=self.fft_size,
+            axis=-1,
+        )
+        # Overlap-add: первая половина сегмента — свой блок, вторая — следующий
+        out = np.zeros((signal.shape[1], blocks + 1, self.block))
+        out[:, :-1] += segments[:, :, : self.block]
+        out[:, 1:] += segments[:, :, self.block :]
+        return out.reshape(signal.shape[1], -1)[:, :length].T
+
+
+def apply_reverb(pcm: np.ndarray, convolver: Convolver) -> np.ndarray:
+    """
+    Семпл в помещении: прямой звук плюс свёртка, в формате исходного PCM.
+
+    Если сумма выходит за пределы int16, результат уменьшается целиком
+    (без клиппинга), чтобы атака не искажалась.
+    """
+    dry = np.asarray(pcm, dtype=np.float32)
+    mono = dry.ndim == 1
+    if mono:
+        dry = dry[:, None]
+    out = convolver.convolve(dry) * convolver.impulse.wet
+    out[: len(dry)] += dry
+    info = np.iinfo(pcm.dtype)
+    peak = float(np.abs(out).max())
+    if peak > info.max:
+        out *= info.max / peak
+    result = out.astype(pcm.dtype)
+    return result[:, 0] if mono else np.ascontiguousarray(result)
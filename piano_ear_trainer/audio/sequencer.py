@@ -0,0 +1,103 @@
+"""Секвенсор: рендер последовательности нот в один PCM-буфер."""
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Sequence
+
+import numpy as np
+import pygame
+import pygame.sndarray
+
+from piano_ear_trainer.audio.bank import DEFAULT_LAYER
+from piano_ear_trainer.data import Note
+
+# Темп мелодического диктанта по умолчанию, ударов в минуту
+DEFAULT_TEMPO = 80
+
+
+def beat_onsets(count: int, tempo_bpm: float, sample_rate: int) -> np.ndarray:
+    """Позиции начала нот (в сэмплах) для равномерной последовательности."""
+    samples_per_beat = sample_rate * 60.0 / tempo_bpm
+    return np.round(np.arange(count) * samples_per_beat).astype(np.int64)
+
+
+def mix_at_onsets(pcms: Sequence[np.ndarray], onsets: np.ndarray) -> np.ndarray:
+    """
+    Смешивает семплы, начиная каждый точно со своего сэмпла onset.
+
+    Хвосты нот перекрываются со следующими нотами, как на живом
+    инструменте. При перегрузке буфер масштабируется, чтобы не было клиппинга.
+    """
+    length = max(int(onset) + len(pcm) for pcm, onset in zip(pcms, onsets, strict=True))
+    out = np.zeros((length, *pcms[0].shape[1:]), dtype=np.float32)
+    for pcm, onset in zip(pcms, onsets, strict=True):
+        out[onset : onset + len(pcm)] += pcm
+
+    limit = np.iinfo(np.int16).max
+    peak = float(np.max(np.abs(out))) if length else 0.0
+    if peak > limit:
+        out *= limit / peak
+    return out.astype(np.int16)
+
+
+class Sequencer:
+    """
+    Рендерит последовательности нот в звуки микшера с кэшированием.
+
+    Вся мелодия — один pygame.mixer.Sound, поэтому моменты начала нот
+    определяются позицией в буфере, а не таймерами GUI-потока.
+    """
+
+    def __init__(
+        self,
+        get_sound: Callable[[Note, str], pygame.mixer.Sound],
+        cache_size: int = 32,
+    ) -> None:
+        """
+        Args:
+            get_sound: Источник звука ноты в слое динамики (кэш плеера)
+            cache_size: Сколько отрендеренных последовательностей хранить
+        """
+        self._get_sound = get_sound
+        self._cache_size = cache_size
+        self._cache: OrderedDict[Hashable, pygame.mixer.Sound] = OrderedDict()
+
+    def render(
+        self,
+        notes: Sequence[Note],
+        tempo_bpm: float = DEFAULT_TEMPO,
+        bank_key: Hashable = None,
+        layer: str = DEFAULT_LAYER,
+    ) -> pygame.mixer.Sound:
+        """
+        Возвращает звук последовательности (из кэша или рендерит заново).
+
+        Args:
+            notes: Ноты по порядку
+            tempo_bpm: Темп, одна нота на удар
+            bank_key: Идентификатор банка семплов (например, строй)
+            layer: Слой динамики, которым играется вся мелодия
+        """
+        key = (tuple(n.midi_number for n in notes), tempo_bpm, bank_key, layer)
+        sound = self._cache.get(key)
+        if sound is not None:
+            self._cache.move_to_end(key)
+            return sound
+
+        sample_rate = pygame.mixer.get_init()[0]
+        pcms = [pygame.sndarray.array(self._get_sound(n, layer)) for n in notes]
+        onsets = beat_onsets(len(notes), tempo_bpm, sample_rate)
+        sound = pygame.sndarray.make_sound(mix_at_onsets(pcms, onsets))
+
+        self._cache[key] = sound
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return sound
+
+    def discard(self, midi_numbers: set[int]) -> None:
+        """Удаляет из кэша последовательности, в которых звучит хоть одна из нот."""
+        for key in [k for k in self._cache if not midi_numbers.isdisjoint(k[0])]:
+            del self._cache[key]
+
+    def clear(self) -> None:
+        """Очищает кэш отрендеренных последовательностей."""
+        self._cache.clear()
@@ -0,0 +1,328 @@
+"""Банк семплов в разделяемой памяти: одна копия PCM на все процессы тренажёра.
+
+Первый процесс декодирует основной слой в сегмент multiprocessing.shared_memory
+с маленьким индексом (стем -> смещение и размер PCM), остальные подключаются
+к нему и собирают звуки без декодирования. Имя сегмента — хэш содержимого
+семплов и формата микшера, поэтому окна с одинаковым набором находят один
+сегмент, а правка семпла даёт новое имя.
+
+Сегмент удаляет последний процесс, который им пользуется: на POSIX каждый
+процесс отмечается файлом в кэше (на Windows память освобождает сама ОС).
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+import numpy as np
+import pygame
+
+from piano_ear_trainer.audio.bank import MixerFormat, get_cache_root
+
+# Переменная окружения для включения (выключено по умолчанию)
+SHARED_BANK_ENV = "PIANO_EAR_TRAINER_SHARED_BANK"
+
+# Заголовок сегмента: сигнатура, готовность, PID создателя, длина индекса
+_HEADER = struct.Struct("<4sIII")
+_MAGIC = b"PETB"
+_READY_OFFSET = 4
+# Выравнивание PCM в сегменте, байт
+_ALIGN = 64
+
+# Сколько ждать, пока другой процесс заполняет сегмент, с
+ATTACH_TIMEOUT = 10.0
+
+# Учёт процессов, подключённых к сегментам (только POSIX)
+_TRACK_USERS = os.name != "nt"
+
+
+def is_shared_bank_enabled() -> bool:
+    """Включён ли общий банк через переменную окружения."""
+    return os.environ.get(SHARED_BANK_ENV, "") not in ("", "0")
+
+
+def shared_bank_name(digests: Mapping[str, str], mixer_format: MixerFormat) -> str:
+    """
+    Имя сегмента для семплов с хэшами digests в формате микшера.
+
+    Args:
+        digests: Стем -> хэш содержимого файла (см. packs.update_manifest)
+        mixer_format: Формат микшера, в котором хранится PCM
+    """
+    key = json.dumps([list(mixer_format), sorted(digests.items())])
+    # Короткое имя: на macOS оно ограничено 31 символом
+    return "pet-" + hashlib.sha1(key.encode()).hexdigest()[:20]
+
+
+def _aligned(size: int) -> int:
+    return -(-size // _ALIGN) * _ALIGN
+
+
+def _data_start(index_length: int) -> int:
+    """Смещение PCM в сегменте: сразу за заголовком и индексом."""
+    return _aligned(_HEADER.size + index_length)
+
+
+def _users_dir() -> Path:
+    return get_cache_root() / "shared"
+
+
+def _open_memory(name: str, create: bool = False, size: int = 0) -> SharedMemory:
+    """Открывает сегмент без слежения resource_tracker: удаляем его сами."""
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name, create, size, track=False)
+    memory = SharedMemory(name, create, size)
+    if _TRACK_USERS:
+        # До 3.13 resource_tracker удаляет сегмент при выходе любого процесса,
+        # который к нему подключился, — даже если им пользуются другие
+        resource_tracker.unregister(memory._name, "shared_memory")
+    return memory
+
+
+def _unlink_memory(memory: SharedMemory) -> None:
+    if sys.version_info < (3, 13) and _TRACK_USERS:
+        # unlink() снимает регистрацию, которую _open_memory уже сняла
+        resource_tracker.register(memory._name, "shared_memory")
+    memory.unlink()
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Процесс чужого пользователя
+    return True
+
+
+def _live_users(name: str) -> list[Path]:
+    """Файлы живых процессов сегмента; файлы завершившихся удаляются."""
+    users = []
+    with contextlib.suppress(OSError):
+        for entry in os.scandir(_users_dir()):
+            stem, _, pid = entry.name.rpartition(".")
+            if stem != name or not pid.isdigit():
+                continue
+            if _is_alive(int(pid)):
+                users.append(Path(entry.path))
+            else:
+                with contextlib.suppress(OSError):
+                    os.unlink(entry.path)
+    return users
+
+
+def collect_stale_banks() -> int:
+    """
+    Удаляет сегменты, все процессы которых завершились (например, упали).
+
+    Returns:
+        Число удалённых сегментов
+    """
+    if not _TRACK_USERS:
+        return 0
+    try:
+        names = {entry.name.rpartition(".")[0] for entry in os.scandir(_users_dir())}
+    except OSError:
+        return 0
+    removed = 0
+    for name in names:
+        if _live_users(name):
+            continue
+        with contextlib.suppress(FileNotFoundError):
+            memory = _open_memory(name)
+            memory.close()
+            _unlink_memory(memory)
+            removed += 1
+    return removed
+
+
+class SharedBank:
+    """
+    Подключение к сегменту с PCM семплов (процесс только читает его).
+
+    Звуки pygame всегда владеют копией PCM, поэтому make_sound копирует
+    семпл из сегмента: это в сотни раз быстрее декодирования, а звук
+    освобождается, как только доиграет.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        memory: SharedMemory,
+        index: Mapping[str, list[int]],
+        data_start: int,
+    ) -> None:
+        """
+        Args:
+            name: Имя сегмента
+            memory: Открытый сегмент
+            index: Стем -> [смещение от начала PCM, размер], байт
+            data_start: Смещение PCM в сегменте
+        """
+        self.name = name
+        self._memory = memory
+        self._index: dict[str, tuple[int, int]] = {
+            stem: (data_start + offset, size) for stem, (offset, size) in index.items()
+        }
+        # close() не должен освободить память посреди make_sound
+        self._lock = threading.Lock()
+        self._closed = False
+        self._user_file: Path | None = None
+        if _TRACK_USERS:
+            user_file = _users_dir() / f"{name}.{os.getpid()}"
+            with contextlib.suppress(OSError):
+                user_file.parent.mkdir(parents=True, exist_ok=True)
+                user_file.touch()
+                self._user_file = user_file
+
+    @classmethod
+    def attach(cls, name: str, timeout: float = ATTACH_TIMEOUT) -> "SharedBank | None":
+        """
+        Подключается к готовому сегменту name.
+
+        Если сегмент ещё заполняется, ждёт до timeout секунд. Сегмент,
+        создатель которого упал, не дописав его, удаляется.
+
+        Returns:
+            Банк или None, если сегмента нет (или он не готов)
+        """
+        try:
+            memory = _open_memory(name)
+        except OSError:
+            return None  # Сегмента нет (или он чужой)
+        deadline = time.monotonic() + timeout
+        while True:
+            magic, ready, pid, index_length = _HEADER.unpack_from(memory.buf)
+            if magic == _MAGIC and ready:
+                break
+            if magic == _MAGIC and not _is_alive(pid):
+                memory.close()
+                with contextlib.suppress(FileNotFoundError):
+                    _unlink_memory(memory)
+                return None
+            if time.monotonic() > deadline:
+                memory.close()
+                return None
+            time.sleep(0.05)
+        start = _HEADER.size
+        index = json.loads(bytes(memory.buf[start : start + index_length]))
+        return cls(name, memory, index, _data_start(index_length))
+
+    @classmethod
+    def create(cls, name: str, pcm: Mapping[str, np.ndarray]) -> "SharedBank":
+        """
+        Создаёт сегмент name и копирует в него PCM.
+
+        Raises:
+            FileExistsError: Сегмент уже создал другой процесс
+        """
+        index = {}
+        data_size = 0
+        for stem, samples in pcm.items():
+            index[stem] = [data_size, samples.nbytes]
+            data_size += _aligned(samples.nbytes)
+        index_bytes = json.dumps(index).encode()
+        data_start = _data_start(len(index_bytes))
+
+        collect_stale_banks()
+        memory = _open_memory(name, create=True, size=data_start + data_size)
+        try:
+            _HEADER.pack_into(memory.buf, 0, _MAGIC, 0, os.getpid(), len(index_bytes))
+            memory.buf[_HEADER.size : _HEADER.size + len(index_bytes)] = index_bytes
+            buffer = np.frombuffer(memory.buf, dtype=np.uint8)
+            for stem, (offset, size) in index.items():
+                start = data_start + offset
+                samples = np.ascontiguousarray(pcm[stem])
+                buffer[start : start + size] = samples.reshape(-1).view(np.uint8)
+            del buffer  # Иначе close() не сможет освободить буфер
+            # Готовность — последней: до неё другие процессы ждут
+            struct.pack_into("<I", memory.buf, _READY_OFFSET, 1)
+        except BaseException:
+            memory.close()
+            _unlink_memory(memory)
+            raise
+        return cls(name, memory, index, data_start)
+
+    def __contains__(self, stem: object) -> bool:
+        return stem in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def nbytes(self) -> int:
+        """Размер сегмента, байт."""
+        return self._memory.size
+
+    def make_sound(self, stem: str) -> pygame.mixer.Sound | None:
+        """Звук семпла из сегмента (None — семпла нет или банк закрыт)."""
+        location = self._index.get(stem)
+        if location is None:
+            return None
+        offset, size = location
+        with self._lock:
+            if self._closed:
+                return None
+            with self._memory.buf[offset : offset + size] as view:
+                return pygame.mixer.Sound(buffer=view)
+
+    def close(self) -> None:
+        """Отключается от сегмента; последний процесс удаляет его."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._memory.close()
+        if self._user_file is None:
+            return
+        with contextlib.suppress(OSError):
+            self._user_file.unlink()
+        if not _live_users(self.name):
+            with contextlib.suppress(FileNotFoundError):
+                _unlink_memory(self._memory)
+
+
+def share_bank(
+    name: str, load: Callable[[], Mapping[str, np.ndarray] | None]
+) -> SharedBank | None:
+    """
+    Подключается к сегменту name, а если его нет — создаёт.
+
+    Args:
+        name: Имя сегмента (см. shared_bank_name)
+        load: Декодирует PCM семплов для нового сегмента (None — отмена)
+
+    Returns:
+        Банк или None (отмена или разделяемая память недоступна)
+    """
+    pcm = None
+    # Два круга: сегмент мог появиться, пока мы декодировали
+    for _ in range(2):
+        bank = SharedBank.attach(name)
+        if bank is not None:
+            return bank
+        if pcm is None:
+            pcm = load()
+            if pcm is None:
+                return None
+        try:
+            return SharedBank.create(name, pcm)
+        except FileExistsError:
+            continue
+        except OSError:
+            return None  # Например, /dev/shm переполнен
+    return None
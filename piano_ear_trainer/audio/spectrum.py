@@ -0,0 +1,139 @@
+"""Спектр и осциллограмма семплов для наглядного сравнения нот."""
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+
+import numpy as np
+
+from piano_ear_trainer.data import Note
+
+# Столбцов в готовом для отрисовки спектре и осциллограмме
+DISPLAY_COLUMNS = 512
+
+# Ось частот спектра (логарифмическая), Гц
+MIN_FREQUENCY = 25.0
+MAX_FREQUENCY = 8000.0
+
+# Окно БПФ и пропуск атаки (удар молоточка — шумный)
+FFT_SIZE = 16384
+ATTACK_SECONDS = 0.02
+
+# Длительность показанного участка осциллограммы, с
+WAVEFORM_SECONDS = 0.025
+
+# Динамический диапазон спектра, дБ
+DYNAMIC_RANGE_DB = 60.0
+
+_WINDOW = np.hanning(FFT_SIZE).astype(np.float32)
+
+
+@dataclass(frozen=True)
+class NoteAnalysis:
+    """Спектр и осциллограмма ноты, готовые к отрисовке."""
+
+    spectrum: np.ndarray  # 0..1 по столбцам логарифмической оси частот
+    waveform_min: np.ndarray  # -1..1: минимум сигнала в столбце
+    waveform_max: np.ndarray  # -1..1: максимум сигнала в столбце
+
+
+def _to_mono(pcm: np.ndarray) -> np.ndarray:
+    """PCM микшера (int16, моно или стерео) -> float32 в диапазоне -1..1."""
+    mono = pcm.mean(axis=1) if pcm.ndim > 1 else pcm
+    return np.asarray(mono, dtype=np.float32) / 32768.0
+
+
+def _column_edges(count: int, columns: int) -> np.ndarray:
+    """Начала столбцов при делении count отсчётов на columns частей."""
+    return np.linspace(0, count, columns, endpoint=False).astype(np.intp)
+
+
+def analyze_pcm(
+    pcm: np.ndarray, sample_rate: int, columns: int = DISPLAY_COLUMNS
+) -> NoteAnalysis:
+    """
+    Считает спектр и осциллограмму семпла.
+
+    Спектр — модуль БПФ окна Ханна после атаки, в дБ относительно пика,
+    сжатый до columns столбцов на логарифмической оси частот (в столбец
+    попадает максимум его бинов, чтобы узкие гармоники не терялись).
+    """
+    # В моно переводим только нужный участок, а не весь семпл
+    start = min(int(ATTACK_SECONDS * sample_rate), max(len(pcm) - 1, 0))
+    wave_length = max(int(WAVEFORM_SECONDS * sample_rate), columns)
+    mono = _to_mono(pcm[start : start + max(FFT_SIZE, wave_length)])
+    segment = np.zeros(FFT_SIZE, dtype=np.float32)
+    segment[: min(len(mono), FFT_SIZE)] = mono[:FFT_SIZE]
+
+    magnitude = np.abs(np.fft.rfft(segment * _WINDOW))
+    peak = float(magnitude.max()) or 1.0
+    db = 20.0 * np.log10(magnitude / peak + 1e-12)
+    level = np.clip(1.0 + db / DYNAMIC_RANGE_DB, 0.0, 1.0)
+
+    freqs = np.fft.rfftfreq(FFT_SIZE, 1.0 / sample_rate)
+    edges = np.geomspace(MIN_FREQUENCY, MAX_FREQUENCY, columns)
+    bins = np.minimum(np.searchsorted(freqs, edges), len(level) - 1)
+    spectrum = np.maximum.reduceat(level, bins).astype(np.float32)
+
+    wave = mono[:wave_length]
+    if len(wave) < columns:
+        wave = np.pad(wave, (0, columns - len(wave)))
+    wave_peak = float(np.abs(wave).max()) or 1.0
+    wave = wave / wave_peak
+    starts = _column_edges(len(wave), columns)
+    # Столбец захватывает первый отсчёт следующего — линия без разрывов
+    following = wave[np.append(starts[1:], len(wave) - 1)]
+    return NoteAnalysis(
+        spectrum=spectrum,
+        waveform_min=np.minimum(np.minimum.reduceat(wave, starts), following),
+        waveform_max=np.maximum(np.maximum.reduceat(wave, starts), following),
+    )
+
+
+class SpectrumCache:
+    """
+    Анализ нот с кэшированием.
+
+    PCM берётся у плеера (уже загруженные звуки), БПФ считается один раз
+    на ноту и банк.
+    """
+
+    def __init__(
+        self,
+        get_pcm: Callable[[Note], np.ndarray],
+        sample_rate: int,
+        max_entries: int = 176,
+    ) -> None:
+        """
+        Args:
+            get_pcm: PCM ноты (например, AudioPlayer.get_pcm)
+            sample_rate: Частота дискретизации PCM
+            max_entries: Сколько анализов хранить
+        """
+        self._get_pcm = get_pcm
+        self._sample_rate = sample_rate
+        self._max_entries = max_entries
+        self._cache: OrderedDict[Hashable, NoteAnalysis] = OrderedDict()
+
+    def get(self, note: Note, bank_key: Hashable = None) -> NoteAnalysis:
+        """
+        Анализ ноты (из кэша или вычисленный).
+
+        Args:
+            note: Нота
+            bank_key: Идентификатор банка семплов (например, строй)
+        """
+        key = (note.midi_number, bank_key)
+        analysis = self._cache.get(key)
+        if analysis is not None:
+            self._cache.move_to_end(key)
+            return analysis
+        analysis = analyze_pcm(self._get_pcm(note), self._sample_rate)
+        self._cache[key] = analysis
+        if len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+        return analysis
+
+    def clear(self) -> None:
+        """Очищает кэш."""
+        self._cache.clear()
@@ -0,0 +1,6 @@
+"""Классный режим: учитель рассылает вопросы, ученики отвечают."""
+
+from piano_ear_trainer.classroom.client import ClassroomClient
+from piano_ear_trainer.classroom.server import ClassroomServer
+
+__all__ = ["ClassroomClient", "ClassroomServer"]
@@ -0,0 +1,131 @@
+"""Клиент классного режима для окна приложения."""
+
+import asyncio
+import concurrent.futures
+import contextlib
+import queue
+import threading
+
+from piano_ear_trainer.classroom import protocol
+
+
+class ClassroomClient:
+    """
+    Подключение ученика к серверу класса.
+
+    Сетевой обмен идёт в отдельном потоке со своим циклом asyncio;
+    входящие сообщения складываются в очередь и забираются через poll()
+    из потока GUI (по таймеру), отправка — через call_soon_threadsafe.
+    """
+
+    def __init__(self, host: str, port: int, name: str = "") -> None:
+        self.host = host
+        self.port = port
+        self.name = name
+        self._inbox: queue.SimpleQueue[dict] = queue.SimpleQueue()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._connecting: concurrent.futures.Future | None = None
+        self._connected = False
+
+    @property
+    def is_connected(self) -> bool:
+        """Есть ли соединение с сервером."""
+        return self._connected
+
+    @property
+    def is_connecting(self) -> bool:
+        """Идёт ли подключение, начатое start_connect()."""
+        return self._connecting is not None and not self._connecting.done()
+
+    def start_connect(self, timeout: float = 5.0) -> None:
+        """
+        Начинает подключение и сразу возвращается (для потока GUI).
+
+        Результат виден по is_connecting и is_connected: подключение
+        закончилось, а соединения нет — сервер недоступен.
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="classroom-client", daemon=True
+        )
+        self._thread.start()
+        self._connecting = asyncio.run_coroutine_threadsafe(
+            asyncio.wait_for(self._open(), timeout), self._loop
+        )
+
+    def connect(self, timeout: float = 5.0) -> None:
+        """Подключается к серверу (блокирует до результата)."""
+        self.start_connect(timeout)
+        try:
+            self._connecting.result()
+        except Exception as e:
+            self.close()
+            raise OSError(f"Не удалось подключиться к {self.host}:{self.port}") from e
+
+    async def _open(self) -> None:
+        reader, self._writer = await asyncio.open_connection(
+            self.host, self.port, limit=protocol.MAX_LINE
+        )
+        self._connected = True
+        self._writer.write(protocol.encode(protocol.HELLO, name=self.name))
+        asyncio.get_running_loop().create_task(self._read_loop(reader))
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while line := await reader.readline():
+                message = protocol.decode(line)
+                if message is not None:
+                    self._inbox.put(message)
+        except (ValueError, ConnectionError):
+            pass
+        finally:
+            self._connected = False
+
+    def poll(self) -> list[dict]:
+        """Забирает все полученные сообщения."""
+        messages = []
+        while True:
+            try:
+                messages.append(self._inbox.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def send(self, data: bytes) -> None:
+        """Отправляет готовое сообщение (из любого потока)."""
+        if self._loop is not None and self._writer is not None and self._connected:
+            self._loop.call_soon_threadsafe(self._writer.write, data)
+
+    def send_answer(self, question_id: int, midi: list[int], elapsed: float) -> None:
+        """Отправляет ответ на вопрос."""
+        self.send(
+            protocol.encode(
+                protocol.ANSWER, id=question_id, midi=midi, elapsed=round(elapsed, 3)
+            )
+        )
+
+    async def _shutdown(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self) -> None:
+        """Закрывает соединение и останавливает сетевой поток."""
+        self._connected = False
+        if self._loop is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        with contextlib.suppress(Exception):
+            future.result(timeout=2)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+        self._writer = None
+        self._connecting = None
@@ -0,0 +1,40 @@
+"""Протокол классного режима: JSON-сообщения, по одному на строку."""
+
+import json
+
+# Порт сервера по умолчанию
+DEFAULT_PORT = 8765
+
+# Предел строки сообщения (защита от мусора в сокете)
+MAX_LINE = 64 * 1024
+
+# Типы сообщений
+HELLO = "hello"  # Клиент -> сервер: {"name": ...}
+QUESTION = "question"  # Сервер -> клиенты: {"id", "midi": [...], "tempo", "sent_at"}
+ANSWER = "answer"  # Клиент -> сервер: {"id", "midi": [...], "elapsed"}
+STATS = "stats"  # Клиент -> сервер: запрос; сервер -> клиент: статистика
+
+
+def encode(message_type: str, **fields) -> bytes:
+    """Кодирует сообщение в строку JSON с переводом строки."""
+    payload = {"type": message_type, **fields}
+    return json.dumps(payload, separators=(",", ":")).encode() + b"\n"
+
+
+def decode(line: bytes) -> dict | None:
+    """Разбирает строку; None, если это не корректное сообщение."""
+    try:
+        message = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    if not isinstance(message, dict) or not isinstance(message.get("type"), str):
+        return None
+    return message
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    """Разбирает 'хост[:порт]'."""
+    host, _, port = address.strip().rpartition(":")
+    if not host:
+        return port or "127.0.0.1", DEFAULT_PORT
+    return host, int(port)
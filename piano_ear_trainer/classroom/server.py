@@ -0,0 +1,219 @@
+"""Сервер классного режима: рассылка вопросов и сбор ответов (asyncio).
+
+    python -m piano_ear_trainer.classroom.server --interval 10 --count 20
+
+Сервер задаёт ученикам одни и те же вопросы (MIDI-номера нот), каждый
+клиент проигрывает их локально, а сервер сводит ответы.
+"""
+
+import argparse
+import asyncio
+import math
+import statistics
+import time
+from dataclasses import dataclass, field
+
+from piano_ear_trainer.classroom import protocol
+from piano_ear_trainer.data import NOTES_BY_MIDI
+from piano_ear_trainer.quiz import filter_notes, make_question
+
+# Клиент, не забирающий данные, отключается при таком объёме очереди записи
+MAX_WRITE_BUFFER = 256 * 1024
+
+
+@dataclass
+class _Client:
+    """Подключённый ученик."""
+
+    writer: asyncio.StreamWriter
+    name: str = ""
+
+
+@dataclass
+class QuestionResult:
+    """Ответы на один вопрос."""
+
+    question_id: int
+    midi: list[int]
+    sent_at: float
+    recipients: int
+    answers: dict[int, tuple[bool, float]] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        """Строка для журнала учителя."""
+        names = " ".join(NOTES_BY_MIDI[m].short_name for m in self.midi)
+        answered = len(self.answers)
+        correct = sum(ok for ok, _ in self.answers.values())
+        times = [elapsed for _, elapsed in self.answers.values()]
+        median = statistics.median(times) if times else 0.0
+        percent = int(correct / answered * 100) if answered else 0
+        return (
+            f"#{self.question_id} {names}: ответили {answered}/{self.recipients}, "
+            f"верно {correct} ({percent}%), медиана {median:.1f} с"
+        )
+
+
+class ClassroomServer:
+    """
+    Asyncio-сервер класса.
+
+    Вопрос кодируется один раз и одним и тем же буфером пишется во все
+    сокеты без ожидания каждого клиента, поэтому рассылка — O(N) вызовов
+    write(). Медленные клиенты с переполненным буфером отключаются и не
+    задерживают остальных.
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = protocol.DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self._clients: dict[int, _Client] = {}
+        self._next_client_id = 0
+        self._server: asyncio.Server | None = None
+        self.results: list[QuestionResult] = []
+
+    @property
+    def client_count(self) -> int:
+        """Число подключённых учеников."""
+        return len(self._clients)
+
+    async def start(self) -> None:
+        """Открывает порт."""
+        self._server = await asyncio.start_server(
+            self._handle_client, self.host, self.port, limit=protocol.MAX_LINE
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        """Закрывает сервер и все соединения."""
+        if self._server is not None:
+            self._server.close()
+        for client in list(self._clients.values()):
+            client.writer.close()
+        self._clients.clear()
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    def broadcast_question(self, midi: list[int], tempo: int | None = None) -> int:
+        """Рассылает вопрос всем ученикам и возвращает его номер."""
+        question_id = len(self.results) + 1
+        sent_at = time.time()
+        fields = {"id": question_id, "midi": midi, "sent_at": sent_at}
+        if tempo is not None:
+            fields["tempo"] = tempo
+        data = protocol.encode(protocol.QUESTION, **fields)
+
+        for client_id, client in list(self._clients.items()):
+            transport = client.writer.transport
+            if transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+                self._drop(client_id)
+                continue
+            client.writer.write(data)
+
+        self.results.append(
+            QuestionResult(question_id, midi, sent_at, len(self._clients))
+        )
+        return question_id
+
+    def _drop(self, client_id: int) -> None:
+        client = self._clients.pop(client_id, None)
+        if client is not None:
+            client.writer.close()
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        client_id = self._next_client_id
+        self._next_client_id += 1
+        self._clients[client_id] = _Client(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break  # Слишком длинная строка или обрыв
+                if not line:
+                    break
+                message = protocol.decode(line)
+                if message is not None:
+                    self._on_message(client_id, message)
+        finally:
+            self._drop(client_id)
+
+    def _on_message(self, client_id: int, message: dict) -> None:
+        client = self._clients.get(client_id)
+        if client is None:
+            return
+        kind = message["type"]
+        if kind == protocol.HELLO:
+            client.name = str(message.get("name", ""))[:64]
+        elif kind == protocol.ANSWER:
+            self._record_answer(client_id, message)
+        elif kind == protocol.STATS:
+            client.writer.write(
+                protocol.encode(
+                    protocol.STATS,
+                    clients=len(self._clients),
+                    questions=len(self.results),
+                    cpu_seconds=time.process_time(),
+                )
+            )
+
+    def _record_answer(self, client_id: int, message: dict) -> None:
+        question_id = message.get("id")
+        if not isinstance(question_id, int) or not 1 <= question_id <= len(
+            self.results
+        ):
+            return
+        result = self.results[question_id - 1]
+        if client_id in result.answers:
+            return  # Засчитываем только первый ответ
+        elapsed = message.get("elapsed")
+        if (
+            not isinstance(elapsed, (int, float))
+            or isinstance(elapsed, bool)
+            or not math.isfinite(elapsed)
+            or elapsed < 0
+        ):
+            return  # Битый ответ не должен ронять обработчик клиента
+        correct = message.get("midi") == result.midi
+        result.answers[client_id] = (correct, float(elapsed))
+
+
+async def run_drill(args: argparse.Namespace) -> None:
+    """Проводит занятие: вопросы с интервалом, сводка после каждого."""
+    server = ClassroomServer(args.host, args.port)
+    await server.start()
+    print(f"Сервер класса слушает {args.host}:{server.port}")
+    notes = filter_notes(args.octaves, args.sharps)
+    try:
+        await asyncio.sleep(args.wait)
+        for _ in range(args.count):
+            midi = [n.midi_number for n in make_question(notes, args.length)]
+            tempo = args.tempo if args.length > 1 else None
+            server.broadcast_question(midi, tempo)
+            await asyncio.sleep(args.interval)
+            print(server.results[-1].summary())
+    finally:
+        await server.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Точка входа сервера."""
+    parser = argparse.ArgumentParser(description="Сервер классного режима")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=protocol.DEFAULT_PORT)
+    parser.add_argument("--count", type=int, default=20, help="число вопросов")
+    parser.add_argument("--interval", type=float, default=10.0, help="секунд на ответ")
+    parser.add_argument(
+        "--wait", type=float, default=15.0, help="ожидание подключений перед началом"
+    )
+    parser.add_argument("--octaves", type=int, nargs="+", default=[4])
+    parser.add_argument("--sharps", action="store_true", help="с чёрными клавишами")
+    parser.add_argument("--length", type=int, default=1, help="нот в задании")
+    parser.add_argument("--tempo", type=int, default=80, help="темп диктанта")
+    args = parser.parse_args(argv)
+    asyncio.run(run_drill(args))
+
+
+if __name__ == "__main__":
+    main()
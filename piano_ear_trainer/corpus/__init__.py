@@ -0,0 +1,20 @@
+"""Корпус реальных мелодий из MIDI-файлов для мелодического диктанта."""
+
+from piano_ear_trainer.corpus.index import (
+    LEVELS,
+    CorpusIndex,
+    IndexReport,
+    build_index,
+    default_index_dir,
+)
+from piano_ear_trainer.corpus.midi import MidiError, read_melodies
+
+__all__ = [
+    "LEVELS",
+    "CorpusIndex",
+    "IndexReport",
+    "MidiError",
+    "build_index",
+    "default_index_dir",
+    "read_melodies",
+]
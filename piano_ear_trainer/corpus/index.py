@@ -0,0 +1,361 @@
+"""Индекс фрагментов мелодий корпуса: n-граммы нот и интервалов по сложности.
+
+Для каждой длины фрагмента на диске лежат уникальные n-граммы высот
+(uint8, n байт на фрагмент) и уникальные интервальные паттерны (int8),
+отсортированные по уровню сложности, и смещения начала каждого уровня.
+Массивы открываются через mmap, поэтому индекс загружается мгновенно, а
+случайный фрагмент уровня выбирается за O(1): случайная строка между
+смещениями уровня.
+"""
+
+import itertools
+import json
+import random
+import shutil
+import time
+from collections.abc import Callable, Collection, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from os import cpu_count
+from pathlib import Path
+
+import numpy as np
+
+from piano_ear_trainer.corpus.midi import (
+    MAX_LEAP,
+    MidiError,
+    iter_midi_files,
+    read_melodies,
+)
+
+# Длины фрагментов (как «Нот в задании» в диктанте)
+MIN_LENGTH = 2
+MAX_LENGTH = 8
+LENGTHS = tuple(range(MIN_LENGTH, MAX_LENGTH + 1))
+
+# Уровни сложности: квантили сложности паттернов, 1 — самый лёгкий
+LEVELS = 5
+
+INDEX_VERSION = 1
+META_FILE = "index.json"
+
+# Сложность интервала по числу полутонов (0..12): секунды и терции легче,
+# тритон и септимы труднее всего
+_INTERVAL_COST = np.array(
+    [0.5, 1.0, 1.0, 2.0, 2.0, 2.5, 4.0, 2.5, 3.5, 3.5, 4.0, 4.0, 3.0]
+)
+
+# Ключ n-граммы в памяти при сборке: 7 бит на ноту (до 8 нот в uint64)
+_PITCH_BITS = 7
+# Сколько строк накапливать до слияния дубликатов
+_COMPACT_ROWS = 4_000_000
+
+
+def default_index_dir() -> Path:
+    """Папка индекса по умолчанию (её открывает приложение)."""
+    # Пакет audio тянет pygame — процессам пула он не нужен
+    from piano_ear_trainer.audio.bank import get_cache_root
+
+    return get_cache_root() / "corpus"
+
+
+def difficulty(patterns: np.ndarray) -> np.ndarray:
+    """
+    Сложность интервальных паттернов (строка — интервалы фрагмента).
+
+    Средняя сложность интервалов плюс охват фрагмента в октавах.
+    """
+    steps = patterns.astype(np.int16)
+    heights = np.concatenate(
+        [np.zeros((len(steps), 1), dtype=np.int16), np.cumsum(steps, axis=1)], axis=1
+    )
+    span = heights.max(axis=1) - heights.min(axis=1)
+    cost = _INTERVAL_COST[np.minimum(np.abs(steps), len(_INTERVAL_COST) - 1)]
+    return cost.mean(axis=1) + span / 12.0
+
+
+def _shifts(length: int) -> np.ndarray:
+    return np.arange(length - 1, -1, -1, dtype=np.uint64) * np.uint64(_PITCH_BITS)
+
+
+def _encode(ngrams: np.ndarray) -> np.ndarray:
+    return (ngrams.astype(np.uint64) << _shifts(ngrams.shape[1])).sum(
+        axis=1, dtype=np.uint64
+    )
+
+
+def _decode(keys: np.ndarray, length: int) -> np.ndarray:
+    mask = np.uint64((1 << _PITCH_BITS) - 1)
+    return ((keys[:, None] >> _shifts(length)) & mask).astype(np.uint8)
+
+
+def _merge(parts: list[np.ndarray]) -> np.ndarray:
+    """Уникальные ключи нескольких массивов (отсортированные)."""
+    return np.unique(np.concatenate(parts))
+
+
+@dataclass
+class _Partial:
+    """Результат обработки пачки файлов (передаётся из процесса пула)."""
+
+    ngrams: dict[int, np.ndarray] = field(default_factory=dict)
+    files: int = 0
+    failed: int = 0
+    phrases: int = 0
+    notes: int = 0
+
+
+def _index_files(paths: list[Path]) -> _Partial:
+    """Задача для процесса пула: уникальные n-граммы пачки файлов (ключи)."""
+    partial = _Partial()
+    phrases: list[list[int]] = []
+    for path in paths:
+        try:
+            phrases += read_melodies(path, MIN_LENGTH)
+        except (OSError, MidiError):
+            partial.failed += 1
+            continue
+        partial.files += 1
+    if not phrases:
+        return partial
+    partial.phrases = len(phrases)
+
+    # Все фразы пачки подряд: окна считаются одним вызовом на длину,
+    # окна на стыке фраз отбрасываются по номеру фразы
+    pitches = np.fromiter(itertools.chain.from_iterable(phrases), dtype=np.uint8)
+    phrase_ids = np.repeat(
+        np.arange(len(phrases)), np.fromiter(map(len, phrases), dtype=np.int64)
+    )
+    partial.notes = len(pitches)
+    for n in LENGTHS:
+        if len(pitches) < n:
+            break
+        windows = np.lib.stride_tricks.sliding_window_view(pitches, n)
+        valid = phrase_ids[: len(windows)] == phrase_ids[n - 1 :]
+        # Повтор одной ноты — не мелодия
+        valid &= windows.max(axis=1) != windows.min(axis=1)
+        partial.ngrams[n] = np.unique(_encode(windows[valid]))
+    return partial
+
+
+@dataclass
+class IndexReport:
+    """Итоги индексации корпуса."""
+
+    files: int
+    failed: int
+    phrases: int
+    notes: int
+    ngrams: dict[int, int]  # Длина -> уникальных фрагментов
+    patterns: dict[int, int]  # Длина -> уникальных интервальных паттернов
+    seconds: float
+
+
+def _batches(paths: Iterable[Path], size: int) -> Iterable[list[Path]]:
+    iterator = iter(paths)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def build_index(
+    source: Path,
+    output: Path | None = None,
+    max_workers: int | None = None,
+    chunk_size: int = 64,
+    progress: Callable[[int], None] | None = None,
+) -> IndexReport:
+    """
+    Индексирует папку MIDI-файлов (рекурсивно) в пуле процессов.
+
+    Файлы раздаются пачками по мере обхода папки, в работе не больше двух
+    пачек на процесс, поэтому память не зависит от размера корпуса (кроме
+    самих уникальных n-грамм). Индекс пишется во временную папку и
+    заменяет старый целиком.
+
+    Args:
+        source: Папка с .mid файлами
+        output: Папка индекса (по умолчанию default_index_dir())
+        max_workers: Процессов в пуле (None — по числу ядер)
+        chunk_size: Файлов в одной задаче пула
+        progress: Вызывается с числом обработанных файлов
+    """
+    output = output or default_index_dir()
+    workers = max_workers or cpu_count() or 1
+    parts: dict[int, list[np.ndarray]] = {n: [] for n in LENGTHS}
+    rows = dict.fromkeys(LENGTHS, 0)
+    totals = _Partial()
+
+    def collect(future: Future) -> None:
+        partial = future.result()
+        totals.files += partial.files
+        totals.failed += partial.failed
+        totals.phrases += partial.phrases
+        totals.notes += partial.notes
+        for n, keys in partial.ngrams.items():
+            parts[n].append(keys)
+            rows[n] += len(keys)
+            if rows[n] > _COMPACT_ROWS:
+                parts[n] = [_merge(parts[n])]
+                rows[n] = len(parts[n][0])
+        if progress is not None:
+            progress(totals.files + totals.failed)
+
+    started = time.perf_counter()
+    # spawn: форк процесса с Qt/SDL небезопасен
+    with ProcessPoolExecutor(workers, mp_context=get_context("spawn")) as pool:
+        pending: set[Future] = set()
+        for batch in _batches(iter_midi_files(source), chunk_size):
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+            pending.add(pool.submit(_index_files, batch))
+        for future in pending:
+            collect(future)
+
+    report = IndexReport(
+        files=totals.files,
+        failed=totals.failed,
+        phrases=totals.phrases,
+        notes=totals.notes,
+        ngrams={},
+        patterns={},
+        seconds=0.0,
+    )
+    tmp_dir = output.with_name(output.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    thresholds = {}
+    for n in LENGTHS:
+        keys = _merge(parts[n]) if parts[n] else np.zeros(0, np.uint64)
+        thresholds[n] = _write_length(tmp_dir, n, _decode(keys, n), report)
+
+    meta = {
+        "version": INDEX_VERSION,
+        "lengths": list(LENGTHS),
+        "levels": LEVELS,
+        "max_leap": MAX_LEAP,
+        "files": report.files,
+        "failed": report.failed,
+        "phrases": report.phrases,
+        "notes": report.notes,
+        "thresholds": thresholds,
+    }
+    (tmp_dir / META_FILE).write_text(json.dumps(meta, indent=2))
+    shutil.rmtree(output, ignore_errors=True)
+    tmp_dir.replace(output)
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def _write_length(
+    directory: Path,
+    length: int,
+    ngrams: np.ndarray,
+    report: IndexReport,
+) -> list[float]:
+    """Пишет n-граммы и паттерны одной длины, отсортированные по уровню."""
+    intervals = np.diff(ngrams.astype(np.int16), axis=1).astype(np.int8)
+    patterns, inverse = np.unique(intervals, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    scores = difficulty(patterns)
+    if len(scores):
+        thresholds = np.quantile(scores, np.linspace(0, 1, LEVELS + 1)[1:-1])
+    else:
+        thresholds = np.zeros(LEVELS - 1)
+    pattern_levels = np.searchsorted(thresholds, scores, side="right")
+    # Уровень фрагмента — уровень его паттерна (сложность не зависит от транспозиции)
+    ngram_levels = pattern_levels[inverse]
+
+    for name, rows, levels in (
+        ("ngrams", ngrams, ngram_levels),
+        ("patterns", patterns, pattern_levels),
+    ):
+        order = np.argsort(levels, kind="stable")
+        offsets = np.searchsorted(levels[order], np.arange(LEVELS + 1))
+        np.save(directory / f"{name}_{length}.npy", rows[order])
+        np.save(directory / f"{name}_offsets_{length}.npy", offsets.astype(np.int64))
+    report.ngrams[length] = len(ngrams)
+    report.patterns[length] = len(patterns)
+    return [float(t) for t in thresholds]
+
+
+class CorpusIndex:
+    """Открытый индекс корпуса: выбор фрагментов по длине и сложности."""
+
+    def __init__(self, path: Path) -> None:
+        """
+        Открывает индекс (массивы читаются через mmap при первом обращении).
+
+        Raises:
+            OSError: Нет индекса
+            ValueError: Индекс другой версии или повреждён
+        """
+        self.path = path
+        self.meta = json.loads((path / META_FILE).read_text())
+        if self.meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Неподдерживаемая версия индекса: {path}")
+        self.lengths: tuple[int, ...] = tuple(self.meta["lengths"])
+        self.levels: int = self.meta["levels"]
+        self._arrays: dict[str, np.ndarray] = {}
+
+    def _array(self, name: str) -> np.ndarray:
+        array = self._arrays.get(name)
+        if array is None:
+            array = self._arrays[name] = np.load(
+                self.path / f"{name}.npy", mmap_mode="r"
+            )
+        return array
+
+    def count(self, length: int, level: int) -> int:
+        """Уникальных фрагментов длины length на уровне level (1..levels)."""
+        offsets = self._array(f"ngrams_offsets_{length}")
+        return int(offsets[level] - offsets[level - 1])
+
+    def sample(
+        self,
+        length: int,
+        level: int,
+        rng: random.Random | None = None,
+        allowed: Collection[int] | None = None,
+        attempts: int = 32,
+    ) -> list[int] | None:
+        """
+        Случайный фрагмент мелодии (номера MIDI) длины length уровня level.
+
+        Сначала берётся фрагмент как в оригинале; если его ноты не входят
+        в allowed (выбранные октавы и клавиши), — интервальный паттерн того
+        же уровня, транспонированный на случайную разрешённую ноту.
+        Каждая попытка — O(1), число попыток ограничено.
+
+        Returns:
+            Номера MIDI или None, если за attempts попыток подходящего нет
+        """
+        if length not in self.lengths or not 1 <= level <= self.levels:
+            return None
+        rng = rng or random
+        allowed_set = frozenset(allowed) if allowed is not None else None
+
+        ngrams = self._array(f"ngrams_{length}")
+        start, end = self._array(f"ngrams_offsets_{length}")[level - 1 : level + 1]
+        if end > start:
+            for _ in range(attempts):
+                row = ngrams[rng.randrange(start, end)]
+                if allowed_set is None or allowed_set.issuperset(row.tolist()):
+                    return row.tolist()
+        if not allowed_set:
+            return None
+
+        patterns = self._array(f"patterns_{length}")
+        start, end = self._array(f"patterns_offsets_{length}")[level - 1 : level + 1]
+        if end <= start:
+            return None
+        bases = sorted(allowed_set)
+        for _ in range(attempts):
+            pattern = patterns[rng.randrange(start, end)].tolist()
+            base = rng.choice(bases)
+            melody = [base, *(base + s for s in itertools.accumulate(pattern))]
+            if allowed_set.issuperset(melody):
+                return melody
+        return None
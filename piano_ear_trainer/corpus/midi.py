@@ -0,0 +1,183 @@
+"""Потоковое чтение мелодий из Standard MIDI File (.mid)."""
+
+import os
+import struct
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+from piano_ear_trainer.data import NOTES_BY_MIDI
+
+# Расширения файлов корпуса (без учёта регистра)
+MIDI_EXTENSIONS = (".mid", ".midi", ".kar")
+
+# Канал ударных в General MIDI (нумерация с 0) — высоты у него нет
+DRUM_CHANNEL = 9
+
+# Скачок больше октавы считаем границей фразы (обычно это смена голоса)
+MAX_LEAP = 12
+
+# Диапазон фортепиано (88 клавиш)
+LOWEST_MIDI = min(NOTES_BY_MIDI)
+HIGHEST_MIDI = max(NOTES_BY_MIDI)
+
+
+class MidiError(ValueError):
+    """Файл не является корректным Standard MIDI File."""
+
+
+def iter_midi_files(root: Path) -> Iterator[Path]:
+    """Обходит папку рекурсивно и лениво выдаёт MIDI-файлы."""
+    stack = [root]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for entry in sorted(entries, key=lambda e: e.name):
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(Path(entry.path))
+            elif entry.name.lower().endswith(MIDI_EXTENSIONS):
+                yield Path(entry.path)
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise MidiError("Файл обрезан")
+    return data
+
+
+def _read_varlen(data: bytes, pos: int) -> tuple[int, int]:
+    """Число переменной длины MIDI: (значение, позиция после него)."""
+    value = 0
+    for _ in range(4):
+        if pos >= len(data):
+            raise MidiError("Событие выходит за конец дорожки")
+        byte = data[pos]
+        pos += 1
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            return value, pos
+    raise MidiError("Слишком длинное число переменной длины")
+
+
+def _parse_track(data: bytes) -> dict[int, list[tuple[int, int]]]:
+    """
+    Нажатия клавиш дорожки: канал -> [(тик, нота), ...] по времени.
+
+    Учитывается running status; мета-события и SysEx пропускаются.
+    """
+    notes: dict[int, list[tuple[int, int]]] = {}
+    pos = 0
+    tick = 0
+    status = 0
+    end = len(data)
+    while pos < end:
+        # Обычно дельта времени — один байт
+        if data[pos] < 0x80:
+            tick += data[pos]
+            pos += 1
+        else:
+            delta, pos = _read_varlen(data, pos)
+            tick += delta
+        if pos >= end:
+            raise MidiError("Событие выходит за конец дорожки")
+        byte = data[pos]
+        if byte == 0xFF:  # Мета-событие
+            if pos + 1 >= end:
+                raise MidiError("Событие выходит за конец дорожки")
+            meta_type = data[pos + 1]
+            length, pos = _read_varlen(data, pos + 2)
+            pos += length
+            if meta_type == 0x2F:  # Конец дорожки
+                break
+            continue
+        if byte in (0xF0, 0xF7):  # SysEx
+            length, pos = _read_varlen(data, pos + 1)
+            pos += length
+            continue
+        if byte & 0x80:
+            status = byte
+            pos += 1
+        elif not status:
+            raise MidiError("Данные без статуса события")
+        kind = status & 0xF0
+        size = 1 if kind in (0xC0, 0xD0) else 2
+        if pos + size > end:
+            raise MidiError("Событие выходит за конец дорожки")
+        # Note On с ненулевой громкостью (нулевая — это Note Off)
+        if kind == 0x90 and data[pos + 1]:
+            channel = status & 0x0F
+            if channel != DRUM_CHANNEL:
+                notes.setdefault(channel, []).append((tick, data[pos]))
+        pos += size
+    return notes
+
+
+def _skyline(events: list[tuple[int, int]]) -> list[int]:
+    """Мелодия голоса: из одновременных нот берётся верхняя."""
+    melody = []
+    last_tick = -1
+    for tick, pitch in events:
+        if tick == last_tick:
+            if pitch > melody[-1]:
+                melody[-1] = pitch
+            continue
+        melody.append(pitch)
+        last_tick = tick
+    return melody
+
+
+def split_phrases(melody: list[int], min_length: int = 2) -> list[list[int]]:
+    """
+    Режет мелодию на фразы в диапазоне 88 клавиш.
+
+    Ноты вне диапазона и скачки больше MAX_LEAP разрывают фразу, чтобы в
+    индекс не попали интервалы, которых в музыке не было.
+    """
+    phrases = []
+    current: list[int] = []
+    for pitch in melody:
+        in_range = LOWEST_MIDI <= pitch <= HIGHEST_MIDI
+        if current and (not in_range or abs(pitch - current[-1]) > MAX_LEAP):
+            if len(current) >= min_length:
+                phrases.append(current)
+            current = []
+        if in_range:
+            current.append(pitch)
+    if len(current) >= min_length:
+        phrases.append(current)
+    return phrases
+
+
+def read_melodies(path: Path, min_length: int = 2) -> list[list[int]]:
+    """
+    Мелодии файла: по фразе на голос (дорожка и канал) в диапазоне 88 клавиш.
+
+    Файл читается по дорожкам: в памяти одновременно только одна дорожка.
+
+    Raises:
+        MidiError: Файл повреждён или это не MIDI
+    """
+    phrases = []
+    with open(path, "rb") as stream:
+        if _read_exact(stream, 4) != b"MThd":
+            raise MidiError("Нет заголовка MThd")
+        (header_length,) = struct.unpack(">I", _read_exact(stream, 4))
+        if header_length < 6:
+            raise MidiError("Короткий заголовок MThd")
+        _, track_count, _ = struct.unpack(">HHH", _read_exact(stream, 6))
+        stream.seek(header_length - 6, os.SEEK_CUR)
+
+        for _ in range(track_count):
+            chunk = stream.read(8)
+            if len(chunk) < 8:
+                break  # Дорожек меньше, чем заявлено, — берём прочитанные
+            chunk_type, length = struct.unpack(">4sI", chunk)
+            if chunk_type != b"MTrk":
+                stream.seek(length, os.SEEK_CUR)
+                continue
+            for events in _parse_track(_read_exact(stream, length)).values():
+                phrases += split_phrases(_skyline(events), min_length)
+    return phrases
@@ -1,19 +1,23 @@
 """Модули данных (ноты, октавы)."""
 
 from piano_ear_trainer.data.notes import (
+    A4_FREQUENCY,
     NOTES_BY_MIDI,
     NOTES_BY_NAME,
     PIANO_NOTES,
     Note,
     NoteName,
     Octave,
+    generate_all_notes,
 )
 
 __all__ = [
+    "A4_FREQUENCY",
     "Note",
     "NoteName",
     "Octave",
     "PIANO_NOTES",
     "NOTES_BY_MIDI",
     "NOTES_BY_NAME",
+    "generate_all_notes",
 ]
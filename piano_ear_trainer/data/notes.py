@@ -3,6 +3,9 @@
 from dataclasses import dataclass
 from enum import Enum
 
+# Стандартный строй: частота ноты Ля первой октавы (A4), Гц
+A4_FREQUENCY = 440.0
+
 
 class NoteName(Enum):
     """Названия нот."""
@@ -79,9 +82,11 @@ class Note:
         return f"{self.short_name}.wav"
 
 
-def _calculate_frequency(midi_number: int) -> float:
-    """Рассчитать частоту ноты по MIDI номеру (A4 = 440 Гц)."""
-    return 440.0 * (2 ** ((midi_number - 69) / 12))
+def _calculate_frequency(
+    midi_number: int, reference_pitch: float = A4_FREQUENCY
+) -> float:
+    """Рассчитать частоту ноты по MIDI номеру (по умолчанию A4 = 440 Гц)."""
+    return reference_pitch * (2 ** ((midi_number - 69) / 12))
 
 
 def _get_octave_for_midi(midi_number: int) -> Octave:
@@ -130,8 +135,14 @@ def _is_black_key(midi_number: int) -> bool:
     return note_in_octave in black_keys
 
 
-def generate_all_notes() -> list[Note]:
-    """Сгенерировать все 88 нот фортепиано (A0 до C8)."""
+def generate_all_notes(reference_pitch: float = A4_FREQUENCY) -> list[Note]:
+    """
+    Сгенерировать все 88 нот фортепиано (A0 до C8).
+
+    Args:
+        reference_pitch: Частота A4 в Гц (440 — стандарт, 442 или 415 — для
+                        оркестров и барочного строя)
+    """
     notes = []
     # Фортепиано: MIDI 21 (A0) до MIDI 108 (C8)
     for midi in range(21, 109):
@@ -139,7 +150,7 @@ def generate_all_notes() -> list[Note]:
             midi_number=midi,
             name=_get_note_name_for_midi(midi),
             octave=_get_octave_for_midi(midi),
-            frequency=_calculate_frequency(midi),
+            frequency=_calculate_frequency(midi, reference_pitch),
             is_black_key=_is_black_key(midi),
         )
         notes.append(note)
@@ -0,0 +1,338 @@
+"""Внутренние метрики приложения: счётчики, датчики, гистограммы.
+
+Метрики объявляются в модулях, которые их обновляют, через общий реестр
+REGISTRY. По умолчанию реестр выключен: обновление метрики — один вызов
+метода с проверкой флага. Экспорт включается переменной окружения
+PIANO_EAR_TRAINER_METRICS с путём к файлу (.json — JSON, иначе текстовый
+формат Prometheus).
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+# Переменные окружения экспортёра
+METRICS_ENV = "PIANO_EAR_TRAINER_METRICS"
+METRICS_INTERVAL_ENV = "PIANO_EAR_TRAINER_METRICS_INTERVAL"
+
+# Корзины гистограмм по умолчанию, с
+DEFAULT_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0)
+
+Sample = tuple[str, dict[str, str], float]  # Суффикс имени, метки, значение
+
+_log = logging.getLogger(__name__)
+
+
+class _Metric(ABC):
+    """
+    Базовый класс метрики с поддержкой меток.
+
+    Метрики обновляют фоновые потоки (реверберация, наборы, строй), поэтому
+    изменение значения идёт под блокировкой — её берут только при
+    включённом реестре.
+    """
+
+    kind = ""
+
+    def __init__(
+        self,
+        registry: "MetricsRegistry | None",
+        name: str,
+        help_text: str = "",
+        labelnames: tuple[str, ...] = (),
+    ) -> None:
+        self._registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], _Metric] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def _enabled(self) -> bool:
+        return self._registry is None or self._registry.enabled
+
+    def labels(self, *values: str) -> "_Metric":
+        """Возвращает дочернюю метрику для значений меток."""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self) -> "_Metric":
+        return type(self)(self._registry, self.name)
+
+    def samples(self) -> Iterator[Sample]:
+        """Текущие значения (для экспорта)."""
+        if not self.labelnames:
+            yield from self._own_samples({})
+            return
+        for values, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, values, strict=True))
+            yield from child._own_samples(labels)
+
+    @abstractmethod
+    def _own_samples(self, labels: dict[str, str]) -> Iterator[Sample]:
+        """Значения этой метрики (без дочерних) с метками labels."""
+
+
+class Counter(_Metric):
+    """Монотонно растущий счётчик."""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Увеличивает счётчик."""
+        if self._enabled:
+            with self._lock:
+                self.value += amount
+
+    def _own_samples(self, labels: dict[str, str]) -> Iterator[Sample]:
+        yield "", labels, self.value
+
+
+class Gauge(_Metric):
+    """Значение, которое может расти и падать."""
+
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.value = 0.0
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float) -> None:
+        """Устанавливает значение."""
+        if self._enabled:
+            self.value = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Значение будет вычисляться при экспорте."""
+        self._function = function
+
+    def _own_samples(self, labels: dict[str, str]) -> Iterator[Sample]:
+        value = self._function() if self._function is not None else self.value
+        yield "", labels, float(value)
+
+
+class _Timer:
+    """Контекстный менеджер замера длительности."""
+
+    __slots__ = ("_histogram", "_started")
+
+    def __init__(self, histogram: "Histogram") -> None:
+        self._histogram = histogram
+        self._started = 0.0
+
+    def __enter__(self) -> "_Timer":
+        if self._histogram._enabled:
+            self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._started:
+            self._histogram.observe(time.perf_counter() - self._started)
+
+
+class Histogram(_Metric):
+    """Распределение длительностей по корзинам."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, *args, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **kwargs
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Последняя — +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self._registry, self.name, buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Учитывает одно измерение."""
+        if not self._enabled:
+            return
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            self.max = max(self.max, value)
+
+    def time(self) -> _Timer:
+        """Замеряет длительность блока with."""
+        return _Timer(self)
+
+    def _own_samples(self, labels: dict[str, str]) -> Iterator[Sample]:
+        # Согласованный снимок: корзины, сумма и число из одного момента
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative = 0
+        for bound, n in zip((*self.buckets, math.inf), counts, strict=True):
+            cumulative += n
+            le = "+Inf" if bound == math.inf else f"{bound:g}"
+            yield "_bucket", {**labels, "le": le}, cumulative
+        yield "_sum", labels, total
+        yield "_count", labels, count
+
+
+class MetricsRegistry:
+    """Реестр метрик приложения."""
+
+    def __init__(self, prefix: str = "piano_ear_trainer_") -> None:
+        self.prefix = prefix
+        self.enabled = False
+        self._metrics: dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls: type, name: str, help_text: str, **kwargs):
+        full_name = self.prefix + name
+        metric = self._metrics.get(full_name)
+        if metric is None:
+            metric = cls(self, full_name, help_text, **kwargs)
+            self._metrics[full_name] = metric
+        return metric
+
+    def counter(
+        self, name: str, help_text: str = "", labelnames: tuple[str, ...] = ()
+    ) -> Counter:
+        """Создаёт (или возвращает существующий) счётчик."""
+        return self._get_or_create(Counter, name, help_text, labelnames=labelnames)
+
+    def gauge(
+        self, name: str, help_text: str = "", labelnames: tuple[str, ...] = ()
+    ) -> Gauge:
+        """Создаёт (или возвращает существующий) датчик."""
+        return self._get_or_create(Gauge, name, help_text, labelnames=labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str = "",
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Создаёт (или возвращает существующую) гистограмму."""
+        return self._get_or_create(
+            Histogram, name, help_text, labelnames=labelnames, buckets=buckets
+        )
+
+    def to_prometheus(self) -> str:
+        """Текстовый формат экспозиции Prometheus."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            if metric.help:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                label_text = f"{{{label_text}}}" if label_text else ""
+                lines.append(f"{metric.name}{suffix}{label_text} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self) -> str:
+        """Снимок метрик в JSON."""
+        data: dict[str, dict] = {}
+        for metric in list(self._metrics.values()):
+            data[metric.name] = {
+                "type": metric.kind,
+                "samples": [
+                    {"name": metric.name + suffix, "labels": labels, "value": value}
+                    for suffix, labels, value in metric.samples()
+                ],
+            }
+        return json.dumps(
+            {"timestamp": time.time(), "metrics": data}, ensure_ascii=False
+        )
+
+
+# Общий реестр приложения
+REGISTRY = MetricsRegistry()
+
+
+class MetricsExporter:
+    """Периодически записывает снимок реестра в файл (атомарной заменой)."""
+
+    def __init__(
+        self,
+        path: Path,
+        interval: float = 10.0,
+        registry: MetricsRegistry = REGISTRY,
+    ) -> None:
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def write(self) -> None:
+        """Записывает снимок сейчас."""
+        if self.path.suffix == ".json":
+            text = self.registry.to_json()
+        else:
+            text = self.registry.to_prometheus()
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def start(self) -> None:
+        """Включает реестр и запускает фоновую запись."""
+        self.registry.enabled = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Останавливает запись, сохранив финальный снимок."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._write_logged()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self._write_logged()
+
+    def _write_logged(self) -> None:
+        """
+        Запись, которая не роняет экспортёр.
+
+        Датчики с set_function вызывают чужой код (в том числе pygame) —
+        любая его ошибка пропускает один снимок, а не останавливает поток.
+        """
+        try:
+            self.write()
+        except Exception:
+            _log.exception("Снимок метрик не записан в %s", self.path)
+
+
+def start_exporter_from_env() -> MetricsExporter | None:
+    """Запускает экспорт, если задан PIANO_EAR_TRAINER_METRICS."""
+    target = os.environ.get(METRICS_ENV)
+    if not target:
+        return None
+    interval = float(os.environ.get(METRICS_INTERVAL_ENV, "10"))
+    exporter = MetricsExporter(Path(target).expanduser(), interval)
+    exporter.start()
+    return exporter
@@ -0,0 +1,257 @@
+"""Профили учеников: рекорды нескольких учеников на одной учётной записи.
+
+Каждый профиль — отдельный JSON-файл, а общий индекс (имя и рекорд всех
+профилей) держится в памяти, поэтому переключение профиля не читает диск.
+Запись идёт под файловой блокировкой и атомарно (временный файл +
+переименование): несколько окон и компьютеров с общей сетевой домашней
+папкой не затирают рекорды друг друга.
+"""
+
+import contextlib
+import getpass
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Папка профилей по умолчанию
+PROFILES_DIR = Path.home() / ".piano_ear_trainer_profiles"
+
+# Файл рекорда из версий без профилей (импортируется в первый профиль)
+LEGACY_RECORD_FILE = Path.home() / ".piano_ear_trainer_record.json"
+
+# Максимальная длина имени ученика
+MAX_NAME_LENGTH = 64
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Профиль ученика."""
+
+    name: str
+    best_streak: int = 0
+    updated: float = 0.0  # Время последней записи (Unix)
+
+
+def profile_id(name: str) -> str:
+    """Имя файла профиля: не зависит от регистра и допустимо в любой ФС."""
+    return hashlib.sha1(name.casefold().encode()).hexdigest()[:16]
+
+
+def default_profile_name() -> str:
+    """Имя профиля по умолчанию — имя пользователя ОС."""
+    try:
+        return getpass.getuser()
+    except Exception:  # getuser() может бросить что угодно без переменных окружения
+        return "Ученик"
+
+
+@contextlib.contextmanager
+def _locked(lock_path: Path) -> Iterator[None]:
+    """Эксклюзивная блокировка между процессами (в т.ч. на NFS через lockf)."""
+    with open(lock_path, "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.lockf(lock_file, fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            # LK_LOCK повторяет попытку 10 раз в секунду
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.lockf(lock_file, fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _write_atomic(path: Path, data: dict, durable: bool = True) -> None:
+    """
+    Пишет JSON во временный файл рядом и переименовывает поверх path.
+
+    Args:
+        path: Итоговый файл
+        data: Содержимое
+        durable: Сбросить данные на диск до переименования (fsync)
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+            # dumps: C-кодировщик (json.dump пишет по кусочку в Python)
+            tmp_file.write(json.dumps(data, ensure_ascii=False))
+            if durable:
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+        raise
+
+
+def _read_json(path: Path) -> dict | None:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _profile_from_dict(data: dict) -> Profile | None:
+    """Профиль из JSON или None, если запись повреждена (считается отсутствующей)."""
+    name = data.get("name")
+    best_streak = data.get("best_streak", 0)
+    if not isinstance(name, str) or not isinstance(best_streak, int):
+        return None
+    updated = data.get("updated", 0.0)
+    if not isinstance(updated, (int, float)):
+        updated = 0.0  # Время записи не важно для рекорда — не теряем профиль
+    return Profile(name, best_streak, float(updated))
+
+
+class ProfileStore:
+    """
+    Хранилище профилей.
+
+    Структура папки:
+        index.json        — имя и рекорд всех профилей (кэш для быстрого старта)
+        profiles/<id>.json — профиль (источник истины)
+        .lock             — блокировка записи
+    """
+
+    def __init__(self, root: Path = PROFILES_DIR) -> None:
+        self.root = root
+        self._profiles_dir = root / "profiles"
+        self._index_path = root / "index.json"
+        self._lock_path = root / ".lock"
+        self._index: dict[str, Profile] = {}  # id -> профиль
+        self._index_stamp: tuple[int, int] | None = None
+        self._last_name: str | None = None
+
+        self._profiles_dir.mkdir(parents=True, exist_ok=True)
+        # Индекс пишется без fsync: после сбоя его может не быть или он обрезан
+        if self._read_index() is None:
+            with _locked(self._lock_path):
+                if self._read_index() is None:
+                    self._rebuild_index()
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """Перечитывает индекс, если его изменил другой процесс."""
+        try:
+            stat = self._index_path.stat()
+        except OSError:
+            return False
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._index_stamp:
+            return False
+        data = _read_json(self._index_path)
+        if data is None:
+            return False
+        profiles = {}
+        for key, entry in data.get("profiles", {}).items():
+            profile = _profile_from_dict(entry) if isinstance(entry, dict) else None
+            if profile is not None:
+                profiles[key] = profile
+        self._index = profiles
+        last = data.get("last")
+        self._last_name = last if isinstance(last, str) else None
+        self._index_stamp = stamp
+        return True
+
+    def profiles(self) -> list[Profile]:
+        """Все профили по алфавиту."""
+        return sorted(self._index.values(), key=lambda p: p.name.casefold())
+
+    def get(self, name: str) -> Profile:
+        """Профиль по имени из индекса в памяти (новый — с нулевым рекордом)."""
+        return self._index.get(profile_id(name)) or Profile(name)
+
+    @property
+    def last_name(self) -> str | None:
+        """Имя профиля, выбранного последним на этой учётной записи."""
+        return self._last_name
+
+    def save(self, name: str, best_streak: int, select: bool = True) -> Profile:
+        """
+        Записывает рекорд профиля и возвращает сохранённый профиль.
+
+        Рекорд объединяется с записанным на диске (берётся максимум), так
+        что окно со старым рекордом не затрёт новый из другого окна.
+
+        Args:
+            name: Имя ученика
+            best_streak: Рекорд в этом окне
+            select: Запомнить профиль как последний выбранный
+        """
+        name = name.strip()[:MAX_NAME_LENGTH]
+        if not name:
+            raise ValueError("Пустое имя профиля")
+        key = profile_id(name)
+        path = self._profiles_dir / f"{key}.json"
+
+        with _locked(self._lock_path):
+            stored = _read_json(path)
+            previous = _profile_from_dict(stored) if stored else None
+            if previous is not None:
+                best_streak = max(best_streak, previous.best_streak)
+            profile = Profile(name, best_streak, time.time())
+            _write_atomic(path, profile.__dict__)
+
+            index = self._read_index()
+            if index is None:
+                index = self._rebuild_index()
+            index["profiles"][key] = profile.__dict__
+            if select:
+                index["last"] = name
+            # Индекс восстанавливается по профилям — fsync не нужен
+            _write_atomic(self._index_path, index, durable=False)
+
+        self._index[key] = profile
+        if select:
+            self._last_name = name
+        return profile
+
+    def import_legacy_record(self, path: Path = LEGACY_RECORD_FILE) -> Profile | None:
+        """Переносит рекорд из версии без профилей в профиль по умолчанию."""
+        if self._index:
+            return None
+        data = _read_json(path)
+        if data is None or not isinstance(data.get("best_streak"), int):
+            return None
+        return self.save(default_profile_name(), data["best_streak"])
+
+    def _read_index(self) -> dict | None:
+        """Индекс с диска или None, если его нет или он повреждён."""
+        index = _read_json(self._index_path)
+        if index is None or not isinstance(index.get("profiles"), dict):
+            return None
+        return index
+
+    def _rebuild_index(self) -> dict:
+        """Собирает индекс по файлам профилей и записывает его (под блокировкой)."""
+        entries = {}
+        for path in self._profiles_dir.glob("*.json"):
+            data = _read_json(path)
+            profile = _profile_from_dict(data) if data else None
+            if profile is not None:
+                entries[path.stem] = profile.__dict__
+        index = {"profiles": entries}
+        _write_atomic(self._index_path, index)
+        return index
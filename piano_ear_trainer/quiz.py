@@ -0,0 +1,169 @@
+"""Логика тренировки без GUI: выбор вопросов, проверка ответов и счёт."""
+
+import random
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from piano_ear_trainer.data import PIANO_NOTES, Note
+
+
+def filter_notes(octaves: Iterable[int], use_sharps: bool) -> list[Note]:
+    """Возвращает ноты выбранных октав (с чёрными клавишами или без)."""
+    selected_octaves = set(octaves)
+    filtered = []
+    for note in PIANO_NOTES:
+        # Фильтр по диезам
+        if not use_sharps and note.is_black_key:
+            continue
+        # Фильтр по октавам
+        if note.octave.number not in selected_octaves:
+            continue
+        filtered.append(note)
+    return filtered
+
+
+def make_question(
+    notes: Sequence[Note], length: int = 1, rng: random.Random | None = None
+) -> list[Note]:
+    """Загадывает ноту (length=1) или мелодию из доступных нот."""
+    if not notes:
+        raise ValueError("Нет нот для вопроса: выберите хотя бы одну октаву")
+    choice = (rng or random).choice
+    return [choice(notes) for _ in range(length)]
+
+
+def is_correct_answer(target: Sequence[Note], answer: Sequence[Note]) -> bool:
+    """Совпадает ли ответ с загаданной последовательностью."""
+    return len(target) == len(answer) and all(
+        t.midi_number == a.midi_number for t, a in zip(target, answer, strict=True)
+    )
+
+
+@dataclass(frozen=True)
+class AnswerResult:
+    """Итог одного нажатия в ответ на вопрос."""
+
+    is_correct: bool  # Нажата ожидаемая нота
+    is_complete: bool  # Вопрос закрыт: ответ засчитан в счёт
+    position: int  # Сколько нот мелодии угадано
+    answered: list[Note]  # Ответ ученика (угаданные ноты и последняя нажатая)
+    new_record: bool  # Серия побила рекорд
+
+
+class QuizEngine:
+    """
+    Состояние сессии тренировки без GUI: вопрос, счёт, серия и рекорд.
+
+    Окно, симуляции и серверы используют одну и ту же логику. Ответы по
+    одному принимает answer(), пакеты готовых ответов — grade_batch().
+    """
+
+    def __init__(self, best_streak: int = 0) -> None:
+        self.sequence: list[Note] = []  # Загаданная нота или мелодия
+        self.position = 0  # Позиция ответа в мелодии
+        self.answered = False  # Ответ на текущий вопрос уже засчитан
+        self.correct_count = 0
+        self.wrong_count = 0
+        self.current_streak = 0  # Текущая серия правильных подряд
+        self.best_streak = best_streak
+
+    @property
+    def is_waiting_answer(self) -> bool:
+        """Есть вопрос, на который ещё не ответили."""
+        return bool(self.sequence) and not self.answered
+
+    @property
+    def total(self) -> int:
+        """Число засчитанных ответов."""
+        return self.correct_count + self.wrong_count
+
+    @property
+    def percent(self) -> int:
+        """Процент правильных ответов."""
+        return int(self.correct_count / self.total * 100) if self.total else 0
+
+    def reset_session(self) -> None:
+        """Сбрасывает счётчики сессии (рекорд сохраняется)."""
+        self.correct_count = 0
+        self.wrong_count = 0
+        self.current_streak = 0
+
+    def start_question(self, sequence: Sequence[Note]) -> None:
+        """Загадывает ноту или мелодию."""
+        self.sequence = list(sequence)
+        self.position = 0
+        self.answered = False
+
+    def clear_question(self) -> None:
+        """Убирает вопрос (например, пока ждём учителя)."""
+        self.sequence = []
+        self.position = 0
+        self.answered = False
+
+    def answer(self, note: Note) -> AnswerResult:
+        """
+        Принимает очередную ноту ответа.
+
+        В мелодии верная нота сдвигает позицию, а вопрос засчитывается
+        после последней ноты или при первой ошибке.
+        """
+        if not self.is_waiting_answer:
+            raise RuntimeError("Нет вопроса, ожидающего ответа")
+        expected = self.sequence[self.position]
+        is_correct = note.midi_number == expected.midi_number
+        answered = [*self.sequence[: self.position], note]
+
+        if is_correct:
+            self.position += 1
+            if self.position < len(self.sequence):
+                return AnswerResult(True, False, self.position, answered, False)
+            self.correct_count += 1
+            self.current_streak += 1
+        else:
+            self.wrong_count += 1
+            self.current_streak = 0
+
+        new_record = self.current_streak > self.best_streak
+        if new_record:
+            self.best_streak = self.current_streak
+        self.answered = True
+        return AnswerResult(is_correct, True, self.position, answered, new_record)
+
+    def grade_batch(self, targets: ArrayLike, answers: ArrayLike) -> np.ndarray:
+        """
+        Засчитывает пакет ответов разом и возвращает маску правильных.
+
+        Args:
+            targets: MIDI-номера загаданных нот, форма (n,) или (n, длина
+                мелодии) — по строке на вопрос
+            answers: ответы той же формы
+
+        Серии считаются векторно: длина серии в каждой позиции — расстояние
+        до последней ошибки, до первой ошибки к ней прибавляется текущая
+        серия. Текущий вопрос не затрагивается.
+        """
+        targets = np.asarray(targets)
+        answers = np.asarray(answers)
+        if targets.shape != answers.shape or targets.ndim not in (1, 2):
+            raise ValueError("Формы вопросов и ответов не совпадают")
+        correct = targets == answers
+        if correct.ndim == 2:
+            correct = correct.all(axis=1)
+        if not len(correct):
+            return correct
+
+        index = np.arange(1, len(correct) + 1)
+        # Номер последней ошибки на каждой позиции (0 — ошибок ещё не было)
+        last_wrong = np.maximum.accumulate(np.where(correct, 0, index))
+        streaks = index - last_wrong
+        streaks[last_wrong == 0] += self.current_streak
+
+        correct_count = int(np.count_nonzero(correct))
+        self.correct_count += correct_count
+        self.wrong_count += len(correct) - correct_count
+        self.current_streak = int(streaks[-1])
+        self.best_streak = max(self.best_streak, int(streaks.max()))
+        return correct
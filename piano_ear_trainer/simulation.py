@@ -0,0 +1,269 @@
+"""Симуляция учеников для офлайн-оценки стратегий выбора вопросов.
+
+Виртуальный ученик узнаёт каждую ноту с некоторой вероятностью, а ошибаясь,
+путает её с соседними клавишами или той же нотой другой октавы. После
+каждого вопроса с разбором навык этой ноты растёт (после ошибки сильнее). Стратегия выбирает
+вопросы, видя только то же, что и приложение: историю ответов.
+
+Сессии распределяются по пулу процессов; у каждой сессии свой seed,
+выведенный из общего, поэтому результат не зависит от числа процессов.
+"""
+
+import random
+import time
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+
+import numpy as np
+
+from piano_ear_trainer.data import NOTES_BY_MIDI, Note
+from piano_ear_trainer.quiz import QuizEngine, make_question
+
+# Октава, в которой ноты узнаются легче всего (1-я октава)
+_HOME_OCTAVE = 4
+
+
+class UniformPolicy:
+    """Текущее поведение приложения: равновероятный выбор (make_question)."""
+
+    def choose(
+        self,
+        notes: Sequence[Note],
+        asked: list[int],
+        wrong: list[int],
+        rng: random.Random,
+    ) -> Note:
+        """Следующая нота вопроса."""
+        return make_question(notes, 1, rng)[0]
+
+
+class MistakeWeightedPolicy:
+    """Чаще спрашивает ноты с большей долей ошибок (оценка Лапласа)."""
+
+    def choose(
+        self,
+        notes: Sequence[Note],
+        asked: list[int],
+        wrong: list[int],
+        rng: random.Random,
+    ) -> Note:
+        """Следующая нота вопроса."""
+        weights = [(w + 1) / (a + 2) for a, w in zip(asked, wrong, strict=True)]
+        return rng.choices(notes, weights)[0]
+
+
+POLICIES = {
+    "uniform": UniformPolicy,
+    "mistakes": MistakeWeightedPolicy,
+}
+
+
+def confusion_weights(notes: Sequence[Note]) -> np.ndarray:
+    """
+    Веса ошибочных ответов: строка — загаданная нота, столбец — ответ.
+
+    Чаще всего путают соседние клавиши (полутон, тон) и ту же ноту в
+    другой октаве; небольшой вес остаётся на случайный ответ.
+    """
+    count = len(notes)
+    weights = np.full((count, count), 0.01)
+    for i, target in enumerate(notes):
+        for j, answer in enumerate(notes):
+            semitones = abs(target.midi_number - answer.midi_number)
+            if semitones == 0:
+                weights[i, j] = 0.0
+            elif semitones <= 2:
+                weights[i, j] += 1.0 / semitones
+            elif target.name == answer.name:
+                octaves = abs(target.octave.number - answer.octave.number)
+                weights[i, j] += 0.5 / octaves
+    # Из одной ноты спутать не с чем: строка остаётся нулевой
+    sums = weights.sum(axis=1, keepdims=True)
+    return np.divide(weights, sums, out=np.zeros_like(weights), where=sums > 0)
+
+
+class VirtualLearner:
+    """
+    Ученик с навыком узнавания каждой ноты.
+
+    Args:
+        notes: ноты, которые могут встретиться в вопросах
+        rng: генератор случайных чисел этого ученика
+    """
+
+    def __init__(self, notes: Sequence[Note], rng: np.random.Generator) -> None:
+        self._rng = rng
+        base_skill = rng.uniform(0.3, 0.6)
+        self.learning_rate = rng.uniform(0.02, 0.08)
+        # Крайние регистры и чёрные клавиши узнаются хуже
+        self.skill = np.array(
+            [
+                base_skill
+                - 0.08 * abs(note.octave.number - _HOME_OCTAVE)
+                - 0.05 * note.is_black_key
+                for note in notes
+            ]
+        ).clip(0.05, 0.95)
+        self._confusion = np.cumsum(confusion_weights(notes), axis=1)
+        self._skill_sum = float(self.skill.sum())
+
+    def answer(self, index: int) -> int:
+        """Индекс ноты, которую ученик назовёт в ответ."""
+        row = self._confusion[index]
+        if not row[-1] or self._rng.random() < self.skill[index]:
+            return index  # Единственную ноту не с чем спутать
+        return min(
+            int(np.searchsorted(row, self._rng.random() * row[-1])), len(row) - 1
+        )
+
+    def learn(self, index: int, is_correct: bool) -> None:
+        """Разбор ответа: навык ноты приближается к 1, после ошибки быстрее."""
+        rate = self.learning_rate if is_correct else 2 * self.learning_rate
+        gain = rate * (1.0 - self.skill[index])
+        self.skill[index] += gain
+        self._skill_sum += gain
+
+    @property
+    def mastery(self) -> float:
+        """Средний навык по всем нотам."""
+        return self._skill_sum / len(self.skill)
+
+
+@dataclass
+class SimulationReport:
+    """Итоги прогона стратегии."""
+
+    policy: str
+    sessions: int
+    questions: int
+    block: int
+    correct: np.ndarray  # Доля верных ответов по блокам вопросов (среднее)
+    mastery: np.ndarray  # Средний навык в конце каждого блока (среднее)
+    best_streak: float  # Средний рекорд серии за сессию
+    blocks_to_target: float  # Медиана блоков до точности 80% (inf — не достигли)
+    seconds: float
+
+    @property
+    def sessions_per_second(self) -> float:
+        """Скорость симуляции."""
+        return self.sessions / self.seconds if self.seconds else 0.0
+
+
+def run_session(
+    policy: str, midi: Sequence[int], questions: int, seed: np.random.SeedSequence
+) -> tuple[np.ndarray, np.ndarray, int]:
+    """
+    Одна сессия: ответы ученика и его навык после каждого вопроса.
+
+    Returns:
+        (маска верных ответов, средний навык после каждого вопроса,
+        рекорд серии)
+    """
+    notes = [NOTES_BY_MIDI[m] for m in midi]
+    index_of = {note.midi_number: i for i, note in enumerate(notes)}
+    learner_seed, policy_seed = seed.spawn(2)
+    learner = VirtualLearner(notes, np.random.default_rng(learner_seed))
+    chooser = POLICIES[policy]()
+    rng = random.Random(int(policy_seed.generate_state(1)[0]))
+
+    engine = QuizEngine()
+    asked = [0] * len(notes)
+    wrong = [0] * len(notes)
+    correct = np.zeros(questions, dtype=bool)
+    mastery = np.zeros(questions)
+    for step in range(questions):
+        target = chooser.choose(notes, asked, wrong, rng)
+        index = index_of[target.midi_number]
+        engine.start_question([target])
+        result = engine.answer(notes[learner.answer(index)])
+        learner.learn(index, result.is_correct)
+        asked[index] += 1
+        wrong[index] += not result.is_correct
+        correct[step] = result.is_correct
+        mastery[step] = learner.mastery
+    return correct, mastery, engine.best_streak
+
+
+def _run_chunk(
+    policy: str,
+    midi: list[int],
+    questions: int,
+    seeds: list[np.random.SeedSequence],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Задача для процесса пула: несколько сессий одним ответом."""
+    results = [run_session(policy, midi, questions, seed) for seed in seeds]
+    return (
+        np.array([r[0] for r in results]),
+        np.array([r[1] for r in results]),
+        np.array([r[2] for r in results]),
+    )
+
+
+def simulate(
+    policy: str,
+    notes: Sequence[Note],
+    sessions: int = 1000,
+    questions: int = 200,
+    seed: int = 0,
+    block: int = 20,
+    max_workers: int | None = None,
+    chunk_size: int = 50,
+) -> SimulationReport:
+    """
+    Прогоняет стратегию на множестве учеников.
+
+    Args:
+        policy: ключ POLICIES
+        notes: ноты, из которых задаются вопросы
+        sessions: число учеников (по одной сессии на ученика)
+        questions: вопросов в сессии
+        seed: общий seed; одинаковый seed даёт одинаковый результат
+        block: размер блока вопросов для кривой обучения
+        max_workers: процессов в пуле (None — по числу ядер)
+        chunk_size: сессий в одной задаче пула
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Неизвестная стратегия: {policy}")
+    if not notes:
+        raise ValueError("Нет нот для вопросов")
+    midi = [note.midi_number for note in notes]
+    seeds = np.random.SeedSequence(seed).spawn(sessions)
+    chunks = [seeds[i : i + chunk_size] for i in range(0, sessions, chunk_size)]
+
+    started = time.perf_counter()
+    # spawn: форк процесса с Qt/SDL небезопасен
+    with ProcessPoolExecutor(max_workers, mp_context=get_context("spawn")) as pool:
+        parts = list(
+            pool.map(
+                _run_chunk,
+                [policy] * len(chunks),
+                [midi] * len(chunks),
+                [questions] * len(chunks),
+                chunks,
+            )
+        )
+    seconds = time.perf_counter() - started
+
+    correct = np.concatenate([p[0] for p in parts])
+    mastery = np.concatenate([p[1] for p in parts])
+    best = np.concatenate([p[2] for p in parts])
+
+    blocks = questions // block
+    block_correct = correct[:, : blocks * block].reshape(sessions, blocks, block)
+    accuracy = block_correct.mean(axis=2)  # (сессии, блоки)
+    reached = accuracy >= 0.8
+    first_block = np.where(reached.any(axis=1), reached.argmax(axis=1) + 1, np.inf)
+
+    return SimulationReport(
+        policy=policy,
+        sessions=sessions,
+        questions=questions,
+        block=block,
+        correct=accuracy.mean(axis=0),
+        mastery=mastery[:, block - 1 : blocks * block : block].mean(axis=0),
+        best_streak=float(best.mean()),
+        blocks_to_target=float(np.median(first_block)),
+        seconds=seconds,
+    )
@@ -0,0 +1,4 @@
+"""Служебные утилиты: проверки, бенчмарки, конвертеры.
+
+Каждый модуль запускается как `python -m piano_ear_trainer.tools.<имя>`.
+"""
@@ -0,0 +1,80 @@
+"""Бенчмарк полной пересборки банка семплов под другой строй.
+
+Удаляет дисковый кэш выбранного строя, собирает банк заново в пуле
+процессов и печатает время сборки, время загрузки в микшер и объём памяти.
+
+    python -m piano_ear_trainer.tools.bank_benchmark --pitch 442 --workers 4
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+import pygame.sndarray  # noqa: E402
+
+from piano_ear_trainer.audio.bank import bank_cache_dir, build_tuned_bank  # noqa: E402
+from piano_ear_trainer.audio.player import AudioPlayer  # noqa: E402
+
+
+def _peak_rss_mb() -> float | None:
+    """Пиковый RSS процесса в МБ (только Unix)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдаёт КБ, macOS — байты
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Точка входа утилиты."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pitch", type=float, default=442.0, help="частота A4")
+    parser.add_argument("--workers", type=int, default=None, help="число процессов")
+    args = parser.parse_args(argv)
+
+    player = AudioPlayer()
+    # Сверка манифеста при старте может удалять рендеры из кэша строёв
+    while player.is_switching_pack:
+        time.sleep(0.01)
+    mixer_format = pygame.mixer.get_init()
+    cache_dir = bank_cache_dir(player.samples_dir, args.pitch, mixer_format)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+    started = time.perf_counter()
+    paths = build_tuned_bank(
+        player.samples_dir, player._format, args.pitch, mixer_format, args.workers
+    )
+    build_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    arrays = [np.load(path) for path in paths.values()]
+    sounds = [pygame.sndarray.make_sound(pcm) for pcm in arrays]
+    load_time = time.perf_counter() - started
+
+    pcm_bytes = sum(pcm.nbytes for pcm in arrays)
+    disk_bytes = sum(path.stat().st_size for path in paths.values())
+
+    print(f"Строй A4 = {args.pitch:g} Гц, нот: {len(sounds)}")
+    print(f"Сборка (пул процессов): {build_time:.2f} с")
+    print(f"Загрузка из кэша:       {load_time:.2f} с")
+    print(f"PCM в памяти:           {pcm_bytes / 2**20:.1f} МБ")
+    print(f"Кэш на диске:           {disk_bytes / 2**20:.1f} МБ ({cache_dir})")
+    peak = _peak_rss_mb()
+    if peak is not None:
+        print(f"Пиковый RSS процесса:   {peak:.1f} МБ")
+
+    player.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
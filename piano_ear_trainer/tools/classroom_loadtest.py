@@ -0,0 +1,123 @@
+"""Нагрузочный тест сервера класса на localhost.
+
+Сервер запускается в отдельном процессе, в этом процессе поднимаются
+сотни клиентов asyncio. Для каждого числа клиентов печатаются задержка
+доставки вопроса (от рассылки до получения клиентом) и процессорное
+время сервера на вопрос.
+
+    python -m piano_ear_trainer.tools.classroom_loadtest --clients 30 100 200
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from multiprocessing import Pipe, get_context
+from multiprocessing.connection import Connection
+
+from piano_ear_trainer.classroom import protocol
+from piano_ear_trainer.classroom.server import ClassroomServer
+from piano_ear_trainer.data import PIANO_NOTES
+
+
+async def _serve(conn: Connection, clients: int, questions: int, interval: float):
+    server = ClassroomServer("127.0.0.1", 0)
+    await server.start()
+    conn.send(server.port)
+    while server.client_count < clients:
+        await asyncio.sleep(0.01)
+
+    cpu_started = time.process_time()
+    for _ in range(questions):
+        server.broadcast_question([random.choice(PIANO_NOTES).midi_number])
+        await asyncio.sleep(interval)
+    await asyncio.sleep(interval)  # Последние ответы
+    cpu = time.process_time() - cpu_started
+
+    answers = sum(len(result.answers) for result in server.results)
+    conn.send((cpu, answers))
+    await server.close()
+
+
+def _server_process(conn: Connection, clients: int, questions: int, interval: float):
+    """Точка входа процесса сервера."""
+    asyncio.run(_serve(conn, clients, questions, interval))
+
+
+async def _client(port: int, questions: int, latencies: list[float]) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(protocol.encode(protocol.HELLO, name="loadtest"))
+    received = 0
+    while received < questions:
+        line = await reader.readline()
+        if not line:
+            break
+        message = protocol.decode(line)
+        if message is None or message["type"] != protocol.QUESTION:
+            continue
+        latencies.append(time.time() - message["sent_at"])
+        received += 1
+        writer.write(
+            protocol.encode(
+                protocol.ANSWER, id=message["id"], midi=message["midi"], elapsed=0.5
+            )
+        )
+    writer.close()
+
+
+async def _run_clients(port: int, clients: int, questions: int) -> list[float]:
+    latencies: list[float] = []
+    await asyncio.gather(*(_client(port, questions, latencies) for _ in range(clients)))
+    return latencies
+
+
+def run_case(clients: int, questions: int, interval: float) -> dict:
+    """Прогоняет один сценарий и возвращает сводку."""
+    parent_conn, child_conn = Pipe()
+    process = get_context("spawn").Process(
+        target=_server_process, args=(child_conn, clients, questions, interval)
+    )
+    process.start()
+    port = parent_conn.recv()
+    latencies = asyncio.run(_run_clients(port, clients, questions))
+    cpu, answers = parent_conn.recv()
+    process.join()
+
+    latencies.sort()
+    return {
+        "clients": clients,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "cpu_per_question_ms": cpu / questions * 1000,
+        "answers": answers,
+        "expected": clients * questions,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Точка входа утилиты."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[30, 100, 200])
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'клиентов':>9} {'p50, мс':>8} {'p95, мс':>8} {'max, мс':>8} "
+        f"{'CPU/вопрос, мс':>15} {'ответов':>12}"
+    )
+    for clients in args.clients:
+        r = run_case(clients, args.questions, args.interval)
+        print(
+            f"{r['clients']:>9} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+            f"{r['max_ms']:>8.2f} {r['cpu_per_question_ms']:>15.2f} "
+            f"{r['answers']:>5}/{r['expected']:<6}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Конвертация банка семплов в другие форматы (WAV, FLAC, OGG/Vorbis).
+
+Нужен пакет soundfile (libsndfile): pip install soundfile. Банки
+записываются в папки из реестра форматов рядом с исходным, например
+assets/samples_ogg; приложение само выберет самый быстрый из них.
+
+    python -m piano_ear_trainer.tools.convert_samples --formats ogg flac wav
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from piano_ear_trainer.audio.formats import FORMATS
+from piano_ear_trainer.audio.player import _get_base_path
+from piano_ear_trainer.data import PIANO_NOTES
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Точка входа утилиты."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--source",
+        type=Path,
+        default=_get_base_path() / "assets" / "samples_mp3",
+        help="папка исходного банка",
+    )
+    parser.add_argument(
+        "--formats", nargs="+", choices=list(FORMATS), default=["ogg", "flac", "wav"]
+    )
+    parser.add_argument(
+        "--quality", type=float, default=0.6, help="качество Vorbis (0..1)"
+    )
+    parser.add_argument("--force", action="store_true", help="перезаписать файлы")
+    args = parser.parse_args(argv)
+
+    try:
+        import soundfile
+    except ImportError:
+        print("Нужен пакет soundfile: pip install soundfile", file=sys.stderr)
+        return 1
+
+    sources = {}
+    for note in PIANO_NOTES:
+        matches = sorted(args.source.glob(f"{note.short_name}.*"))
+        if matches:
+            sources[note.short_name] = matches[0]
+    if not sources:
+        print(f"Нет семплов в {args.source}", file=sys.stderr)
+        return 1
+
+    for name in args.formats:
+        sample_format = FORMATS[name]
+        target_dir = args.source.parent / sample_format.directory
+        target_dir.mkdir(parents=True, exist_ok=True)
+        written = 0
+        for short_name, source in sources.items():
+            target = target_dir / f"{short_name}.{name}"
+            if target == source or (target.exists() and not args.force):
+                continue
+            data, sample_rate = soundfile.read(source, dtype="int16")
+            tmp_path = target.with_name(target.name + ".tmp")
+            options = {}
+            if sample_format.sf_subtype == "VORBIS":
+                options["compression_level"] = 1.0 - args.quality
+            with soundfile.SoundFile(
+                tmp_path,
+                "w",
+                sample_rate,
+                data.shape[1] if data.ndim > 1 else 1,
+                sample_format.sf_subtype,
+                format=sample_format.sf_format,
+                **options,
+            ) as out:
+                out.write(data)
+            tmp_path.replace(target)
+            written += 1
+        size = sum(p.stat().st_size for p in target_dir.glob(f"*.{name}"))
+        print(
+            f"{sample_format.description}: {target_dir} — записано {written}, "
+            f"{size / 2**20:.1f} МБ"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
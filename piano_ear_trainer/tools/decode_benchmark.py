@@ -0,0 +1,64 @@
+"""Сравнение скорости декодирования установленных банков семплов.
+
+Печатает время декодирования одного семпла для каждого формата и
+обновляет сохранённый порядок, по которому приложение выбирает банк.
+
+    python -m piano_ear_trainer.tools.decode_benchmark --repeats 3
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+import pygame  # noqa: E402
+
+from piano_ear_trainer.audio.formats import (  # noqa: E402
+    FORMATS,
+    find_banks,
+    rank_formats,
+    ranking_key,
+    save_ranking,
+)
+from piano_ear_trainer.audio.player import _get_base_path  # noqa: E402
+from piano_ear_trainer.data import PIANO_NOTES  # noqa: E402
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Точка входа утилиты."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--assets", type=Path, default=_get_base_path() / "assets", help="папка банков"
+    )
+    parser.add_argument("--repeats", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+    banks = find_banks(args.assets)
+    if not banks:
+        print("Не найдено ни одного полного банка семплов", file=sys.stderr)
+        return 1
+
+    ranking = rank_formats(banks, PIANO_NOTES, args.repeats)
+    print(f"{'формат':>20} {'мс/семпл':>10} {'весь банк, с':>13}")
+    for name, seconds in ranking:
+        print(
+            f"{FORMATS[name].description:>20} {seconds * 1000:>10.2f} "
+            f"{seconds * len(PIANO_NOTES):>13.2f}"
+        )
+    for name in banks.keys() - {name for name, _ in ranking}:
+        print(f"{FORMATS[name].description:>20} {'не поддерживается':>24}")
+
+    save_ranking(
+        ranking_key(list(banks), pygame.mixer.get_init()),
+        [name for name, _ in ranking],
+    )
+    pygame.mixer.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
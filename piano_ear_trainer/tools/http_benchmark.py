@@ -0,0 +1,105 @@
+"""Нагрузочный бенчмарк HTTP-сервера викторины на localhost.
+
+Сервер запускается в отдельном процессе, клиенты — в пуле процессов с
+keep-alive соединениями. Для каждого сценария печатаются запросы в
+секунду и пропускная способность.
+
+    python -m piano_ear_trainer.tools.http_benchmark --concurrency 8 --duration 5
+"""
+
+import argparse
+import http.client
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.connection import Connection
+
+from piano_ear_trainer.web.server import create_server
+
+SCENARIOS = ("question", "answer", "sample", "sample-304")
+
+
+def _server_process(conn: Connection) -> None:
+    """Точка входа процесса сервера."""
+    server = create_server("127.0.0.1", 0)
+    conn.send(server.server_address[1])
+    server.serve_forever()
+
+
+def _prepare(conn: http.client.HTTPConnection) -> tuple[str, str, str]:
+    """Вопрос, ссылка на семпл и его ETag для сценариев."""
+    conn.request("GET", "/api/question?octaves=3,4,5&sharps=1")
+    question = json.loads(conn.getresponse().read())
+    sample_url = question["samples"][0]
+    conn.request("GET", sample_url)
+    response = conn.getresponse()
+    response.read()
+    return question["token"], sample_url, response.getheader("ETag")
+
+
+def _client(port: int, scenario: str, duration: float) -> tuple[int, int]:
+    """Гоняет запросы одного сценария; возвращает (запросов, байт)."""
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    token, sample_url, etag = _prepare(conn)
+    answer_body = json.dumps({"token": token, "answer": [60]})
+    requests = received = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        if scenario == "question":
+            conn.request("GET", "/api/question?octaves=3,4,5&sharps=1")
+        elif scenario == "answer":
+            conn.request(
+                "POST",
+                "/api/answer",
+                answer_body,
+                {"Content-Type": "application/json"},
+            )
+        elif scenario == "sample":
+            conn.request("GET", sample_url)
+        else:
+            conn.request("GET", sample_url, headers={"If-None-Match": etag})
+        received += len(conn.getresponse().read())
+        requests += 1
+    conn.close()
+    return requests, received
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Точка входа утилиты."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS))
+    args = parser.parse_args(argv)
+
+    context = get_context("spawn")
+    parent_conn, child_conn = context.Pipe()
+    server = context.Process(target=_server_process, args=(child_conn,), daemon=True)
+    server.start()
+    port = parent_conn.recv()
+
+    print(f"{'сценарий':>12} {'запр/с':>10} {'МБ/с':>8}")
+    try:
+        with ProcessPoolExecutor(args.concurrency, mp_context=context) as pool:
+            for scenario in args.scenarios:
+                futures = [
+                    pool.submit(_client, port, scenario, args.duration)
+                    for _ in range(args.concurrency)
+                ]
+                results = [f.result() for f in futures]
+                requests = sum(r for r, _ in results)
+                received = sum(b for _, b in results)
+                print(
+                    f"{scenario:>12} {requests / args.duration:>10.0f} "
+                    f"{received / args.duration / 2**20:>8.1f}"
+                )
+    finally:
+        server.terminate()
+        server.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
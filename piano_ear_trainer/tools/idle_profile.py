@@ -0,0 +1,187 @@
+"""Потребление в простое: пробуждения потоков и процессорное время в минуту.
+
+Открывает главное окно, ждёт наступления простоя (плеер закрывает
+аудиоустройство) и меряет процесс без ввода: пробуждения потоков
+(добровольные переключения контекста) и процессорное время в пересчёте
+на минуту, на Linux — по потокам. Для сравнения: --no-idle держит
+устройство открытым, --hover водит мышь над клавиатурой неактивного окна.
+
+    python -m piano_ear_trainer.tools.idle_profile --seconds 60
+    python -m piano_ear_trainer.tools.idle_profile --seconds 60 --no-idle
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from PySide6.QtCore import QEvent, QEventLoop, QObject, QPointF, Qt, QTimer
+from PySide6.QtGui import QMouseEvent
+from PySide6.QtWidgets import QApplication, QWidget
+
+from piano_ear_trainer.ui.main_window import MainWindow
+
+# Пробуждения и время по потокам (Linux)
+_TASKS_DIR = Path("/proc/self/task")
+
+
+def _process_usage() -> tuple[float, int | None]:
+    """(процессорное время, с; добровольные переключения контекста)."""
+    try:
+        import resource
+    except ImportError:
+        return time.process_time(), None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime, usage.ru_nvcsw
+
+
+def _thread_usage() -> dict[int, tuple[str, float, int]]:
+    """Потоки процесса: tid -> (имя, процессорное время, с; пробуждения)."""
+    threads = {}
+    ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+    try:
+        tids = [int(tid) for tid in os.listdir(_TASKS_DIR)]
+    except OSError:
+        return threads
+    for tid in tids:
+        task = _TASKS_DIR / str(tid)
+        try:
+            name = (task / "comm").read_text().strip()
+            # Имя в stat может содержать пробелы: поля считаем после ")"
+            fields = (task / "stat").read_text().rpartition(")")[2].split()
+            status = (task / "status").read_text()
+        except OSError:
+            continue  # Поток завершился
+        cpu = (int(fields[11]) + int(fields[12])) / ticks
+        switches = next(
+            int(line.split()[1])
+            for line in status.splitlines()
+            if line.startswith("voluntary_ctxt_switches")
+        )
+        threads[tid] = (name, cpu, switches)
+    return threads
+
+
+class _PaintCounter(QObject):
+    """Считает перерисовки виджетов, на которых установлен фильтр."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.count = 0
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.Type.Paint:
+            self.count += 1
+        return False
+
+
+def _run_for(seconds: float) -> None:
+    """Крутит цикл событий seconds секунд (окна при выходе не закрываются)."""
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Точка входа утилиты."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=30.0, help="длина замера")
+    parser.add_argument(
+        "--idle-after",
+        type=float,
+        default=2.0,
+        help="через сколько секунд без ввода наступает простой",
+    )
+    parser.add_argument(
+        "--no-idle", action="store_true", help="не закрывать аудиоустройство"
+    )
+    parser.add_argument(
+        "--hover",
+        type=float,
+        default=0.0,
+        metavar="HZ",
+        help="движений мыши в секунду над клавиатурой неактивного окна",
+    )
+    args = parser.parse_args(argv)
+
+    _app = QApplication.instance() or QApplication(sys.argv[:1])
+    MainWindow.IDLE_SECONDS = None if args.no_idle else args.idle_after
+    window = MainWindow()
+    window.stacked_widget.setCurrentWidget(window.training_screen)
+    window.show()
+    paints = _PaintCounter()
+    window.keyboard.installEventFilter(paints)
+
+    hover_timer = QTimer()
+    if args.hover > 0:
+        # Фокус у другого окна, мышь ходит по клавишам туда и обратно
+        other = QWidget()
+        other.show()
+        other.activateWindow()
+        keyboard = window.keyboard
+        position = 0
+
+        def move_mouse() -> None:
+            nonlocal position
+            position = (position + 7) % (2 * keyboard.width())
+            x = (
+                position
+                if position < keyboard.width()
+                else 2 * keyboard.width() - position
+            )
+            point = QPointF(x, keyboard.height() * 0.8)
+            event = QMouseEvent(
+                QEvent.Type.MouseMove,
+                point,
+                QPointF(keyboard.mapToGlobal(point)),
+                Qt.MouseButton.NoButton,
+                Qt.MouseButton.NoButton,
+                Qt.KeyboardModifier.NoModifier,
+            )
+            QApplication.sendEvent(keyboard, event)
+
+        hover_timer.timeout.connect(move_mouse)
+        hover_timer.start(max(1, int(1000 / args.hover)))
+
+    # Ждём загрузки и наступления простоя
+    _run_for((0 if args.no_idle else args.idle_after) + 1.0)
+    player = window._audio_player
+    paints.count = 0
+    cpu_before, switches_before = _process_usage()
+    threads_before = _thread_usage()
+    started = time.perf_counter()
+    _run_for(args.seconds)
+    elapsed = time.perf_counter() - started
+    cpu_after, switches_after = _process_usage()
+    threads_after = _thread_usage()
+    suspended = player.is_suspended
+    hover_timer.stop()
+    window.close()
+
+    per_minute = 60.0 / elapsed
+    mode = "выключен" if args.no_idle else f"простой через {args.idle_after:g} с"
+    print(f"Режим простоя: {mode}; устройство закрыто: {'да' if suspended else 'нет'}")
+    wakeups = (
+        f"{(switches_after - switches_before) * per_minute:.0f}/мин"
+        if switches_before is not None
+        else "—"
+    )
+    print(
+        f"За {elapsed:.1f} с: пробуждений {wakeups}, "
+        f"ЦП {(cpu_after - cpu_before) * per_minute * 1000:.0f} мс/мин, "
+        f"перерисовок клавиатуры {paints.count * per_minute:.0f}/мин"
+    )
+    if threads_after:
+        print(f"\n{'поток':<20} {'пробуждений/мин':>16} {'ЦП, мс/мин':>11}")
+        for tid, (name, cpu, switches) in sorted(threads_after.items()):
+            _, cpu_start, switches_start = threads_before.get(tid, (name, 0.0, 0))
+            print(
+                f"{name:<20} {(switches - switches_start) * per_minute:>16.0f} "
+                f"{(cpu - cpu_start) * per_minute * 1000:>11.1f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
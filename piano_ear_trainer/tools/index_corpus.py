@@ -0,0 +1,73 @@
+"""Индексация папки MIDI-файлов для диктанта по реальным мелодиям.
+
+Строит индекс фрагментов (2–8 нот) по уровням сложности в папке, которую
+открывает приложение, и печатает статистику и примеры фрагментов.
+
+    python -m piano_ear_trainer.tools.index_corpus ~/midi --workers 8
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+from piano_ear_trainer.corpus import (
+    LEVELS,
+    CorpusIndex,
+    build_index,
+    default_index_dir,
+)
+from piano_ear_trainer.data import NOTES_BY_MIDI
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Точка входа утилиты."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", type=Path, help="папка с .mid файлами")
+    parser.add_argument(
+        "--output", type=Path, default=default_index_dir(), help="папка индекса"
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk", type=int, default=64, help="файлов в задаче")
+    args = parser.parse_args(argv)
+
+    if not args.source.is_dir():
+        parser.error(f"нет папки {args.source}")
+
+    def progress(done: int) -> None:
+        print(f"\rФайлов: {done}", end="", file=sys.stderr, flush=True)
+
+    report = build_index(
+        args.source, args.output, args.workers, args.chunk, progress=progress
+    )
+    print(file=sys.stderr)
+    print(
+        f"{report.files} файлов ({report.failed} с ошибками), "
+        f"{report.phrases} фраз, {report.notes} нот за {report.seconds:.1f} с "
+        f"({(report.files + report.failed) / report.seconds:.0f} файлов/с)"
+    )
+    if not report.files:
+        return 1
+
+    index = CorpusIndex(args.output)
+    print(f"{'нот':>4} {'фрагментов':>11} {'паттернов':>10}  по уровням")
+    for length in index.lengths:
+        levels = " ".join(
+            f"{index.count(length, level):>8}" for level in range(1, LEVELS + 1)
+        )
+        print(
+            f"{length:>4} {report.ngrams[length]:>11} "
+            f"{report.patterns[length]:>10}  {levels}"
+        )
+
+    rng = random.Random(0)
+    print("\nПримеры фрагментов из 5 нот:")
+    for level in range(1, LEVELS + 1):
+        melody = index.sample(5, level, rng)
+        names = " ".join(NOTES_BY_MIDI[m].short_name for m in melody or [])
+        print(f"  уровень {level}: {names or '—'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Проверка детектора высоты без микрофона.
+
+Прогоняет WAV-файлы или синтезированные тоны через тот же потоковый
+интерфейс, что и режим ответа голосом, и печатает распознанные ноты и
+время обработки кадра.
+
+    python -m piano_ear_trainer.tools.pitch_check assets/samples/A4.wav
+    python -m piano_ear_trainer.tools.pitch_check --tones
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from piano_ear_trainer.audio.pitch import (
+    SAMPLE_RATE,
+    PitchDetector,
+    StableNoteTracker,
+    generate_tone,
+    iter_chunks,
+    read_wav,
+)
+from piano_ear_trainer.data import PIANO_NOTES, Note
+
+
+def detect(
+    samples, sample_rate: int, chunk_size: int
+) -> tuple[Note | None, PitchDetector]:
+    """Подаёт сигнал порциями и возвращает первую стабильную ноту."""
+    detector = PitchDetector(sample_rate=sample_rate)
+    tracker = StableNoteTracker()
+    detected = None
+    for chunk in iter_chunks(samples, chunk_size):
+        for estimate in detector.feed(chunk):
+            note = tracker.update(estimate)
+            if detected is None and note is not None:
+                detected = note
+    return detected, detector
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Точка входа утилиты."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", type=Path, help="WAV-файлы")
+    parser.add_argument(
+        "--tones", action="store_true", help="проверить все 88 нот синтезом"
+    )
+    parser.add_argument("--chunk", type=int, default=512, help="размер порции")
+    args = parser.parse_args(argv)
+
+    cases: list[tuple[str, object, int, Note | None]] = []
+    for path in args.files:
+        samples, rate = read_wav(path)
+        cases.append((path.name, samples, rate, None))
+    if args.tones:
+        for note in PIANO_NOTES:
+            tone = generate_tone(note.frequency, 0.5)
+            cases.append((note.short_name, tone, SAMPLE_RATE, note))
+    if not cases:
+        parser.error("укажите WAV-файлы или --tones")
+
+    errors = 0
+    worst = 0.0
+    total = frames = 0
+    for name, samples, rate, expected in cases:
+        detected, detector = detect(samples, rate, args.chunk)
+        stats = detector.latency
+        worst = max(worst, stats.worst)
+        total += stats.total
+        frames += stats.frames
+        got = detected.short_name if detected else "—"
+        mark = ""
+        if expected is not None and detected != expected:
+            errors += 1
+            mark = "  ОШИБКА"
+        print(f"{name:>12}: {got:<4} (кадр: {stats.mean * 1e3:.2f} мс){mark}")
+
+    mean = total / frames if frames else 0.0
+    print(
+        f"\nКадров: {frames}, среднее {mean * 1e3:.2f} мс, худшее {worst * 1e3:.2f} мс"
+    )
+    if errors:
+        print(f"Ошибок распознавания: {errors}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Стоимость реверберации: процессорное время рендера ноты и объём кэша.
+
+Для каждого помещения сворачивает семплы всех клавиш (как фоновый рендер
+плеера) и печатает время на ноту и память кэша для одной октавы и всех 88.
+
+    python -m piano_ear_trainer.tools.reverb_benchmark --rooms hall church
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+import numpy as np
+import pygame
+import pygame.sndarray
+
+from piano_ear_trainer.audio.formats import choose_bank
+from piano_ear_trainer.audio.player import _get_base_path
+from piano_ear_trainer.audio.reverb import (
+    ROOMS,
+    Convolver,
+    apply_reverb,
+    find_impulse_files,
+    impulse_from_pcm,
+    synthesize_impulse,
+)
+from piano_ear_trainer.data import PIANO_NOTES
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Точка входа утилиты."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--assets", type=Path, default=_get_base_path() / "assets", help="папка банков"
+    )
+    parser.add_argument(
+        "--rooms", nargs="+", help="помещения (по умолчанию все, включая файлы)"
+    )
+    args = parser.parse_args(argv)
+
+    pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+    frequency, _, channels = pygame.mixer.get_init()
+    bank = choose_bank(args.assets, pygame.mixer.get_init())
+    if bank is None:
+        print("Не найдено ни одного полного банка семплов", file=sys.stderr)
+        return 1
+    sample_format, samples_dir = bank
+    sources = [
+        pygame.sndarray.array(
+            pygame.mixer.Sound(str(samples_dir / f"{note.short_name}.{sample_format}"))
+        )
+        for note in PIANO_NOTES
+    ]
+
+    impulse_files = find_impulse_files(args.assets / "impulses")
+    rooms = args.rooms or [*ROOMS, *impulse_files]
+    unknown = [
+        room for room in rooms if room not in ROOMS and room not in impulse_files
+    ]
+    if unknown:
+        print(f"Неизвестные помещения: {', '.join(unknown)}", file=sys.stderr)
+        return 1
+
+    print(
+        f"{'помещение':>16} {'хвост, с':>9} {'БПФ':>7} {'мс ЦП/нота':>11} "
+        f"{'макс, мс':>9} {'октава, МБ':>11} {'88 нот, МБ':>11}"
+    )
+    for room in rooms:
+        if room in ROOMS:
+            impulse = synthesize_impulse(ROOMS[room], frequency, channels)
+        else:
+            sound = pygame.mixer.Sound(str(impulse_files[room]))
+            impulse = impulse_from_pcm(room, pygame.sndarray.array(sound))
+        convolver = Convolver(impulse)
+
+        cpu = []
+        sizes = []
+        for pcm in sources:
+            started = time.thread_time()
+            rendered = apply_reverb(pcm, convolver)
+            cpu.append(time.thread_time() - started)
+            sizes.append(rendered.nbytes)
+        octave = sum(sizes[3:15])  # C1..B1: 12 нот
+        print(
+            f"{room:>16} {len(impulse.pcm) / frequency:>9.2f} "
+            f"{convolver.fft_size:>7} {np.mean(cpu) * 1000:>11.1f} "
+            f"{max(cpu) * 1000:>9.1f} {octave / 2**20:>11.1f} "
+            f"{sum(sizes) / 2**20:>11.1f}"
+        )
+
+    pygame.mixer.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
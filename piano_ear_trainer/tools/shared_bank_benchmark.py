@@ -0,0 +1,124 @@
+"""Бенчмарк общего банка семплов: память и запуск нескольких тренажёров.
+
+Запускает процессы по очереди, как окна на станциях киоска. Каждый создаёт
+плеер, ждёт готовности банка и берёт звуки всех 88 клавиш (как за долгое
+занятие). Затем печатает время запуска, время сбора звуков и PSS каждого
+процесса — его долю в памяти с учётом общих страниц (только Linux).
+
+    python -m piano_ear_trainer.tools.shared_bank_benchmark --processes 4
+    python -m piano_ear_trainer.tools.shared_bank_benchmark --processes 4 --no-share
+"""
+
+import argparse
+import os
+import sys
+import time
+from multiprocessing import get_context
+from pathlib import Path
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+# Память процесса с учётом общих страниц (Linux)
+_SMAPS_ROLLUP = Path("/proc/self/smaps_rollup")
+
+
+def _memory_mb() -> tuple[float, float] | None:
+    """(RSS, PSS) процесса в МБ или None, если ядро их не отдаёт."""
+    try:
+        lines = _SMAPS_ROLLUP.read_text().splitlines()
+    except OSError:
+        return None
+    fields = {}
+    for line in lines:
+        key, _, value = line.partition(":")
+        if value.strip().endswith("kB"):
+            fields[key] = int(value.split()[0]) / 1024
+    return fields["Rss"], fields["Pss"]
+
+
+def _station(share: bool, events, results) -> None:
+    """Один тренажёр (в отдельном процессе)."""
+    import gc
+
+    from piano_ear_trainer.audio.player import AudioPlayer
+    from piano_ear_trainer.data import PIANO_NOTES
+
+    started = time.perf_counter()
+    player = AudioPlayer(shared_bank=share)
+    while player.is_switching_pack:
+        time.sleep(0.005)
+    startup = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for note in PIANO_NOTES:
+        player._get_sound(note)
+    load = time.perf_counter() - started
+    gc.collect()
+    results.put((os.getpid(), "loaded", (startup, load, player._shared is not None)))
+
+    measure, done = events
+    measure.wait()
+    results.put((os.getpid(), "memory", _memory_mb()))
+    done.wait()
+    player.cleanup()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Точка входа утилиты."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=4, help="число тренажёров")
+    parser.add_argument(
+        "--no-share", action="store_true", help="каждый процесс декодирует сам"
+    )
+    args = parser.parse_args(argv)
+
+    from piano_ear_trainer.audio.shared import collect_stale_banks
+
+    collect_stale_banks()
+    # spawn: как у настоящих окон — независимые процессы без общего состояния
+    context = get_context("spawn")
+    events = (context.Event(), context.Event())
+    results = context.Queue()
+    processes = []
+    loaded = {}
+    for _ in range(args.processes):
+        process = context.Process(
+            target=_station, args=(not args.no_share, events, results)
+        )
+        process.start()
+        processes.append(process)
+        pid, _, values = results.get()
+        loaded[pid] = values
+
+    events[0].set()
+    memory = {}
+    for _ in processes:
+        pid, _, values = results.get()
+        memory[pid] = values
+    events[1].set()
+    for process in processes:
+        process.join()
+
+    mode = "без общего банка" if args.no_share else "общий банк"
+    print(f"Процессов: {args.processes}, режим: {mode}")
+    print(
+        f"\n{'PID':>7} {'запуск, с':>10} {'88 звуков, с':>13} {'RSS, МБ':>9} {'PSS, МБ':>9}"
+    )
+    total_pss = 0.0
+    for process in processes:
+        startup, load, attached = loaded[process.pid]
+        usage = memory[process.pid]
+        rss, pss = usage if usage is not None else (float("nan"), float("nan"))
+        total_pss += pss
+        mark = "" if args.no_share or attached else "  (общий банк недоступен)"
+        print(
+            f"{process.pid:>7} {startup:>10.2f} {load:>13.3f} {rss:>9.1f} {pss:>9.1f}"
+            f"{mark}"
+        )
+    print(f"\nСуммарный PSS: {total_pss:.1f} МБ")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Офлайн-оценка стратегий выбора вопросов на виртуальных учениках.
+
+Для каждой стратегии печатаются кривая обучения (доля верных ответов и
+средний навык по блокам вопросов), средний рекорд серии, медиана вопросов
+до точности 80% и скорость симуляции.
+
+    python -m piano_ear_trainer.tools.simulate --sessions 2000 --octaves 3 4 5
+"""
+
+import argparse
+import math
+import sys
+
+from piano_ear_trainer.quiz import filter_notes
+from piano_ear_trainer.simulation import POLICIES, SimulationReport, simulate
+
+
+def _print_report(report: SimulationReport) -> None:
+    print(f"\n== {report.policy} ==")
+    print(f"{'вопросы':>10} {'верно':>7} {'навык':>7}")
+    for i, (correct, mastery) in enumerate(
+        zip(report.correct, report.mastery, strict=True)
+    ):
+        print(f"{(i + 1) * report.block:>10} {correct:>7.1%} {mastery:>7.3f}")
+    if math.isinf(report.blocks_to_target):
+        target = "не достигнута"
+    else:
+        target = f"{report.blocks_to_target * report.block:.0f} вопросов"
+    print(f"Средний рекорд серии: {report.best_streak:.1f}")
+    print(f"Точность 80% (медиана): {target}")
+    answers = report.sessions * report.questions / report.seconds
+    print(
+        f"{report.sessions} сессий за {report.seconds:.2f} с: "
+        f"{report.sessions_per_second:.0f} сессий/с, {answers:.0f} ответов/с"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Точка входа утилиты."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--policies", nargs="+", choices=list(POLICIES), default=list(POLICIES)
+    )
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--block", type=int, default=20, help="вопросов в блоке")
+    parser.add_argument("--octaves", type=int, nargs="+", default=[4])
+    parser.add_argument("--sharps", action="store_true", help="с чёрными клавишами")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if not 0 < args.block <= args.questions:
+        parser.error("--block должен быть от 1 до --questions")
+    notes = filter_notes(args.octaves, args.sharps)
+    if not notes:
+        parser.error("нет нот в выбранных октавах")
+
+    for policy in args.policies:
+        report = simulate(
+            policy,
+            notes,
+            sessions=args.sessions,
+            questions=args.questions,
+            seed=args.seed,
+            block=args.block,
+            max_workers=args.workers,
+        )
+        _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Определение простоя: нет ввода пользователя заданное время."""
+
+from PySide6.QtCore import QEvent, QObject, QTimer, Signal
+from PySide6.QtWidgets import QApplication
+
+# События, которые считаются действием пользователя
+_INPUT_EVENTS = frozenset(
+    {
+        QEvent.Type.MouseMove,
+        QEvent.Type.MouseButtonPress,
+        QEvent.Type.KeyPress,
+        QEvent.Type.Wheel,
+        QEvent.Type.TouchBegin,
+        QEvent.Type.ApplicationActivate,
+    }
+)
+
+
+class IdleMonitor(QObject):
+    """
+    Следит за вводом во всём приложении и сообщает о простое.
+
+    Таймер один и перезапускается на каждом вводе, поэтому во время
+    простоя монитор не просыпается вовсе.
+    """
+
+    # Ввода не было timeout_ms
+    idle = Signal()
+    # Первый ввод после простоя (до того, как событие дойдёт до виджета)
+    active = Signal()
+
+    def __init__(self, timeout_ms: int, parent: QObject | None = None) -> None:
+        """
+        Args:
+            timeout_ms: Через сколько миллисекунд без ввода наступает простой
+            parent: Родительский объект Qt
+        """
+        super().__init__(parent)
+        self._is_idle = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(timeout_ms)
+        self._timer.timeout.connect(self._on_timeout)
+
+    @property
+    def is_idle(self) -> bool:
+        """Наступил ли простой."""
+        return self._is_idle
+
+    def start(self) -> None:
+        """Начинает следить за вводом."""
+        QApplication.instance().installEventFilter(self)
+        self._timer.start()
+
+    def stop(self) -> None:
+        """Перестаёт следить за вводом."""
+        QApplication.instance().removeEventFilter(self)
+        self._timer.stop()
+
+    def postpone(self) -> None:
+        """Откладывает простой на timeout_ms (например, пока идёт работа)."""
+        self._is_idle = False
+        self._timer.start()
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        """Перезапускает таймер на каждом вводе (событие не поглощается)."""
+        if event.type() in _INPUT_EVENTS:
+            self._timer.start()
+            if self._is_idle:
+                self._is_idle = False
+                self.active.emit()
+        return False
+
+    def _on_timeout(self) -> None:
+        self._is_idle = True
+        self.idle.emit()
@@ -1,34 +1,79 @@
 """Главное окно приложения."""
 
 import contextlib
-import json
-import random
 import sys
+import time
 from pathlib import Path
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QEvent, Qt, QTimer
 from PySide6.QtGui import QFont, QIcon
 from PySide6.QtWidgets import (
     QCheckBox,
+    QComboBox,
     QHBoxLayout,
     QLabel,
+    QLineEdit,
     QMainWindow,
     QPushButton,
+    QSpinBox,
     QStackedWidget,
     QVBoxLayout,
     QWidget,
 )
 
-from piano_ear_trainer.audio import AudioPlayer
-from piano_ear_trainer.data import PIANO_NOTES, Note
+from piano_ear_trainer.audio import (
+    DEFAULT_LAYER,
+    DEFAULT_TEMPO,
+    AudioPlayer,
+    MicrophoneInput,
+    PitchDetector,
+    StableNoteTracker,
+)
+from piano_ear_trainer.audio.shared import is_shared_bank_enabled
+from piano_ear_trainer.audio.spectrum import SpectrumCache
+from piano_ear_trainer.classroom import ClassroomClient
+from piano_ear_trainer.classroom.protocol import QUESTION, parse_address
+from piano_ear_trainer.corpus import LEVELS, CorpusIndex, default_index_dir
+from piano_ear_trainer.data import NOTES_BY_MIDI, Note
+from piano_ear_trainer.metrics import REGISTRY
+from piano_ear_trainer.profiles import ProfileStore, default_profile_name
+from piano_ear_trainer.quiz import QuizEngine, filter_notes, make_question
+from piano_ear_trainer.ui.idle import IdleMonitor
 from piano_ear_trainer.ui.piano_keyboard import PianoKeyboard
+from piano_ear_trainer.ui.spectrum_view import SpectrumView
+from piano_ear_trainer.ui.watchdog import EventLoopWatchdog, is_watchdog_enabled
+
+# Время обработки ответа (проверка, счёт, запись рекорда)
+_ANSWER_SECONDS = REGISTRY.histogram("answer_handling_seconds", "Обработка ответа")
 
 
 class MainWindow(QMainWindow):
     """Главное окно тренера музыкального слуха."""
 
-    # Путь к файлу сохранения
-    SAVE_FILE = Path.home() / ".piano_ear_trainer_record.json"
+    # Отчёт сторожа цикла событий (если включён)
+    WATCHDOG_REPORT_FILE = Path.home() / ".piano_ear_trainer_watchdog.json"
+
+    # Доступные строи: частота A4 и подпись
+    TUNINGS = [
+        (440.0, "A4 = 440 Гц (стандарт)"),
+        (442.0, "A4 = 442 Гц (оркестр)"),
+        (415.0, "A4 = 415 Гц (барокко)"),
+    ]
+
+    # Через сколько секунд без ввода закрывать аудиоустройство (None — никогда)
+    IDLE_SECONDS: float | None = 60.0
+
+    # Сколько ещё не слушать микрофон после звука из динамиков (реверберация
+    # комнаты и задержка захвата), с
+    LISTEN_RELEASE_SECONDS = 0.3
+
+    # Динамика вопросов: слои семплов и подпись
+    DYNAMICS_CHOICES = [
+        (("mf",), "Средне (mf)"),
+        (("pp",), "Тихо (pp)"),
+        (("ff",), "Громко (ff)"),
+        (("pp", "mf", "ff"), "Разная (pp–ff)"),
+    ]
 
     def __init__(self) -> None:
         super().__init__()
@@ -36,16 +81,67 @@ class MainWindow(QMainWindow):
         self.setMinimumSize(900, 700)
         self._set_app_icon()
 
-        # Аудио плеер
-        self._audio_player = AudioPlayer()
-        self._current_note: Note | None = None
-        self._answered = False  # Флаг: пользователь уже ответил?
-
-        # Счётчики
-        self._correct_count = 0
-        self._wrong_count = 0
-        self._best_streak = self._load_record()  # Загружаем рекорд из файла
-        self._current_streak = 0  # Текущая серия правильных подряд
+        # Сторож подвисаний: оборачиваем обработчики до подключения сигналов
+        self._watchdog: EventLoopWatchdog | None = None
+        if is_watchdog_enabled():
+            self._watchdog = EventLoopWatchdog(self)
+            self._watchdog.instrument(self)
+            self._watchdog.start()
+
+        # Аудио плеер (общий банк — для нескольких окон на одной машине)
+        self._audio_player = AudioPlayer(shared_bank=is_shared_bank_enabled())
+        # Спектры нот для сравнения после ответа (из PCM плеера)
+        self._spectrum_cache = SpectrumCache(
+            self._audio_player.get_pcm, self._audio_player.sample_rate
+        )
+        # Профили учеников (общая папка: несколько окон и компьютеров)
+        self._profiles: ProfileStore | None = None
+        with contextlib.suppress(OSError):
+            self._profiles = ProfileStore()
+            self._profiles.import_legacy_record()
+        self._profile_name = self._initial_profile_name()
+        # Индекс реальных мелодий (строится утилитой index_corpus)
+        self._corpus: CorpusIndex | None = None
+        with contextlib.suppress(OSError, ValueError):
+            self._corpus = CorpusIndex(default_index_dir())
+        # Вопрос, счёт и серии; рекорд — из профиля
+        self._quiz = QuizEngine(best_streak=self._load_record())
+        self._current_tempo = DEFAULT_TEMPO  # Темп мелодического диктанта
+        self._current_layer = DEFAULT_LAYER  # Слой динамики текущего вопроса
+
+        # Классный режим: вопросы приходят от сервера учителя
+        self._classroom: ClassroomClient | None = None
+        self._classroom_joined = False  # Подключение к учителю состоялось
+        self._question_id: int | None = None
+        self._question_started = 0.0
+        self._classroom_timer = QTimer(self)
+        self._classroom_timer.setInterval(20)
+        self._classroom_timer.timeout.connect(self._on_classroom_tick)
+
+        # Ответ голосом: микрофон опрашивается таймером в потоке GUI
+        self._microphone = MicrophoneInput()
+        self._pitch_detector = PitchDetector(
+            sample_rate=self._microphone.sample_rate,
+            reference_pitch=self._audio_player.reference_pitch,
+        )
+        self._note_tracker = StableNoteTracker()
+        # Сборка банка другого строя идёт в фоне: ждём её результата
+        self._tuning_timer = QTimer(self)
+        self._tuning_timer.setInterval(100)
+        self._tuning_timer.timeout.connect(self._on_tuning_tick)
+        self._listen_after = 0.0  # Раньше этого момента микрофон не слушаем
+        self._listen_timer = QTimer(self)
+        self._listen_timer.setInterval(20)
+        self._listen_timer.timeout.connect(self._on_listen_tick)
+
+        # Простой: без ввода аудиоустройство закрывается, чтобы не будить
+        # процессор, и снова открывается при первом движении мыши
+        self._idle_monitor: IdleMonitor | None = None
+        if self.IDLE_SECONDS is not None:
+            self._idle_monitor = IdleMonitor(int(self.IDLE_SECONDS * 1000), self)
+            self._idle_monitor.idle.connect(self._on_idle)
+            self._idle_monitor.active.connect(self._on_user_active)
+            self._idle_monitor.start()
 
         # Центральный виджет
         central_widget = QWidget()
@@ -110,6 +206,26 @@ class MainWindow(QMainWindow):
         settings_font = QFont()
         settings_font.setPointSize(12)
 
+        # Ученик: выбор профиля или ввод нового имени
+        profile_row = QHBoxLayout()
+        profile_label = QLabel("Ученик:")
+        profile_label.setFont(settings_font)
+        self.profile_combo = QComboBox()
+        self.profile_combo.setFont(settings_font)
+        self.profile_combo.setEditable(True)
+        self.profile_combo.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+        self.profile_combo.setMinimumWidth(240)
+        self.profile_combo.setMaxVisibleItems(15)
+        self._fill_profile_combo()
+        self.profile_combo.activated.connect(self._on_profile_activated)
+        profile_row.addStretch()
+        profile_row.addWidget(profile_label)
+        profile_row.addWidget(self.profile_combo)
+        profile_row.addStretch()
+        layout.addLayout(profile_row)
+
+        layout.addSpacing(10)
+
         # Заголовок октав
         octaves_label = QLabel("Октавы:")
         octaves_label.setFont(settings_font)
@@ -170,6 +286,153 @@ class MainWindow(QMainWindow):
             self.use_sharps_checkbox, alignment=Qt.AlignmentFlag.AlignCenter
         )
 
+        # Чекбокс "Отвечать голосом"
+        self.sing_back_checkbox = QCheckBox("Отвечать голосом (микрофон)")
+        self.sing_back_checkbox.setFont(settings_font)
+        self.sing_back_checkbox.setToolTip(
+            "Спойте или сыграйте ноту вместо клика по клавиатуре.\n"
+            "Пока звучит вопрос, микрофон не слушается — отвечайте после него."
+        )
+        self.sing_back_checkbox.setChecked(False)
+        layout.addWidget(
+            self.sing_back_checkbox, alignment=Qt.AlignmentFlag.AlignCenter
+        )
+
+        layout.addSpacing(10)
+
+        # Выбор строя (частота A4)
+        tuning_row = QHBoxLayout()
+        tuning_label = QLabel("Строй:")
+        tuning_label.setFont(settings_font)
+        self.tuning_combo = QComboBox()
+        self.tuning_combo.setFont(settings_font)
+        for pitch, name in self.TUNINGS:
+            self.tuning_combo.addItem(name, pitch)
+        self.tuning_combo.currentIndexChanged.connect(self._on_tuning_changed)
+        tuning_row.addStretch()
+        tuning_row.addWidget(tuning_label)
+        tuning_row.addWidget(self.tuning_combo)
+        tuning_row.addStretch()
+        layout.addLayout(tuning_row)
+
+        # Динамика: только если установлены семплы нескольких слоёв
+        installed = set(self._audio_player.available_layers)
+        dynamics_row = QHBoxLayout()
+        dynamics_label = QLabel("Динамика:")
+        dynamics_label.setFont(settings_font)
+        self.dynamics_combo = QComboBox()
+        self.dynamics_combo.setFont(settings_font)
+        for layers, name in self.DYNAMICS_CHOICES:
+            if installed.issuperset(layers):
+                self.dynamics_combo.addItem(name, layers)
+        self.dynamics_combo.currentIndexChanged.connect(self._on_dynamics_changed)
+        dynamics_row.addStretch()
+        dynamics_row.addWidget(dynamics_label)
+        dynamics_row.addWidget(self.dynamics_combo)
+        dynamics_row.addStretch()
+        if self.dynamics_combo.count() > 1:
+            layout.addLayout(dynamics_row)
+        else:
+            dynamics_label.hide()
+            self.dynamics_combo.hide()
+
+        # Акустика помещения (реверберация)
+        room_row = QHBoxLayout()
+        room_label = QLabel("Акустика:")
+        room_label.setFont(settings_font)
+        self.room_combo = QComboBox()
+        self.room_combo.setFont(settings_font)
+        self.room_combo.addItem("Без эффекта", None)
+        for room, name in self._audio_player.rooms.items():
+            self.room_combo.addItem(name, room)
+        self.room_combo.currentIndexChanged.connect(self._on_room_changed)
+        room_row.addStretch()
+        room_row.addWidget(room_label)
+        room_row.addWidget(self.room_combo)
+        room_row.addStretch()
+        layout.addLayout(room_row)
+
+        # Набор семплов: только если установлены дополнительные наборы
+        pack_row = QHBoxLayout()
+        pack_label = QLabel("Семплы:")
+        pack_label.setFont(settings_font)
+        self.pack_combo = QComboBox()
+        self.pack_combo.setFont(settings_font)
+        self.pack_combo.addItem("Встроенные", None)
+        for pack in self._audio_player.packs:
+            self.pack_combo.addItem(pack, pack)
+        self.pack_combo.setToolTip(
+            "Новый набор загружается в фоне, до этого звучит прежний.\n"
+            "Изменённые файлы набора подхватываются при возврате на этот экран."
+        )
+        self.pack_combo.currentIndexChanged.connect(self._on_pack_changed)
+        pack_row.addStretch()
+        pack_row.addWidget(pack_label)
+        pack_row.addWidget(self.pack_combo)
+        pack_row.addStretch()
+        if self.pack_combo.count() > 1:
+            layout.addLayout(pack_row)
+        else:
+            pack_label.hide()
+            self.pack_combo.hide()
+
+        # Мелодический диктант: число нот и темп
+        dictation_row = QHBoxLayout()
+        length_label = QLabel("Нот в задании:")
+        length_label.setFont(settings_font)
+        self.sequence_length_spin = QSpinBox()
+        self.sequence_length_spin.setFont(settings_font)
+        self.sequence_length_spin.setRange(1, 8)
+        self.sequence_length_spin.setValue(1)
+        tempo_label = QLabel("Темп:")
+        tempo_label.setFont(settings_font)
+        self.tempo_spin = QSpinBox()
+        self.tempo_spin.setFont(settings_font)
+        self.tempo_spin.setRange(40, 200)
+        self.tempo_spin.setValue(DEFAULT_TEMPO)
+        self.tempo_spin.setSuffix(" уд/мин")
+        dictation_row.addStretch()
+        dictation_row.addWidget(length_label)
+        dictation_row.addWidget(self.sequence_length_spin)
+        dictation_row.addSpacing(20)
+        dictation_row.addWidget(tempo_label)
+        dictation_row.addWidget(self.tempo_spin)
+        dictation_row.addStretch()
+        layout.addLayout(dictation_row)
+
+        # Фрагменты реальных мелодий: только если индекс корпуса построен
+        melody_row = QHBoxLayout()
+        melody_label = QLabel("Мелодии:")
+        melody_label.setFont(settings_font)
+        self.melody_combo = QComboBox()
+        self.melody_combo.setFont(settings_font)
+        self.melody_combo.addItem("Случайные ноты", None)
+        if self._corpus is not None:
+            for level in range(1, min(self._corpus.levels, LEVELS) + 1):
+                self.melody_combo.addItem(f"Из корпуса, уровень {level}", level)
+        self.melody_combo.setToolTip(
+            "Для заданий из нескольких нот берутся фрагменты мелодий корпуса;\n"
+            "1 — самые простые интервалы, 5 — самые сложные."
+        )
+        melody_row.addStretch()
+        melody_row.addWidget(melody_label)
+        melody_row.addWidget(self.melody_combo)
+        melody_row.addStretch()
+        if self.melody_combo.count() > 1:
+            layout.addLayout(melody_row)
+        else:
+            melody_label.hide()
+            self.melody_combo.hide()
+
+        layout.addSpacing(10)
+
+        # Адрес сервера учителя (пусто — самостоятельная тренировка)
+        self.classroom_edit = QLineEdit()
+        self.classroom_edit.setFont(settings_font)
+        self.classroom_edit.setPlaceholderText("Адрес учителя (для занятия в классе)")
+        self.classroom_edit.setMinimumWidth(360)
+        layout.addWidget(self.classroom_edit, alignment=Qt.AlignmentFlag.AlignCenter)
+
         layout.addSpacing(20)
 
         # Кнопки
@@ -235,6 +498,10 @@ class MainWindow(QMainWindow):
         self.result_label.setMinimumHeight(50)
         layout.addWidget(self.result_label)
 
+        # Сравнение загаданной и нажатой ноты (появляется после ответа)
+        self.spectrum_view = SpectrumView(self._spectrum_cache)
+        layout.addWidget(self.spectrum_view)
+
         layout.addStretch()
 
         # Панель управления
@@ -329,22 +596,10 @@ class MainWindow(QMainWindow):
 
     def _get_filtered_notes(self) -> list[Note]:
         """Возвращает список нот согласно настройкам."""
-        use_sharps = self.use_sharps_checkbox.isChecked()
         selected_octaves = {
             num for num, cb in self.octave_checkboxes.items() if cb.isChecked()
         }
-
-        filtered = []
-        for note in PIANO_NOTES:
-            # Фильтр по диезам
-            if not use_sharps and note.is_black_key:
-                continue
-            # Фильтр по октавам
-            if note.octave.number not in selected_octaves:
-                continue
-            filtered.append(note)
-
-        return filtered
+        return filter_notes(selected_octaves, self.use_sharps_checkbox.isChecked())
 
     def _play_new_note(self) -> None:
         """Воспроизводит новую случайную ноту."""
@@ -355,31 +610,88 @@ class MainWindow(QMainWindow):
             self.result_label.setText("")
             return
 
-        note = random.choice(filtered_notes)
-        self._audio_player.play_note(note)
-        self._current_note = note
-        self._answered = False
+        # Дополнительные слои динамики держим в памяти только для этих нот
+        self._audio_player.set_active_notes(filtered_notes)
+        length = self.sequence_length_spin.value()
+        sequence = self._corpus_question(filtered_notes, length)
+        if sequence is None:
+            sequence = make_question(filtered_notes, length)
+        self._start_question(sequence, self.tempo_spin.value())
+
+    def _corpus_question(self, notes: list[Note], length: int) -> list[Note] | None:
+        """Фрагмент реальной мелодии из выбранных нот или None."""
+        level = self.melody_combo.currentData()
+        if self._corpus is None or level is None or length < 2:
+            return None
+        melody = self._corpus.sample(
+            length, level, allowed={note.midi_number for note in notes}
+        )
+        if melody is None:
+            return None
+        return [NOTES_BY_MIDI[midi] for midi in melody]
+
+    def _start_question(self, sequence: list[Note], tempo: int) -> None:
+        """Загадывает ноту или мелодию и воспроизводит её."""
+        length = len(sequence)
+        self._quiz.start_question(sequence)
+        self._current_tempo = tempo
+        self._current_layer = self._audio_player.choose_layer()
+        self._question_started = time.perf_counter()
+        self._play_current_sequence()
+        self._pitch_detector.reset()
+        self._note_tracker.reset()
+        self.spectrum_view.clear()
         self.status_label.setText("")
         self.status_label.setStyleSheet("")
-        self.result_label.setText("Выберите ноту на клавиатуре")
+        target = "ноту" if length == 1 else f"мелодию из {length} нот"
+        if self._listen_timer.isActive():
+            self.result_label.setText(f"Спойте или сыграйте {target}")
+        else:
+            self.result_label.setText(f"Выберите {target} на клавиатуре")
         self.result_label.setStyleSheet("color: #888;")
         self.next_button.setEnabled(False)
 
     def _on_start_clicked(self) -> None:
         """Обработчик нажатия кнопки 'Начать'."""
+        # Новое имя создаёт профиль, выбранный запоминается как последний
+        self._select_profile(self.profile_combo.currentText())
+        self._save_record()
         # Сброс счётчиков сессии (рекорд сохраняется)
-        self._correct_count = 0
-        self._wrong_count = 0
-        self._current_streak = 0
+        self._quiz.reset_session()
         self._update_score_label()
         self.stacked_widget.setCurrentWidget(self.training_screen)
-        self._play_new_note()
+        mic_failed = self.sing_back_checkbox.isChecked() and not self._start_listening()
+
+        address = self.classroom_edit.text().strip()
+        if address and self._join_classroom(address):
+            self._quiz.clear_question()
+            self.status_label.setText("")
+            self.result_label.setText("Подключение к учителю…")
+            self.result_label.setStyleSheet("color: #888;")
+            self.next_button.setEnabled(False)
+        else:
+            self._play_new_note()
+            if address:
+                self.status_label.setText("Сервер учителя недоступен")
+
+        if mic_failed:
+            self.status_label.setText("Микрофон недоступен — отвечайте на клавиатуре")
 
     def _on_repeat_clicked(self) -> None:
         """Обработчик нажатия кнопки 'Повторить'."""
         # Воспроизводим загаданную ноту, а не последнюю нажатую
-        if self._current_note is not None:
-            self._audio_player.play_note(self._current_note)
+        if self._quiz.sequence:
+            self._play_current_sequence()
+
+    def _play_current_sequence(self) -> None:
+        """Воспроизводит загаданную ноту или мелодию."""
+        sequence = self._quiz.sequence
+        if len(sequence) == 1:
+            self._audio_player.play_note(sequence[0], self._current_layer)
+        else:
+            self._audio_player.play_sequence(
+                sequence, self._current_tempo, self._current_layer
+            )
 
     def _on_next_clicked(self) -> None:
         """Обработчик нажатия кнопки 'Следующая нота'."""
@@ -388,8 +700,69 @@ class MainWindow(QMainWindow):
     def _on_stop_clicked(self) -> None:
         """Обработчик нажатия кнопки 'Завершить'."""
         self._audio_player.stop()
+        self._stop_listening()
+        self._leave_classroom()
+        # Профили могли добавить другие окна
+        if self._profiles is not None and self._profiles.refresh():
+            self._fill_profile_combo()
         self.stacked_widget.setCurrentWidget(self.start_screen)
 
+    def _on_profile_activated(self, index: int) -> None:
+        """Обработчик выбора профиля из списка."""
+        self._select_profile(self.profile_combo.itemText(index))
+
+    def _on_tuning_changed(self, index: int) -> None:
+        """Обработчик смены строя: банк перестраивается в фоне."""
+        reference_pitch = self.tuning_combo.itemData(index)
+        self._audio_player.set_reference_pitch(reference_pitch)
+        # Спетая нота сверяется с клавишами того же строя
+        self._pitch_detector.set_reference_pitch(reference_pitch)
+        self.tuning_combo.setToolTip("")
+        if self._audio_player.is_retuning:
+            self._tuning_timer.start()
+
+    def _on_tuning_tick(self) -> None:
+        """Ждёт сборки банка строя; если она не удалась — возвращает строй."""
+        if self._audio_player.is_retuning:
+            return
+        self._tuning_timer.stop()
+        error = self._audio_player.tuning_error
+        if error is None:
+            return
+        reference_pitch = self._audio_player.reference_pitch
+        self.tuning_combo.blockSignals(True)
+        self.tuning_combo.setCurrentIndex(self.tuning_combo.findData(reference_pitch))
+        self.tuning_combo.blockSignals(False)
+        self._pitch_detector.set_reference_pitch(reference_pitch)
+        self.tuning_combo.setToolTip(f"Банк для этого строя не собран: {error}")
+        self.status_label.setText("Не удалось перестроить семплы — строй возвращён")
+
+    def _on_dynamics_changed(self, index: int) -> None:
+        """Обработчик смены динамики: ненужные слои выгружаются."""
+        self._audio_player.set_dynamics(self.dynamics_combo.itemData(index))
+
+    def _on_room_changed(self, index: int) -> None:
+        """Обработчик смены акустики: ноты с эффектом рендерятся в фоне."""
+        self._audio_player.set_room(self.room_combo.itemData(index))
+
+    def _on_pack_changed(self, index: int) -> None:
+        """Обработчик смены набора семплов: он готовится в фоне."""
+        try:
+            self._audio_player.set_pack(self.pack_combo.itemData(index))
+        except ValueError:
+            # Набор удалили или испортили после запуска
+            self.pack_combo.removeItem(index)
+
+    def _on_idle(self) -> None:
+        """Простой: закрываем аудиоустройство (если что-то звучит — позже)."""
+        # Ответ голосом — тоже ввод: пока слушаем микрофон, простоя нет
+        if self._listen_timer.isActive() or not self._audio_player.suspend():
+            self._idle_monitor.postpone()
+
+    def _on_user_active(self) -> None:
+        """Первый ввод после простоя: открываем устройство до клика по клавише."""
+        self._audio_player.resume()
+
     def _on_octaves_clicked(self) -> None:
         """Обработчик нажатия кнопки 'Октавы'."""
         self._previous_screen = self.stacked_widget.currentWidget()
@@ -405,73 +778,220 @@ class MainWindow(QMainWindow):
     def _on_keyboard_note_clicked(self, clicked_note: Note) -> None:
         """Обработчик клика по клавише на клавиатуре."""
         # Если уже ответили — свободный режим, просто воспроизводим
-        if self._answered:
+        if self._quiz.answered:
             self._audio_player.play_note(clicked_note)
             return
 
         # Нет загаданной ноты — ничего не делаем
-        if self._current_note is None:
+        if not self._quiz.sequence:
             return
 
-        # Проверяем ответ
-        is_correct = clicked_note.midi_number == self._current_note.midi_number
+        with _ANSWER_SECONDS.time():
+            self._grade_answer(clicked_note)
+
+    def _grade_answer(self, clicked_note: Note) -> None:
+        """Проверяет ответ и обновляет счёт."""
+        # Проверяем ответ (в диктанте — очередную ноту мелодии)
+        result = self._quiz.answer(clicked_note)
+        sequence = self._quiz.sequence
 
         # Звук только при правильном ответе
-        if is_correct:
-            self._audio_player.play_note(clicked_note)
-            self._correct_count += 1
-            self._current_streak += 1
-            if self._current_streak > self._best_streak:
-                self._best_streak = self._current_streak
+        if result.is_correct:
+            self._audio_player.play_note(clicked_note, self._current_layer)
+            if not result.is_complete:
+                # Мелодия ещё не закончена — ждём следующую ноту
+                self.result_label.setText(
+                    f"Верно нот: {result.position} из {len(sequence)}"
+                )
+                return
+            if result.new_record:
                 self._save_record()  # Сохраняем новый рекорд сразу
             self.status_label.setText("Правильно!")
             self.status_label.setStyleSheet("color: #2ecc71;")  # Зелёный
-            self.result_label.setText(self._current_note.full_name)
+            self.result_label.setText(self._sequence_text(sequence))
             self.result_label.setStyleSheet("color: #2ecc71;")  # Зелёный
         else:
             # Неправильный ответ — тишина
-            self._wrong_count += 1
-            self._current_streak = 0
             self.status_label.setText("Неправильно!")
             self.status_label.setStyleSheet("color: #e74c3c;")  # Красный
             self.result_label.setText(
-                f"<span style='color: #2ecc71;'>Правильно: {self._current_note.full_name}</span><br>"
-                f"<span style='color: #e74c3c;'>Вы выбрали: {clicked_note.full_name}</span>"
+                f"<span style='color: #2ecc71;'>Правильно: {self._sequence_text(sequence)}</span><br>"
+                f"<span style='color: #e74c3c;'>Вы выбрали: {self._sequence_text(result.answered)}</span>"
             )
             self.result_label.setStyleSheet("")  # Сброс стиля, используем HTML
 
-        self._answered = True
         self._update_score_label()
-        # Активируем кнопку "Следующая нота"
-        self.next_button.setEnabled(True)
+        # Спектр загаданной ноты (в мелодии — на которой ошиблись) и ответа
+        target = sequence[min(result.position, len(sequence) - 1)]
+        self.spectrum_view.show_comparison(
+            target,
+            result.answered[-1],
+            (self._audio_player.reference_pitch, self._audio_player.pack_revision),
+        )
+        if self._classroom is not None and self._question_id is not None:
+            self._classroom.send_answer(
+                self._question_id,
+                [n.midi_number for n in result.answered],
+                time.perf_counter() - self._question_started,
+            )
+        # Активируем кнопку "Следующая нота" (в классе вопросы задаёт учитель)
+        self.next_button.setEnabled(self._classroom is None)
+
+    @staticmethod
+    def _sequence_text(notes: list[Note]) -> str:
+        """Названия нот через тире."""
+        return " – ".join(note.full_name for note in notes)
+
+    def _start_listening(self) -> bool:
+        """Включает приём ответов с микрофона. Возвращает успех."""
+        try:
+            self._microphone.start()
+        except OSError:
+            # Нет микрофона — остаёмся в режиме клавиатуры
+            self.sing_back_checkbox.setChecked(False)
+            return False
+        self._listen_timer.start()
+        return True
+
+    def _stop_listening(self) -> None:
+        """Выключает приём ответов с микрофона."""
+        self._listen_timer.stop()
+        self._microphone.stop()
+
+    def _on_listen_tick(self) -> None:
+        """Обрабатывает накопленный звук с микрофона."""
+        samples = self._microphone.read()
+        # Между вопросами звук не анализируем
+        if not self._quiz.is_waiting_answer or not len(samples):
+            return
+        # Без наушников микрофон слышит сам вопрос: пока звучит — не слушаем
+        now = time.perf_counter()
+        if self._audio_player.is_playing:
+            self._listen_after = now + self.LISTEN_RELEASE_SECONDS
+        if now < self._listen_after:
+            self._pitch_detector.reset()
+            self._note_tracker.reset()
+            return
+
+        for estimate in self._pitch_detector.feed(samples):
+            sung_note = self._note_tracker.update(estimate)
+            if sung_note is not None:
+                # Следующая нота (в том числе такая же) копится заново
+                self._note_tracker.reset()
+                self._pitch_detector.reset()
+                # Ноту другого строя сводим к клавише клавиатуры
+                self._on_keyboard_note_clicked(NOTES_BY_MIDI[sung_note.midi_number])
+                return
+
+    def _join_classroom(self, address: str) -> bool:
+        """
+        Начинает подключение к серверу учителя (без ожидания).
+
+        Результат проверяет _on_classroom_tick: недоступный сервер не
+        замораживает окно на время таймаута.
+
+        Returns:
+            False, если адрес некорректен
+        """
+        try:
+            host, port = parse_address(address)
+        except ValueError:
+            return False
+        self._classroom = ClassroomClient(host, port, name=self._profile_name)
+        self._classroom.start_connect()
+        self._classroom_joined = False
+        self._question_id = None
+        self._classroom_timer.start()
+        return True
+
+    def _leave_classroom(self) -> None:
+        """Отключается от сервера учителя."""
+        self._classroom_timer.stop()
+        if self._classroom is not None:
+            self._classroom.close()
+            self._classroom = None
+
+    def _on_classroom_tick(self) -> None:
+        """Обрабатывает сообщения от сервера учителя."""
+        if self._classroom is None or self._classroom.is_connecting:
+            return
+        if not self._classroom_joined:
+            if not self._classroom.is_connected:
+                self._leave_classroom()
+                self._play_new_note()
+                self.status_label.setText("Сервер учителя недоступен")
+                return
+            self._classroom_joined = True
+            self.result_label.setText("Ожидание вопроса от учителя…")
+        for message in self._classroom.poll():
+            if message["type"] != QUESTION:
+                continue
+            midi = message.get("midi")
+            if not midi or not isinstance(midi, list):
+                continue
+            if not all(isinstance(m, int) and m in NOTES_BY_MIDI for m in midi):
+                continue
+            self._question_id = message.get("id")
+            tempo = message.get("tempo")
+            if not isinstance(tempo, int) or not 20 <= tempo <= 300:
+                tempo = self.tempo_spin.value()
+            self._start_question([NOTES_BY_MIDI[m] for m in midi], tempo)
+
+        if not self._classroom.is_connected:
+            self._leave_classroom()
+            self.status_label.setText("Связь с учителем потеряна")
+            self.next_button.setEnabled(True)
 
     def _update_score_label(self) -> None:
         """Обновляет отображение счёта (всегда видим)."""
-        total = self._correct_count + self._wrong_count
-        percent = int(self._correct_count / total * 100) if total > 0 else 0
-
+        quiz = self._quiz
         self.score_label.setText(
-            f"<span style='color: #2ecc71;'>✓ {self._correct_count}</span> | "
-            f"<span style='color: #e74c3c;'>✗ {self._wrong_count}</span> | "
-            f"{percent}% | "
-            f"Серия: {self._current_streak} | "
-            f"Рекорд: {self._best_streak}"
+            f"<span style='color: #2ecc71;'>✓ {quiz.correct_count}</span> | "
+            f"<span style='color: #e74c3c;'>✗ {quiz.wrong_count}</span> | "
+            f"{quiz.percent}% | "
+            f"Серия: {quiz.current_streak} | "
+            f"Рекорд: {quiz.best_streak}"
         )
 
+    def _initial_profile_name(self) -> str:
+        """Профиль при запуске: последний выбранный или имя пользователя ОС."""
+        if self._profiles is not None and self._profiles.last_name:
+            return self._profiles.last_name
+        return default_profile_name()
+
+    def _fill_profile_combo(self) -> None:
+        """Заполняет список учеников из индекса профилей."""
+        names = []
+        if self._profiles is not None:
+            names = [profile.name for profile in self._profiles.profiles()]
+        self.profile_combo.clear()
+        self.profile_combo.addItems(names)
+        self.profile_combo.setEditText(self._profile_name)
+
+    def _select_profile(self, name: str) -> None:
+        """Переключает профиль: рекорд берётся из индекса в памяти."""
+        name = name.strip()
+        if not name or self._profiles is None:
+            return
+        profile = self._profiles.get(name)
+        self._profile_name = profile.name
+        self._quiz.best_streak = profile.best_streak
+        self._update_score_label()
+
     def _load_record(self) -> int:
-        """Загружает рекорд из файла."""
-        try:
-            if self.SAVE_FILE.exists():
-                data = json.loads(self.SAVE_FILE.read_text())
-                return data.get("best_streak", 0)
-        except (json.JSONDecodeError, OSError):
-            pass
-        return 0
+        """Загружает рекорд текущего профиля."""
+        if self._profiles is None:
+            return 0
+        return self._profiles.get(self._profile_name).best_streak
 
     def _save_record(self) -> None:
-        """Сохраняет рекорд в файл."""
-        with contextlib.suppress(OSError):
-            self.SAVE_FILE.write_text(json.dumps({"best_streak": self._best_streak}))
+        """Сохраняет рекорд в профиль (ошибки записи не критичны)."""
+        if self._profiles is None:
+            return
+        with contextlib.suppress(OSError, ValueError):
+            profile = self._profiles.save(self._profile_name, self._quiz.best_streak)
+            # Другое окно этого ученика могло записать рекорд выше
+            self._quiz.best_streak = profile.best_streak
 
     def _set_app_icon(self) -> None:
         """Устанавливает иконку приложения."""
@@ -487,8 +1007,27 @@ class MainWindow(QMainWindow):
                 self.setWindowIcon(QIcon(str(icon_path)))
                 break
 
+    def changeEvent(self, event) -> None:
+        """Окно снова активно (например, после правки семплов в редакторе)."""
+        if event.type() == QEvent.Type.ActivationChange and self.isActiveWindow():
+            self._on_window_activated()
+        super().changeEvent(event)
+
+    def _on_window_activated(self) -> None:
+        """Подхватывает правки файлов набора (перечитываются только они)."""
+        self._audio_player.reload_samples_if_modified()
+
     def closeEvent(self, event) -> None:
         """Обработчик закрытия окна."""
         self._save_record()
+        self._stop_listening()
+        self._leave_classroom()
+        if self._idle_monitor is not None:
+            self._idle_monitor.stop()
+        self.spectrum_view.clear()
         self._audio_player.cleanup()
+        if self._watchdog is not None:
+            self._watchdog.stop()
+            with contextlib.suppress(OSError):
+                self._watchdog.write_report(self.WATCHDOG_REPORT_FILE)
         super().closeEvent(event)
@@ -1,10 +1,14 @@
 """Виджет виртуальной клавиатуры фортепиано."""
 
-from PySide6.QtCore import QRect, Qt, Signal
+from PySide6.QtCore import QEvent, QRect, Qt, QTimer, Signal
 from PySide6.QtGui import QBrush, QColor, QFont, QMouseEvent, QPainter, QPalette, QPen
 from PySide6.QtWidgets import QWidget
 
 from piano_ear_trainer.data import PIANO_NOTES, Note
+from piano_ear_trainer.metrics import REGISTRY
+
+# Время отрисовки клавиатуры
+_PAINT_SECONDS = REGISTRY.histogram("keyboard_paint_seconds", "Отрисовка клавиатуры")
 
 
 class PianoKeyboard(QWidget):
@@ -19,6 +23,9 @@ class PianoKeyboard(QWidget):
     BLACK_KEY_HEIGHT_RATIO = 0.65  # Высота чёрной относительно белой
     LABEL_HEIGHT = 70  # Высота области для подписей октав
 
+    # Пока окно неактивно, подсветка под мышью перерисовывается не чаще
+    INACTIVE_HOVER_INTERVAL_MS = 100
+
     # Цвета
     WHITE_KEY_COLOR = QColor(255, 255, 255)
     WHITE_KEY_HOVER = QColor(230, 230, 230)
@@ -46,6 +53,12 @@ class PianoKeyboard(QWidget):
 
         self._notes = PIANO_NOTES
         self._hovered_note: Note | None = None
+        self._painted_hover: Note | None = None  # Подсветка, которая на экране
+        # Отложенная перерисовка подсветки (окно неактивно)
+        self._hover_timer = QTimer(self)
+        self._hover_timer.setSingleShot(True)
+        self._hover_timer.setInterval(self.INACTIVE_HOVER_INTERVAL_MS)
+        self._hover_timer.timeout.connect(self._repaint_hover)
         self._key_rects: dict[int, QRect] = {}  # MIDI -> QRect
         self._white_key_count = sum(1 for n in self._notes if not n.is_black_key)
         self._show_octave_labels = show_octave_labels
@@ -118,22 +131,27 @@ class PianoKeyboard(QWidget):
 
     def paintEvent(self, event) -> None:
         """Отрисовка клавиатуры."""
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        with _PAINT_SECONDS.time():
+            painter = QPainter(self)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            # При смене подсветки перерисовываются только задетые клавиши
+            dirty = event.rect()
 
-        # Сначала рисуем белые клавиши
-        for note in self._notes:
-            if not note.is_black_key:
-                self._draw_key(painter, note)
+            # Сначала рисуем белые клавиши
+            for note in self._notes:
+                if not note.is_black_key:
+                    self._draw_key(painter, note, dirty)
 
-        # Потом чёрные клавиши (поверх)
-        for note in self._notes:
-            if note.is_black_key:
-                self._draw_key(painter, note)
+            # Потом чёрные клавиши (поверх)
+            for note in self._notes:
+                if note.is_black_key:
+                    self._draw_key(painter, note, dirty)
 
-        # Рисуем подписи октав если включено
-        if self._show_octave_labels:
-            self._draw_octave_labels(painter)
+            # Рисуем подписи октав если включено
+            if self._show_octave_labels:
+                self._draw_octave_labels(painter)
+
+            painter.end()
 
     def _draw_octave_labels(self, painter: QPainter) -> None:
         """Рисует подписи октав под клавиатурой."""
@@ -186,10 +204,10 @@ class PianoKeyboard(QWidget):
 
             painter.drawText(text_rect, alignment, label)
 
-    def _draw_key(self, painter: QPainter, note: Note) -> None:
-        """Рисует одну клавишу."""
+    def _draw_key(self, painter: QPainter, note: Note, dirty: QRect) -> None:
+        """Рисует одну клавишу (если она попадает в перерисовываемую область)."""
         rect = self._key_rects.get(note.midi_number)
-        if rect is None:
+        if rect is None or not rect.intersects(dirty):
             return
 
         is_hovered = self._hovered_note == note
@@ -208,9 +226,7 @@ class PianoKeyboard(QWidget):
         note = self._get_note_at_pos(event.position().toPoint())
 
         # Hover эффект
-        if note != self._hovered_note:
-            self._hovered_note = note
-            self.update()
+        self._set_hovered(note)
 
         # Глиссандо: при зажатой кнопке воспроизводим новые ноты
         if self._is_dragging and note is not None and note != self._last_dragged_note:
@@ -234,10 +250,39 @@ class PianoKeyboard(QWidget):
 
     def leaveEvent(self, event) -> None:
         """Мышь покинула виджет."""
-        self._hovered_note = None
+        self._set_hovered(None)
         self._is_dragging = False
         self._last_dragged_note = None
-        self.update()
+
+    def changeEvent(self, event) -> None:
+        """Окно снова активно: показываем отложенную подсветку сразу."""
+        activated = (
+            event.type() == QEvent.Type.ActivationChange and self.isActiveWindow()
+        )
+        if activated and self._hover_timer.isActive():
+            self._hover_timer.stop()
+            self._repaint_hover()
+        super().changeEvent(event)
+
+    def _set_hovered(self, note: Note | None) -> None:
+        """Меняет клавишу под мышью; в неактивном окне перерисовка копится."""
+        if note == self._hovered_note:
+            return
+        self._hovered_note = note
+        if self.isActiveWindow():
+            self._hover_timer.stop()
+            self._repaint_hover()
+        elif not self._hover_timer.isActive():
+            self._hover_timer.start()
+
+    def _repaint_hover(self) -> None:
+        """Перерисовывает клавиши, у которых сменилась подсветка."""
+        for note in (self._painted_hover, self._hovered_note):
+            rect = self._key_rects.get(note.midi_number) if note else None
+            if rect is not None:
+                # С запасом на сглаженную рамку (и соседние клавиши под ней)
+                self.update(rect.adjusted(-1, -1, 1, 1))
+        self._painted_hover = self._hovered_note
 
     def _get_note_at_pos(self, pos) -> Note | None:
         """Находит ноту по позиции клика."""
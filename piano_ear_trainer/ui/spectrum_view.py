@@ -0,0 +1,204 @@
+"""Виджет сравнения загаданной и нажатой ноты: осциллограмма и спектр."""
+
+import time
+from collections.abc import Hashable
+
+import numpy as np
+import pygame
+from PySide6.QtCore import QRect, Qt, QTimer
+from PySide6.QtGui import QColor, QFont, QImage, QPainter
+from PySide6.QtWidgets import QSizePolicy, QWidget
+
+from piano_ear_trainer.audio.spectrum import (
+    DISPLAY_COLUMNS,
+    MAX_FREQUENCY,
+    MIN_FREQUENCY,
+    NoteAnalysis,
+    SpectrumCache,
+)
+from piano_ear_trainer.data import Note
+from piano_ear_trainer.metrics import REGISTRY
+
+# Время работы одного кадра отрисовки
+_FRAME_SECONDS = REGISTRY.histogram("spectrum_frame_seconds", "Кадр отрисовки спектра")
+
+
+def _argb(color: QColor) -> int:
+    """Цвет как пиксель QImage.Format_RGB32."""
+    return color.rgba() & 0xFFFFFFFF
+
+
+class SpectrumView(QWidget):
+    """
+    Осциллограмма (сверху) и спектр (снизу) двух нот, наложенные друг на друга.
+
+    Картинка рисуется в заранее выделенный QImage прямо через массив
+    пикселей: таймер с частотой экрана дорисовывает по нескольку столбцов
+    за кадр, пока не исчерпан бюджет кадра, поэтому GUI-поток не
+    занимается отрисовкой дольше FRAME_BUDGET и следующий play_note не ждёт.
+    """
+
+    TARGET_COLOR = QColor(46, 204, 113)  # Загаданная нота — зелёный
+    ANSWER_COLOR = QColor(231, 76, 60)  # Ответ — красный
+    BOTH_COLOR = QColor(241, 196, 15)  # Совпадение — жёлтый
+    BACKGROUND_COLOR = QColor(250, 250, 250)
+    AXIS_COLOR = QColor(200, 200, 200)
+    LABEL_COLOR = QColor(80, 80, 80)
+    LEGEND_BACKGROUND = QColor(250, 250, 250, 210)
+
+    IMAGE_HEIGHT = 160
+    FRAME_BUDGET = 0.004  # Секунд на кадр
+    COLUMNS_PER_STEP = 32  # Столбцов между проверками бюджета
+
+    def __init__(self, analyzer: SpectrumCache, parent: QWidget | None = None):
+        super().__init__(parent)
+        self._analyzer = analyzer
+        self._image = QImage(
+            DISPLAY_COLUMNS, self.IMAGE_HEIGHT, QImage.Format.Format_RGB32
+        )
+        self._image.fill(self.BACKGROUND_COLOR)
+        # Пиксели QImage как массив (строка выравнена до bytesPerLine)
+        self._pixels = np.frombuffer(self._image.bits(), dtype=np.uint32).reshape(
+            self.IMAGE_HEIGHT, self._image.bytesPerLine() // 4
+        )
+        self._background = _argb(self.BACKGROUND_COLOR)
+        self._colors = (
+            _argb(self.TARGET_COLOR),
+            _argb(self.ANSWER_COLOR),
+            _argb(self.BOTH_COLOR),
+        )
+
+        # Панели: осциллограмма и спектр, между ними строка-разделитель
+        panel = (self.IMAGE_HEIGHT - 1) // 2
+        self._wave_rows = np.arange(panel, dtype=np.float32)[:, None]
+        self._spectrum_top = panel + 1
+        self._spectrum_rows = np.arange(
+            self.IMAGE_HEIGHT - self._spectrum_top, dtype=np.float32
+        )[:, None]
+        self._pixels[panel, :DISPLAY_COLUMNS] = _argb(self.AXIS_COLOR)
+
+        self._notes: tuple[Note, Note] | None = None
+        self._bank_key: Hashable = None
+        self._analyses: list[NoteAnalysis] = []
+        self._next_column = DISPLAY_COLUMNS  # Всё нарисовано
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._on_frame)
+
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self.setFixedHeight(self.IMAGE_HEIGHT)
+        self.setMinimumWidth(300)
+        self.hide()  # Появляется после первого ответа
+
+    def show_comparison(
+        self, target: Note, answer: Note, bank_key: Hashable = None
+    ) -> None:
+        """Начинает рисовать сравнение двух нот (по кадрам)."""
+        self._notes = (target, answer)
+        self._bank_key = bank_key
+        self._analyses = []
+        self._next_column = 0
+        self.show()
+        screen = self.screen()
+        refresh_rate = screen.refreshRate() if screen is not None else 60.0
+        self._timer.start(max(1, int(1000 / (refresh_rate or 60.0))))
+        self.update()
+
+    def clear(self) -> None:
+        """Убирает сравнение и прячет виджет."""
+        self._timer.stop()
+        self._notes = None
+        self._analyses = []
+        self._next_column = DISPLAY_COLUMNS
+        self._fill_columns(0, DISPLAY_COLUMNS)
+        self.hide()
+
+    def _on_frame(self) -> None:
+        """Кадр: досчитывает анализ и дорисовывает столбцы в пределах бюджета."""
+        with _FRAME_SECONDS.time():
+            deadline = time.perf_counter() + self.FRAME_BUDGET
+            if self._notes is None:
+                self._timer.stop()
+                return
+            # Анализ ноты не из кэша — не больше одного БПФ за кадр
+            if len(self._analyses) < 2:
+                note = self._notes[len(self._analyses)]
+                try:
+                    analysis = self._analyzer.get(note, self._bank_key)
+                except (pygame.error, SystemError):
+                    # Микшер закрыт (окно закрывается): звуки трогать нельзя
+                    self._timer.stop()
+                    return
+                self._analyses.append(analysis)
+                if len(self._analyses) < 2:
+                    return
+
+            first = self._next_column
+            while self._next_column < DISPLAY_COLUMNS:
+                end = min(self._next_column + self.COLUMNS_PER_STEP, DISPLAY_COLUMNS)
+                self._fill_columns(self._next_column, end)
+                self._next_column = end
+                if time.perf_counter() >= deadline:
+                    break
+            if self._next_column >= DISPLAY_COLUMNS:
+                self._timer.stop()
+            self.update(self._widget_rect(first, self._next_column))
+
+    def _fill_columns(self, start: int, end: int) -> None:
+        """Рисует столбцы [start, end) в QImage."""
+        wave = self._pixels[: len(self._wave_rows), start:end]
+        spectrum = self._pixels[self._spectrum_top :, start:end]
+        wave[:] = self._background
+        spectrum[:] = self._background
+        if len(self._analyses) < 2:
+            return
+
+        middle = (len(self._wave_rows) - 1) / 2
+        spectrum_height = len(self._spectrum_rows)
+        wave_masks = []
+        spectrum_masks = []
+        for analysis in self._analyses:
+            # Полпикселя с каждой стороны: линия не тоньше 1 пикселя
+            top = middle - analysis.waveform_max[start:end] * middle - 0.5
+            bottom = middle - analysis.waveform_min[start:end] * middle + 0.5
+            wave_masks.append((self._wave_rows >= top) & (self._wave_rows <= bottom))
+            level = analysis.spectrum[start:end] * spectrum_height
+            spectrum_masks.append(self._spectrum_rows >= spectrum_height - level)
+
+        target_color, answer_color, both_color = self._colors
+        for pixels, (target, answer) in (
+            (wave, wave_masks),
+            (spectrum, spectrum_masks),
+        ):
+            pixels[target] = target_color
+            pixels[answer] = answer_color
+            pixels[target & answer] = both_color
+
+    def _widget_rect(self, start: int, end: int) -> QRect:
+        """Область виджета, куда попадают столбцы [start, end) картинки."""
+        scale = self.width() / DISPLAY_COLUMNS
+        left = int(start * scale)
+        return QRect(left, 0, int(end * scale) - left + 2, self.height())
+
+    def paintEvent(self, event) -> None:
+        """Масштабирует картинку в виджет и подписывает панели."""
+        painter = QPainter(self)
+        painter.drawImage(self.rect(), self._image)
+        if self._notes is not None:
+            font = QFont()
+            font.setPointSize(9)
+            painter.setFont(font)
+            target, answer = self._notes
+            painter.fillRect(0, 0, 130, 34, self.LEGEND_BACKGROUND)
+            painter.setPen(self.TARGET_COLOR)
+            painter.drawText(6, 14, f"Загадано: {target.short_name}")
+            painter.setPen(self.ANSWER_COLOR)
+            painter.drawText(6, 28, f"Ваш ответ: {answer.short_name}")
+            painter.setPen(self.LABEL_COLOR)
+            bottom = self.height() - 4
+            painter.drawText(6, bottom, f"{MIN_FREQUENCY:.0f} Гц")
+            label = f"{MAX_FREQUENCY / 1000:.0f} кГц"
+            width = painter.fontMetrics().horizontalAdvance(label)
+            painter.drawText(self.width() - width - 6, bottom, label)
+        painter.end()
@@ -0,0 +1,194 @@
+"""Сторожевой таймер цикла событий Qt: диагностика подвисаний интерфейса."""
+
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from dataclasses import asdict, dataclass, field
+from functools import wraps
+from pathlib import Path
+
+from PySide6.QtCore import QObject, Qt, QTimer
+
+from piano_ear_trainer.metrics import Histogram
+
+# Переменная окружения для включения (выключено по умолчанию)
+WATCHDOG_ENV = "PIANO_EAR_TRAINER_WATCHDOG"
+
+
+def is_watchdog_enabled() -> bool:
+    """Включён ли сторож через переменную окружения."""
+    return os.environ.get(WATCHDOG_ENV, "") not in ("", "0")
+
+
+def _new_histogram(name: str) -> Histogram:
+    """Гистограмма вне общего реестра: сторож работает и без экспорта метрик."""
+    return Histogram(None, name)
+
+
+def _summarize(histogram: Histogram) -> dict:
+    """Сводка гистограммы для отчёта (в мс)."""
+    bounds = [f"<={b * 1000:g}ms" for b in histogram.buckets]
+    labels = [*bounds, f">{histogram.buckets[-1] * 1000:g}ms"]
+    count = histogram.count
+    return {
+        "count": count,
+        "mean_ms": round(histogram.sum / count * 1000, 3) if count else 0,
+        "max_ms": round(histogram.max * 1000, 3),
+        "buckets": {
+            label: n for label, n in zip(labels, histogram.counts, strict=True) if n
+        },
+    }
+
+
+@dataclass
+class Stall:
+    """Зафиксированное подвисание цикла событий."""
+
+    started_at: float  # Время начала (time.time())
+    duration_ms: float  # Длительность (обновляется по окончании)
+    stack: list[str] = field(default_factory=list)  # Стек главного потока
+
+
+class EventLoopWatchdog(QObject):
+    """
+    Измеряет задержку цикла событий и ловит подвисания.
+
+    Частый QTimer отмечает "сердцебиение" в главном потоке. Отдельный
+    поток-наблюдатель проверяет время с последнего удара и, если оно
+    превысило порог, снимает стек главного потока через
+    sys._current_frames() — в момент подвисания, а не после него.
+    """
+
+    def __init__(
+        self,
+        parent: QObject | None = None,
+        interval_ms: int = 5,
+        stall_threshold: float = 0.1,
+        max_stalls: int = 50,
+    ) -> None:
+        """
+        Args:
+            parent: Родительский объект Qt
+            interval_ms: Период сердцебиения
+            stall_threshold: Порог подвисания, с
+            max_stalls: Сколько подвисаний хранить в отчёте
+        """
+        super().__init__(parent)
+        self.interval = interval_ms / 1000
+        self.stall_threshold = stall_threshold
+        self.max_stalls = max_stalls
+
+        # Опоздание сердцебиения относительно периода
+        self.lag = _new_histogram("event_loop_lag")
+        self.handlers: dict[str, Histogram] = {}  # Длительность обработчиков
+        self.stalls: list[Stall] = []
+
+        self._main_thread_id = threading.main_thread().ident
+        self._last_beat = time.perf_counter()
+        self._current_stall: Stall | None = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._monitor: threading.Thread | None = None
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._on_heartbeat)
+
+    def start(self) -> None:
+        """Запускает сердцебиение и поток-наблюдатель."""
+        self._last_beat = time.perf_counter()
+        self._timer.start()
+        self._stop_event.clear()
+        self._monitor = threading.Thread(
+            target=self._monitor_loop, name="ui-watchdog", daemon=True
+        )
+        self._monitor.start()
+
+    def stop(self) -> None:
+        """Останавливает наблюдение."""
+        self._timer.stop()
+        self._stop_event.set()
+        if self._monitor is not None:
+            self._monitor.join()
+            self._monitor = None
+
+    def _on_heartbeat(self) -> None:
+        """Удар сердца (главный поток)."""
+        now = time.perf_counter()
+        with self._lock:
+            elapsed = now - self._last_beat
+            self._last_beat = now
+            if self._current_stall is not None:
+                self._current_stall.duration_ms = round(elapsed * 1000, 1)
+                self._current_stall = None
+        self.lag.observe(max(0.0, elapsed - self.interval))
+
+    def _monitor_loop(self) -> None:
+        """Проверяет сердцебиение (поток-наблюдатель)."""
+        poll = max(self.stall_threshold / 4, 0.005)
+        while not self._stop_event.wait(poll):
+            with self._lock:
+                since_beat = time.perf_counter() - self._last_beat
+                if self._current_stall is not None or since_beat < self.stall_threshold:
+                    continue
+                frame = sys._current_frames().get(self._main_thread_id)
+                stack = traceback.format_stack(frame) if frame is not None else []
+                stall = Stall(
+                    started_at=time.time() - since_beat,
+                    duration_ms=round(since_beat * 1000, 1),
+                    stack=[line.rstrip() for line in stack],
+                )
+                self._current_stall = stall
+                if len(self.stalls) < self.max_stalls:
+                    self.stalls.append(stall)
+
+    def wrap(self, name: str, handler):
+        """Оборачивает обработчик для учёта его длительности."""
+        histogram = self.handlers.get(name)
+        if histogram is None:
+            histogram = self.handlers[name] = _new_histogram(name)
+
+        @wraps(handler)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return handler(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+
+        return timed
+
+    def instrument(self, obj: object, prefix: str = "_on_") -> None:
+        """
+        Оборачивает все методы obj с именем на prefix.
+
+        Вызывать до подключения сигналов: connect() запоминает объект метода.
+        """
+        for name in dir(type(obj)):
+            if name.startswith(prefix) and callable(getattr(obj, name)):
+                setattr(obj, name, self.wrap(name, getattr(obj, name)))
+
+    def report(self) -> dict:
+        """Собирает отчёт."""
+        with self._lock:
+            stalls = [asdict(stall) for stall in self.stalls]
+        return {
+            "interval_ms": self.interval * 1000,
+            "stall_threshold_ms": self.stall_threshold * 1000,
+            "event_loop_lag": _summarize(self.lag),
+            "handlers": {
+                name: _summarize(hist)
+                for name, hist in sorted(self.handlers.items())
+                if hist.count
+            },
+            "stalls": stalls,
+        }
+
+    def write_report(self, path: Path) -> None:
+        """Сохраняет отчёт в JSON."""
+        text = json.dumps(self.report(), ensure_ascii=False, indent=2)
+        path.write_text(text, encoding="utf-8")
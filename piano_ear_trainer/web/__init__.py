@@ -0,0 +1,5 @@
+"""HTTP-режим: викторина для браузера без установки приложения."""
+
+from piano_ear_trainer.web.server import QuizHTTPServer, create_server
+
+__all__ = ["QuizHTTPServer", "create_server"]
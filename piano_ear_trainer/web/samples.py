@@ -0,0 +1,76 @@
+"""Хранилище семплов для HTTP-сервера: открыты один раз, отдаются без копий."""
+
+import hashlib
+import mimetypes
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from piano_ear_trainer.data import PIANO_NOTES
+
+
+def _get_base_path() -> Path:
+    """Возвращает базовый путь (для PyInstaller и обычного запуска)."""
+    if getattr(sys, "frozen", False):
+        return Path(sys._MEIPASS)
+    return Path(__file__).parent.parent.parent
+
+
+@dataclass(frozen=True)
+class SampleFile:
+    """Семпл, готовый к отдаче."""
+
+    fd: int  # Открытый дескриптор (общий для всех запросов)
+    size: int
+    etag: str
+    content_type: str
+    suffix: str  # Расширение файла (".mp3")
+    data: bytes  # Содержимое — для платформ без os.sendfile
+
+
+class SampleStore:
+    """
+    Семплы, загруженные один раз при старте.
+
+    Файлы держатся открытыми, а отдаются через os.sendfile с явным
+    смещением: ядро копирует данные из page cache прямо в сокет, позиция
+    файла не меняется, поэтому один дескриптор безопасно делят потоки.
+    Содержимое также лежит в памяти для ETag и запасного пути отдачи.
+    """
+
+    def __init__(self, samples_dir: Path | None = None) -> None:
+        if samples_dir is None:
+            samples_dir = _get_base_path() / "assets" / "samples_mp3"
+        self.samples_dir = samples_dir
+        self._by_name: dict[str, SampleFile] = {}
+
+        for note in PIANO_NOTES:
+            matches = sorted(samples_dir.glob(f"{note.short_name}.*"))
+            if not matches:
+                continue
+            path = matches[0]
+            data = path.read_bytes()
+            content_type = mimetypes.guess_type(path.name)[0]
+            self._by_name[note.short_name] = SampleFile(
+                fd=os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0)),
+                size=len(data),
+                etag='"' + hashlib.sha1(data).hexdigest() + '"',
+                content_type=content_type or "application/octet-stream",
+                suffix=path.suffix,
+                data=data,
+            )
+
+    def get(self, short_name: str) -> SampleFile | None:
+        """Семпл по короткому имени ноты."""
+        return self._by_name.get(short_name)
+
+    def names(self) -> list[str]:
+        """Доступные ноты."""
+        return list(self._by_name)
+
+    def close(self) -> None:
+        """Закрывает файлы."""
+        for sample in self._by_name.values():
+            os.close(sample.fd)
+        self._by_name.clear()
@@ -0,0 +1,252 @@
+"""HTTP-сервер викторины для браузерного клиента.
+
+    python -m piano_ear_trainer.web.server --port 8080
+
+API (JSON):
+    GET  /api/notes                          — список клавиш
+    GET  /api/question?octaves=3,4&sharps=1&length=1
+                                             — вопрос: токен и ссылки на семплы
+    POST /api/answer {"token", "answer": [midi, ...]}
+                                             — проверка ответа
+    GET  /samples/<id>.mp3                   — семпл (ETag, долгий кэш)
+
+Сервер не хранит сессии: загаданные ноты зашифрованы в подписанном
+токене, а счёт ведёт клиент.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import select
+import sys
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from piano_ear_trainer.data import NOTES_BY_MIDI, PIANO_NOTES
+from piano_ear_trainer.quiz import filter_notes, is_correct_answer, make_question
+from piano_ear_trainer.web.samples import SampleFile, SampleStore
+from piano_ear_trainer.web.tokens import QuestionSigner, TokenError
+
+# Файл с ключом подписи: одинаковые ссылки на семплы между перезапусками
+SECRET_FILE = Path.home() / ".piano_ear_trainer_web_secret"
+
+# Предел тела POST-запроса
+MAX_BODY = 16 * 1024
+
+# Кэширование семплов в браузере: содержимое по ссылке не меняется
+SAMPLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def load_secret(path: Path = SECRET_FILE) -> bytes:
+    """Читает ключ подписи или создаёт новый."""
+    with contextlib.suppress(OSError):
+        secret = path.read_bytes()
+        if len(secret) >= 32:
+            return secret
+    secret = os.urandom(32)
+    # Если записать не удалось, ключ действует до перезапуска
+    with contextlib.suppress(OSError):
+        path.write_bytes(secret)
+        path.chmod(0o600)
+    return secret
+
+
+class QuizHTTPServer(ThreadingHTTPServer):
+    """HTTP-сервер с общими для всех потоков семплами и подписью."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        store: SampleStore,
+        signer: QuestionSigner,
+    ) -> None:
+        super().__init__(address, QuizRequestHandler)
+        self.store = store
+        self.signer = signer
+        # Ссылки на семплы: id -> семпл (постоянные — для кэша браузера)
+        self.samples_by_id: dict[str, SampleFile] = {}
+        self.sample_urls: dict[str, str] = {}
+        for name in store.names():
+            sample = store.get(name)
+            sample_id = signer.sample_id(name)
+            self.samples_by_id[sample_id] = sample
+            self.sample_urls[name] = f"/samples/{sample_id}{sample.suffix}"
+        notes = [
+            {
+                "midi": n.midi_number,
+                "name": n.full_name,
+                "short_name": n.short_name,
+                "is_black_key": n.is_black_key,
+            }
+            for n in PIANO_NOTES
+        ]
+        self.notes_json = json.dumps(notes, ensure_ascii=False).encode()
+
+
+class QuizRequestHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов викторины."""
+
+    server: QuizHTTPServer
+    protocol_version = "HTTP/1.1"  # keep-alive для браузера и бенчмарка
+    server_version = "PianoEarTrainer"
+    # Заголовки и тело уходят разными write(): без TCP_NODELAY ответ
+    # застревает на ~40 мс (Nagle + отложенный ACK)
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args) -> None:
+        """Без журнала каждого запроса (мешает под нагрузкой)."""
+
+    def do_GET(self) -> None:
+        """GET: API и семплы."""
+        url = urlsplit(self.path)
+        if url.path.startswith("/samples/"):
+            self._send_sample(url.path.removeprefix("/samples/"))
+        elif url.path == "/api/notes":
+            self._send_body(HTTPStatus.OK, self.server.notes_json)
+        elif url.path == "/api/question":
+            self._send_question(parse_qs(url.query))
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+    do_HEAD = do_GET
+
+    def do_POST(self) -> None:
+        """POST: проверка ответа."""
+        if urlsplit(self.path).path != "/api/answer":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = 0  # Например, "Content-Length: abc"
+        if not 0 < length <= MAX_BODY:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "bad body"})
+            return
+        try:
+            request = json.loads(self.rfile.read(length))
+            token = request["token"]
+            answer = [NOTES_BY_MIDI[int(m)] for m in request["answer"]]
+            target = [NOTES_BY_MIDI[m] for m in self.server.signer.verify(token)]
+        except TokenError as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        except (ValueError, KeyError, TypeError):
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "bad answer"})
+            return
+
+        self._send_json(
+            HTTPStatus.OK,
+            {
+                "correct": is_correct_answer(target, answer),
+                "target": [
+                    {"midi": n.midi_number, "name": n.full_name} for n in target
+                ],
+            },
+        )
+
+    def _send_question(self, query: dict[str, list[str]]) -> None:
+        try:
+            octaves = [int(o) for o in query.get("octaves", ["4"])[0].split(",")]
+            use_sharps = query.get("sharps", ["0"])[0] in ("1", "true")
+            length = int(query.get("length", ["1"])[0])
+            if not 1 <= length <= 8:
+                raise ValueError(length)
+            sequence = make_question(filter_notes(octaves, use_sharps), length)
+        except ValueError:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "bad parameters"})
+            return
+
+        token = self.server.signer.sign([n.midi_number for n in sequence])
+        samples = [self.server.sample_urls.get(n.short_name) for n in sequence]
+        self._send_json(HTTPStatus.OK, {"token": token, "samples": samples})
+
+    def _send_sample(self, filename: str) -> None:
+        sample_id, _, _ = filename.partition(".")
+        sample = self.server.samples_by_id.get(sample_id)
+        if sample is None:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+            return
+
+        if self.headers.get("If-None-Match") == sample.etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", sample.etag)
+            self.send_header("Cache-Control", SAMPLE_CACHE_CONTROL)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", sample.content_type)
+        self.send_header("Content-Length", str(sample.size))
+        self.send_header("ETag", sample.etag)
+        self.send_header("Cache-Control", SAMPLE_CACHE_CONTROL)
+        self.end_headers()
+        if self.command != "HEAD":
+            self._send_file(sample)
+
+    def _send_file(self, sample: SampleFile) -> None:
+        """Отдаёт файл без копирования в пространство пользователя."""
+        if not hasattr(os, "sendfile"):
+            self.wfile.write(sample.data)
+            return
+        out_fd = self.connection.fileno()
+        offset = 0
+        while offset < sample.size:
+            try:
+                sent = os.sendfile(out_fd, sample.fd, offset, sample.size - offset)
+            except BlockingIOError:
+                select.select([], [out_fd], [])
+                continue
+            except OSError:
+                # Например, sendfile не поддержан для этого сокета
+                self.wfile.write(memoryview(sample.data)[offset:])
+                return
+            if sent == 0:
+                break
+            offset += sent
+
+    def _send_json(self, status: HTTPStatus, payload: dict) -> None:
+        self._send_body(status, json.dumps(payload, ensure_ascii=False).encode())
+
+    def _send_body(self, status: HTTPStatus, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+
+def create_server(host: str = "127.0.0.1", port: int = 8080) -> QuizHTTPServer:
+    """Создаёт сервер с семплами по умолчанию и постоянным ключом."""
+    signer = QuestionSigner(load_secret())
+    return QuizHTTPServer((host, port), SampleStore(), signer)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Точка входа сервера."""
+    parser = argparse.ArgumentParser(description="HTTP-сервер викторины")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+
+    server = create_server(args.host, args.port)
+    host, port = server.server_address[:2]
+    print(f"Сервер викторины: http://{host}:{port}/api/question")
+    try:
+        with contextlib.suppress(KeyboardInterrupt):
+            server.serve_forever()
+    finally:
+        server.server_close()
+        server.store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
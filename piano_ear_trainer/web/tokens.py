@@ -0,0 +1,96 @@
+"""Подписанные токены вопросов: сервер не хранит состояние между запросами."""
+
+import base64
+import hashlib
+import hmac
+import os
+import time
+
+
+class TokenError(ValueError):
+    """Токен повреждён, подделан или просрочен."""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class QuestionSigner:
+    """
+    Шифрует загаданные MIDI-номера в токен и проверяет его при ответе.
+
+    Формат: nonce(8) | время выдачи(4) | зашифрованные ноты | HMAC(16).
+    Ноты закрыты потоком HMAC-SHA256(ключ, nonce), поэтому ответ нельзя
+    прочитать из токена, а подпись не даёт его подменить. Несколько
+    экземпляров сервера с одним ключом взаимозаменяемы.
+    """
+
+    NONCE_SIZE = 8
+    MAC_SIZE = 16
+    MAX_NOTES = 32
+
+    def __init__(self, secret: bytes | None = None, max_age: float = 3600.0) -> None:
+        self._secret = secret or os.urandom(32)
+        self.max_age = max_age
+
+    def _keystream(self, nonce: bytes, length: int) -> bytes:
+        return hmac.new(self._secret, b"stream" + nonce, hashlib.sha256).digest()[
+            :length
+        ]
+
+    def _mac(self, body: bytes) -> bytes:
+        return hmac.new(self._secret, b"mac" + body, hashlib.sha256).digest()[
+            : self.MAC_SIZE
+        ]
+
+    def sign(self, midi: list[int]) -> str:
+        """Создаёт токен вопроса."""
+        if not 0 < len(midi) <= self.MAX_NOTES:
+            raise ValueError("Недопустимая длина вопроса")
+        nonce = os.urandom(self.NONCE_SIZE)
+        issued = int(time.time()).to_bytes(4, "big")
+        plain = bytes(midi)
+        cipher = bytes(
+            a ^ b
+            for a, b in zip(plain, self._keystream(nonce, len(plain)), strict=True)
+        )
+        body = nonce + issued + cipher
+        return _b64encode(body + self._mac(body))
+
+    def verify(self, token: str) -> list[int]:
+        """Проверяет токен и возвращает загаданные MIDI-номера."""
+        try:
+            raw = _b64decode(token)
+        except (ValueError, TypeError) as e:
+            raise TokenError("Некорректный токен") from e
+
+        header = self.NONCE_SIZE + 4
+        if len(raw) <= header + self.MAC_SIZE:
+            raise TokenError("Некорректный токен")
+        body, mac = raw[: -self.MAC_SIZE], raw[-self.MAC_SIZE :]
+        if not hmac.compare_digest(mac, self._mac(body)):
+            raise TokenError("Подпись токена не совпадает")
+
+        nonce = body[: self.NONCE_SIZE]
+        issued = int.from_bytes(body[self.NONCE_SIZE : header], "big")
+        if time.time() - issued > self.max_age:
+            raise TokenError("Токен просрочен")
+        cipher = body[header:]
+        stream = self._keystream(nonce, len(cipher))
+        return [a ^ b for a, b in zip(cipher, stream, strict=True)]
+
+    def sample_id(self, short_name: str) -> str:
+        """
+        Постоянный идентификатор семпла для ссылки (кэшируется браузером).
+
+        Id не содержит имени файла, но одинаков у ноты во всех вопросах:
+        клиент, видевший ответы, может сопоставить ссылки с нотами. Защиты
+        от подсказок он не даёт — счёт всё равно ведёт клиент.
+        """
+        return hmac.new(
+            self._secret, b"sample" + short_name.encode(), "sha256"
+        ).hexdigest()[:16]